@@ -0,0 +1,92 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class MemoryAnalysisCache:
+    """Process-local analysis cache with TTL expiry and LRU eviction."""
+
+    name = "memory"
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, tuple[float, dict]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self.entries[key]
+            return None
+
+        self.entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: dict):
+        self.entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+
+class PostgresAnalysisCache:
+    """Analysis cache stored in the analysis_cache table so it survives restarts."""
+
+    name = "postgres"
+
+    def __init__(self, db, ttl_seconds: float, max_entries: int):
+        self.db = db
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+    @staticmethod
+    def storage_key(key: str) -> str:
+        # Keys embed the model name, so store a fixed-width digest that always fits cache_key
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[dict]:
+        raw = await self.db.fetchval(
+            """
+            UPDATE analysis_cache
+            SET last_hit_at = NOW()
+            WHERE cache_key = $1 AND expires_at > NOW()
+            RETURNING result
+            """,
+            self.storage_key(key),
+        )
+        return json.loads(raw) if raw else None
+
+    async def set(self, key: str, value: dict):
+        await self.db.execute(
+            """
+            INSERT INTO analysis_cache (cache_key, result, expires_at, last_hit_at)
+            VALUES ($1, $2::jsonb, NOW() + make_interval(secs => $3), NOW())
+            ON CONFLICT (cache_key)
+            DO UPDATE SET
+                result = EXCLUDED.result,
+                expires_at = EXCLUDED.expires_at,
+                last_hit_at = EXCLUDED.last_hit_at
+            """,
+            self.storage_key(key),
+            json.dumps(value),
+            float(self.ttl_seconds),
+        )
+        # Drop expired rows, then the least recently used beyond the size bound
+        await self.db.execute(
+            """
+            DELETE FROM analysis_cache
+            WHERE expires_at <= NOW()
+               OR cache_key IN (
+                   SELECT cache_key FROM analysis_cache
+                   ORDER BY last_hit_at DESC
+                   OFFSET $1
+               )
+            """,
+            self.max_entries,
+        )
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import statistics
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from backend.database import Database
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+# Compares the JSON_RESPONSE_MODE serialization paths for student-list-shaped pages.
+# Run from the project root: python -m backend.benchmark_json
+
+ROW_COUNTS = (1_000, 10_000, 100_000)
+REPEATS = 5
+
+# Synthetic rows shaped like GET /api/students output, so no table data is needed
+ROWS_SQL = """
+    SELECT
+        g AS id,
+        'SIST' || lpad(g::text, 7, '0') AS roll_no,
+        'Student ' || g AS name,
+        (ARRAY['CSE', 'ECE', 'MECH', 'IT'])[1 + g % 4] AS department,
+        1 + g % 8 AS semester,
+        g % 7 AS arrears_count,
+        '+91' || lpad(g::text, 10, '0') AS parent_phone,
+        'parent' || g || '@example.com' AS parent_email,
+        NULL::text AS photo_url,
+        NOW() - g * INTERVAL '1 minute' AS created_at
+    FROM generate_series($1::int, 1, -1) AS g
+"""
+
+
+async def standard_path(db: Database, row_count: int) -> bytes:
+    rows = await db.fetch(ROWS_SQL, row_count)
+    return json.dumps(
+        jsonable_encoder(rows), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+async def orjson_path(db: Database, row_count: int) -> bytes:
+    rows = await db.fetch(ROWS_SQL, row_count)
+    return orjson.dumps(rows, default=jsonable_encoder)
+
+
+async def postgres_path(db: Database, row_count: int) -> bytes:
+    body = await db.fetchval(
+        f"SELECT COALESCE(json_agg(page), '[]'::json)::text FROM ({ROWS_SQL}) page",
+        row_count,
+    )
+    return body.encode("utf-8")
+
+
+async def time_path(path, db: Database, row_count: int) -> tuple[float, int]:
+    timings = []
+    size = 0
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        size = len(await path(db, row_count))
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), size
+
+
+async def main():
+    db = Database()
+    status = await db.initialize()
+    if not status.get("connected"):
+        raise SystemExit(f"Database unavailable: {status.get('error')}")
+
+    paths = [("standard", standard_path), ("postgres", postgres_path)]
+    if orjson is not None:
+        paths.insert(1, ("orjson", orjson_path))
+    else:
+        print("orjson is not installed; skipping the orjson path")
+
+    try:
+        print(f"{'rows':>8}  {'mode':<9} {'median ms':>10} {'speedup':>8} {'bytes':>11}")
+        for row_count in ROW_COUNTS:
+            baseline = None
+            for name, path in paths:
+                seconds, size = await time_path(path, db, row_count)
+                baseline = baseline or seconds
+                print(
+                    f"{row_count:>8}  {name:<9} {seconds * 1000:>10.1f} "
+                    f"{baseline / seconds:>7.2f}x {size:>11}"
+                )
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,219 @@
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+import time
+import uuid
+from typing import AsyncIterator, Optional
+
+# Partially received uploads; a session survives restarts as long as this directory does
+CHUNKED_UPLOAD_DIR = os.getenv(
+    "CHUNKED_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "apns-chunked-uploads")
+)
+CHUNKED_UPLOAD_MAX_BYTES = int(os.getenv("CHUNKED_UPLOAD_MAX_BYTES", str(1024 * 1024 * 1024)))
+# Chunk size suggested to clients; any size is accepted
+CHUNKED_UPLOAD_CHUNK_BYTES = int(os.getenv("CHUNKED_UPLOAD_CHUNK_BYTES", str(8 * 1024 * 1024)))
+# Sessions without a new chunk for this long are deleted
+CHUNKED_UPLOAD_EXPIRE_SECONDS = float(os.getenv("CHUNKED_UPLOAD_EXPIRE_SECONDS", str(24 * 3600)))
+
+WRITE_BUFFER_BYTES = 1024 * 1024
+HASH_READ_BYTES = 1024 * 1024
+
+
+class ChunkedUploadError(Exception):
+    """A chunk or completion request the upload session cannot accept."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class ChunkedUploadStore:
+    """Resumable uploads written straight to local disk.
+
+    Each session is a metadata file plus a data file that only ever grows at its
+    end: a chunk must start at the current size, so after a dropped connection the
+    client asks for the offset and carries on from there. Bytes received before a
+    disconnect are kept unless the chunk carried its own checksum.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, chunk_bytes: int, expire_seconds: float):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.chunk_bytes = chunk_bytes
+        self.expire_seconds = expire_seconds
+        self.locks: dict[str, asyncio.Lock] = {}
+
+    def meta_path(self, upload_id: str) -> str:
+        return os.path.join(self.directory, f"{upload_id}.json")
+
+    def data_path(self, upload_id: str) -> str:
+        return os.path.join(self.directory, f"{upload_id}.part")
+
+    def lock(self, upload_id: str) -> asyncio.Lock:
+        return self.locks.setdefault(upload_id, asyncio.Lock())
+
+    def describe(self, session: dict) -> dict:
+        return {
+            "uploadId": session["id"],
+            "fileName": session["file_name"],
+            "size": session["size"],
+            "offset": session["offset"],
+            "chunkBytes": self.chunk_bytes,
+        }
+
+    def create_files(self, session: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        open(self.data_path(session["id"]), "wb").close()
+        with open(self.meta_path(session["id"]), "w", encoding="utf-8") as meta:
+            json.dump(session, meta)
+
+    async def create(self, file_name: str, extension: str, size: int, sha256: str) -> dict:
+        await asyncio.to_thread(self.sweep)
+        session = {
+            "id": uuid.uuid4().hex,
+            "file_name": file_name,
+            "extension": extension,
+            "size": size,
+            "sha256": sha256.lower(),
+        }
+        await asyncio.to_thread(self.create_files, session)
+        return {**session, "offset": 0}
+
+    def load(self, upload_id: str) -> Optional[dict]:
+        # Ids come from the URL; anything that is not one of ours never touches the filesystem
+        if len(upload_id) != 32 or not all(c in "0123456789abcdef" for c in upload_id):
+            return None
+        try:
+            with open(self.meta_path(upload_id), encoding="utf-8") as meta:
+                session = json.load(meta)
+            session["offset"] = os.path.getsize(self.data_path(upload_id))
+        except (FileNotFoundError, ValueError):
+            return None
+        return session
+
+    async def get(self, upload_id: str) -> Optional[dict]:
+        return await asyncio.to_thread(self.load, upload_id)
+
+    async def append(
+        self,
+        upload_id: str,
+        offset: int,
+        chunks: AsyncIterator[bytes],
+        chunk_sha256: Optional[str] = None,
+    ) -> int:
+        """Write one request body at offset and return the new offset."""
+        lock = self.lock(upload_id)
+        if lock.locked():
+            raise ChunkedUploadError(409, "Another chunk for this upload is still being written")
+
+        async with lock:
+            session = await self.get(upload_id)
+            if session is None:
+                raise ChunkedUploadError(404, "Upload not found")
+            if offset != session["offset"]:
+                raise ChunkedUploadError(
+                    409, f"Chunk offset {offset} does not match the {session['offset']} bytes received"
+                )
+
+            path = self.data_path(upload_id)
+            digest = hashlib.sha256()
+            buffer = bytearray()
+            received = 0
+            complete = False
+            target = await asyncio.to_thread(open, path, "ab")
+            try:
+                async for piece in chunks:
+                    received += len(piece)
+                    if offset + received > session["size"]:
+                        raise ChunkedUploadError(413, "Chunk runs past the declared upload size")
+                    buffer.extend(piece)
+                    if len(buffer) >= WRITE_BUFFER_BYTES:
+                        await self.flush(target, buffer, digest)
+                complete = True
+            finally:
+                # Keep what arrived before a disconnect, unless the chunk carries a checksum
+                # and is therefore all-or-nothing
+                if complete or chunk_sha256 is None:
+                    await self.flush(target, buffer, digest)
+                verified = chunk_sha256 is None or (
+                    complete and digest.hexdigest() == chunk_sha256.lower()
+                )
+                if not verified:
+                    await asyncio.to_thread(target.truncate, offset)
+                await asyncio.to_thread(target.close)
+
+            if not verified:
+                raise ChunkedUploadError(422, "Chunk checksum mismatch; resend the chunk")
+            return await asyncio.to_thread(os.path.getsize, path)
+
+    async def flush(self, target, buffer: bytearray, digest):
+        if buffer:
+            await asyncio.to_thread(target.write, bytes(buffer))
+            digest.update(buffer)
+            buffer.clear()
+
+    def file_sha256(self, upload_id: str) -> str:
+        digest = hashlib.sha256()
+        with open(self.data_path(upload_id), "rb") as source:
+            for block in iter(lambda: source.read(HASH_READ_BYTES), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    async def finish(self, upload_id: str) -> dict:
+        """Check the upload is whole and matches its checksum; returns the session."""
+        lock = self.lock(upload_id)
+        if lock.locked():
+            raise ChunkedUploadError(409, "A chunk for this upload is still being written")
+
+        async with lock:
+            session = await self.get(upload_id)
+            if session is None:
+                raise ChunkedUploadError(404, "Upload not found")
+            if session["offset"] != session["size"]:
+                raise ChunkedUploadError(
+                    409, f"Upload incomplete: {session['offset']} of {session['size']} bytes received"
+                )
+            if await asyncio.to_thread(self.file_sha256, upload_id) != session["sha256"]:
+                await self.discard(upload_id)
+                raise ChunkedUploadError(422, "Upload checksum mismatch; the upload was discarded")
+            return session
+
+    def remove_files(self, upload_id: str):
+        for path in (self.meta_path(upload_id), self.data_path(upload_id)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    async def discard(self, upload_id: str):
+        await asyncio.to_thread(self.remove_files, upload_id)
+        self.locks.pop(upload_id, None)
+
+    def sweep(self):
+        """Delete sessions that have gone without a chunk for longer than the expiry."""
+        if not os.path.isdir(self.directory):
+            return
+        cutoff = time.time() - self.expire_seconds
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            upload_id = name[: -len(".json")]
+            try:
+                last_write = os.path.getmtime(self.data_path(upload_id))
+            except OSError:
+                last_write = 0
+            if last_write < cutoff:
+                self.remove_files(upload_id)
+                self.locks.pop(upload_id, None)
+
+
+def build_chunked_upload_store() -> ChunkedUploadStore:
+    return ChunkedUploadStore(
+        CHUNKED_UPLOAD_DIR,
+        CHUNKED_UPLOAD_MAX_BYTES,
+        CHUNKED_UPLOAD_CHUNK_BYTES,
+        CHUNKED_UPLOAD_EXPIRE_SECONDS,
+    )
@@ -0,0 +1,167 @@
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+# Probe period while the database is answering
+DB_HEALTH_INTERVAL_SECONDS = float(os.getenv("DB_HEALTH_INTERVAL_SECONDS", "10"))
+DB_HEALTH_PROBE_TIMEOUT = float(os.getenv("DB_HEALTH_PROBE_TIMEOUT", "3"))
+# Consecutive failed probes before the API switches to memory fallback
+DB_HEALTH_FAILURE_THRESHOLD = int(os.getenv("DB_HEALTH_FAILURE_THRESHOLD", "3"))
+# Reconnect attempts in fallback back off exponentially between these bounds
+DB_RECONNECT_MIN_SECONDS = float(os.getenv("DB_RECONNECT_MIN_SECONDS", "1"))
+DB_RECONNECT_MAX_SECONDS = float(os.getenv("DB_RECONNECT_MAX_SECONDS", "60"))
+
+
+class DatabaseHealthMonitor:
+    """Keeps db_status in step with whether PostgreSQL actually answers.
+
+    A background task pings the database every interval, and straight away when a
+    request handler reports a lost connection. Only after `failure_threshold`
+    consecutive failed probes does the breaker open and db_status switch to memory
+    fallback; from then on the task retries with exponential backoff, replacing
+    the pools' connections, and switches back on the first success.
+    """
+
+    def __init__(
+        self,
+        db,
+        status: dict,
+        on_recover: Callable[[], Awaitable[None]],
+        interval: float,
+        probe_timeout: float,
+        failure_threshold: int,
+        min_backoff: float,
+        max_backoff: float,
+    ):
+        self.db = db
+        self.status = status
+        self.on_recover = on_recover
+        self.interval = interval
+        self.probe_timeout = probe_timeout
+        self.failure_threshold = max(failure_threshold, 1)
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.failures = 0
+        self.retries = 0
+        self.trips = 0
+        self.fallback_since: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.wake_event = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def breaker_open(self) -> bool:
+        return self.fallback_since is not None
+
+    def start(self):
+        if not self.status.get("connected"):
+            # Startup could not reach the database: begin in fallback and keep retrying
+            self.last_error = self.status.get("error")
+            self.open_breaker()
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    def report_failure(self, error: BaseException):
+        """A request lost its connection: probe now rather than at the next interval."""
+        self.last_error = str(error) or error.__class__.__name__
+        if not self.breaker_open:
+            self.wake_event.set()
+
+    def next_delay(self) -> float:
+        if self.breaker_open:
+            return min(self.min_backoff * 2**self.retries, self.max_backoff)
+        # Confirm a suspected outage quickly instead of waiting a full interval
+        return self.min_backoff if self.failures else self.interval
+
+    async def run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self.wake_event.wait(), timeout=self.next_delay())
+            except asyncio.TimeoutError:
+                pass
+            self.wake_event.clear()
+            await self.check()
+
+    async def probe(self):
+        if self.breaker_open:
+            # Connections opened before the outage are most likely dead
+            await self.db.reconnect()
+        await asyncio.wait_for(self.db.ping(), self.probe_timeout)
+
+    async def check(self):
+        try:
+            await self.probe()
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e) or e.__class__.__name__
+            if self.breaker_open:
+                self.retries += 1
+            elif self.failures >= self.failure_threshold:
+                self.open_breaker()
+            return
+
+        self.failures = 0
+        self.last_error = None
+        if self.breaker_open:
+            self.close_breaker()
+            try:
+                await self.on_recover()
+            except Exception as e:
+                print(f"Error resuming database work after reconnect: {e}")
+
+    def open_breaker(self):
+        self.fallback_since = time.time()
+        self.retries = 0
+        self.trips += 1
+        self.status.update({"connected": False, "error": self.last_error})
+        print(f"Database unreachable, serving from memory until it recovers: {self.last_error}")
+
+    def close_breaker(self):
+        print(f"Database reachable again after {time.time() - self.fallback_since:.1f}s in memory fallback")
+        self.fallback_since = None
+        self.retries = 0
+        self.status.update({"connected": True, "error": None})
+
+    @property
+    def mode(self) -> str:
+        if self.breaker_open:
+            return "memory-fallback"
+        return "degraded" if self.failures else "postgres"
+
+    def describe(self) -> dict:
+        return {
+            "mode": self.mode,
+            "consecutiveFailures": self.failures,
+            "fallbackSince": (
+                datetime.fromtimestamp(self.fallback_since, timezone.utc).isoformat()
+                if self.breaker_open
+                else None
+            ),
+            "fallbackSeconds": (
+                round(time.time() - self.fallback_since, 1) if self.breaker_open else None
+            ),
+            "breakerTrips": self.trips,
+        }
+
+
+def build_database_health_monitor(
+    db, status: dict, on_recover: Callable[[], Awaitable[None]]
+) -> DatabaseHealthMonitor:
+    return DatabaseHealthMonitor(
+        db,
+        status,
+        on_recover,
+        DB_HEALTH_INTERVAL_SECONDS,
+        DB_HEALTH_PROBE_TIMEOUT,
+        DB_HEALTH_FAILURE_THRESHOLD,
+        DB_RECONNECT_MIN_SECONDS,
+        DB_RECONNECT_MAX_SECONDS,
+    )
@@ -0,0 +1,486 @@
+import asyncio
+import os
+import random
+import time
+import uuid
+from collections import deque
+from typing import Callable, Optional
+
+DISPATCH_CHANNELS = ("sms", "call", "email")
+
+# Workers per channel in each process; 0 leaves that channel to other worker processes
+DISPATCH_WORKERS = {
+    "sms": int(os.getenv("DISPATCH_SMS_WORKERS", "2")),
+    "call": int(os.getenv("DISPATCH_CALL_WORKERS", "1")),
+    "email": int(os.getenv("DISPATCH_EMAIL_WORKERS", "1")),
+}
+# Recipients per second each channel may submit to the gateway (0 = unlimited)
+DISPATCH_RATE_LIMITS = {
+    "sms": float(os.getenv("DISPATCH_SMS_RATE", "50")),
+    "call": float(os.getenv("DISPATCH_CALL_RATE", "5")),
+    "email": float(os.getenv("DISPATCH_EMAIL_RATE", "20")),
+}
+# Gateway calls in flight per channel in this process
+DISPATCH_SEND_CONCURRENCY = int(os.getenv("DISPATCH_SEND_CONCURRENCY", "4"))
+DISPATCH_BATCH_SIZE = int(os.getenv("DISPATCH_BATCH_SIZE", "100"))
+DISPATCH_POLL_SECONDS = float(os.getenv("DISPATCH_POLL_SECONDS", "1"))
+DISPATCH_LEASE_SECONDS = float(os.getenv("DISPATCH_LEASE_SECONDS", "60"))
+DISPATCH_MAX_ATTEMPTS = int(os.getenv("DISPATCH_MAX_ATTEMPTS", "5"))
+DISPATCH_BACKOFF_BASE_SECONDS = float(os.getenv("DISPATCH_BACKOFF_BASE_SECONDS", "2"))
+# Offline gateways for development and tests: "stub" accepts everything, "fake" mimics a
+# throttled, batch-capable provider. Unset, no worker starts and actions stay queued.
+DISPATCH_GATEWAY = os.getenv("DISPATCH_GATEWAY", "").strip().lower()
+DISPATCH_STUB_FAILURE_RATE = float(os.getenv("DISPATCH_STUB_FAILURE_RATE", "0"))
+
+# Seconds of recent submissions the throughput figure is averaged over
+THROUGHPUT_WINDOW_SECONDS = 10.0
+
+
+class GatewayError(Exception):
+    """A delivery attempt the gateway rejected; the action is retried with backoff."""
+
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_take(self, count: int) -> bool:
+        if self.rate <= 0:
+            return True
+        self.refill()
+        if self.tokens < count:
+            return False
+        self.tokens -= count
+        return True
+
+    async def take(self, count: int) -> float:
+        """Wait until `count` tokens are available, take them, and return the seconds waited."""
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        # Callers queue on the lock, so throttled batches go out in arrival order
+        async with self.lock:
+            while not self.try_take(count):
+                delay = (count - self.tokens) / self.rate
+                await asyncio.sleep(delay)
+                waited += delay
+        return waited
+
+
+class StubGateway:
+    """Local stand-in for the SMS/voice/email providers.
+
+    Accepts every action after a short delay and reports it sent, never delivered,
+    since nothing reaches a recipient. A configurable fraction of attempts fails so
+    retries can be exercised offline.
+    """
+
+    name = "stub"
+    batch_limits = {"sms": 50, "call": 1, "email": 50}
+
+    def __init__(self, latency_seconds: float = 0.05, failure_rate: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self.failure_rate = failure_rate
+
+    async def send_batch(self, channel: str, actions: list[dict]) -> list:
+        await asyncio.sleep(self.latency_seconds)
+        return [
+            GatewayError(f"stub gateway rejected {channel} to {action['recipient']}")
+            if random.random() < self.failure_rate
+            else {"providerRef": f"stub-{uuid.uuid4().hex}", "status": "sent"}
+            for action in actions
+        ]
+
+
+class FakeProvider:
+    """Offline provider that enforces its own per-channel rate limits and batch sizes.
+
+    Submissions beyond the allowed rate are rejected like an HTTP 429, so a sender
+    that outruns its token bucket shows up as `rejected` in the provider counters.
+    Calls are only ever "sent"; SMS and email report delivery straight away.
+    """
+
+    name = "fake"
+    batch_limits = {"sms": 100, "call": 1, "email": 50}
+
+    def __init__(self, rate_limits: dict[str, float], latency_seconds: float = 0.05):
+        self.latency_seconds = latency_seconds
+        self.buckets = {
+            channel: TokenBucket(rate, max(rate, 1.0)) for channel, rate in rate_limits.items()
+        }
+        self.counters = {
+            channel: {"calls": 0, "recipients": 0, "rejected": 0} for channel in rate_limits
+        }
+
+    async def send_batch(self, channel: str, actions: list[dict]) -> list:
+        counters = self.counters[channel]
+        counters["calls"] += 1
+        if len(actions) > self.batch_limits[channel] or not self.buckets[channel].try_take(len(actions)):
+            counters["rejected"] += len(actions)
+            raise GatewayError(f"429 {channel} rate limit exceeded")
+
+        await asyncio.sleep(self.latency_seconds)
+        counters["recipients"] += len(actions)
+        status = "sent" if channel == "call" else "delivered"
+        return [{"providerRef": f"fake-{uuid.uuid4().hex}", "status": status} for _ in actions]
+
+
+class ChannelSender:
+    """Submits one channel's actions to the gateway in provider-sized, rate-limited batches."""
+
+    def __init__(self, channel: str, gateway, rate_per_second: float, concurrency: int):
+        self.channel = channel
+        self.gateway = gateway
+        self.rate_per_second = rate_per_second
+        # A burst of one second's worth; batches never exceed what the bucket can hold
+        capacity = max(rate_per_second, 1.0)
+        self.bucket = TokenBucket(rate_per_second, capacity)
+        self.batch_size = gateway.batch_limits.get(channel, 1)
+        if rate_per_second > 0:
+            self.batch_size = max(1, min(self.batch_size, int(capacity)))
+        self.semaphore = asyncio.Semaphore(max(1, concurrency))
+        self.metrics = {"recipients": 0, "providerCalls": 0, "errors": 0, "throttledSeconds": 0.0}
+        self.recent: "deque[tuple[float, int]]" = deque()
+
+    async def submit(self, actions: list[dict]) -> list:
+        """Send every action; returns a gateway result or an exception per action, in order."""
+        batches = [
+            actions[start:start + self.batch_size]
+            for start in range(0, len(actions), self.batch_size)
+        ]
+        results = await asyncio.gather(*(self.send(batch) for batch in batches))
+        return [result for batch_results in results for result in batch_results]
+
+    async def send(self, batch: list[dict]) -> list:
+        async with self.semaphore:
+            self.metrics["throttledSeconds"] += await self.bucket.take(len(batch))
+            self.metrics["providerCalls"] += 1
+            try:
+                results = await self.gateway.send_batch(self.channel, batch)
+            except Exception as e:
+                results = [e] * len(batch)
+
+        errors = sum(isinstance(result, Exception) for result in results)
+        self.metrics["errors"] += errors
+        self.metrics["recipients"] += len(batch) - errors
+        self.recent.append((time.monotonic(), len(batch) - errors))
+        return results
+
+    def throughput(self) -> float:
+        cutoff = time.monotonic() - THROUGHPUT_WINDOW_SECONDS
+        while self.recent and self.recent[0][0] < cutoff:
+            self.recent.popleft()
+        return sum(count for _, count in self.recent) / THROUGHPUT_WINDOW_SECONDS
+
+    def describe(self) -> dict:
+        return {
+            **self.metrics,
+            "throttledSeconds": round(self.metrics["throttledSeconds"], 3),
+            "ratePerSecond": self.rate_per_second,
+            "batchSize": self.batch_size,
+            "recipientsPerSecond": round(self.throughput(), 2),
+        }
+
+
+class DispatchQueue:
+    """Delivers queued alert_actions through per-channel senders and worker pools.
+
+    Workers claim rows with FOR UPDATE SKIP LOCKED and lease them by moving them to
+    'sending' until next_attempt_at, so any number of worker processes can share
+    the table and a crashed worker's rows are picked up again once the lease expires.
+    """
+
+    def __init__(
+        self,
+        db,
+        senders: dict[str, ChannelSender],
+        workers_per_channel: dict[str, int],
+        batch_size: int = 100,
+        poll_seconds: float = 1.0,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 5,
+        backoff_base_seconds: float = 2.0,
+        backoff_max_seconds: float = 300.0,
+        on_change: Optional[Callable[[], None]] = None,
+    ):
+        self.db = db
+        # Empty when no gateway is configured; start() then refuses to run workers
+        self.senders = senders
+        self.workers_per_channel = workers_per_channel
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.backoff_base_seconds = backoff_base_seconds
+        self.backoff_max_seconds = backoff_max_seconds
+        self.on_change = on_change
+        self.tasks: list[asyncio.Task] = []
+        self.wake_events = {channel: asyncio.Event() for channel in workers_per_channel}
+        self.stats = {
+            channel: {"sent": 0, "delivered": 0, "retried": 0, "failed": 0, "leaseLost": 0}
+            for channel in workers_per_channel
+        }
+        # Polled by every worker, so it is prepared on each pooled connection up front
+        self.claim_statement = db.statement(
+            "dispatch_claim",
+            """
+            UPDATE alert_actions AS a
+            SET status = 'sending',
+                attempts = a.attempts + 1,
+                next_attempt_at = NOW() + make_interval(secs => $3)
+            WHERE a.id IN (
+                SELECT id
+                FROM alert_actions
+                WHERE channel = $1
+                  AND status IN ('queued', 'sending')
+                  AND next_attempt_at <= NOW()
+                ORDER BY next_attempt_at
+                LIMIT $2
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING a.id, a.student_id, a.channel, a.recipient, a.message, a.attempts
+            """,
+        )
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self.tasks)
+
+    @property
+    def gateway(self):
+        return next(iter(self.senders.values())).gateway if self.senders else None
+
+    def start(self):
+        if self.gateway is None:
+            print("Dispatch workers not started: set DISPATCH_GATEWAY; alert actions stay queued")
+            return
+        for channel, worker_count in self.workers_per_channel.items():
+            for _ in range(worker_count):
+                self.tasks.append(asyncio.create_task(self.run_worker(channel)))
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+
+    def wake(self):
+        """Let idle workers pick up newly queued actions without waiting for the next poll."""
+        for event in self.wake_events.values():
+            event.set()
+
+    def backoff_seconds(self, attempts: int) -> float:
+        delay = min(self.backoff_base_seconds * 2 ** (attempts - 1), self.backoff_max_seconds)
+        return delay * random.uniform(0.5, 1.0)
+
+    def claim_limit(self, channel: str) -> int:
+        # Never lease more than the rate limit lets this worker send before the lease runs out
+        rate = self.senders[channel].rate_per_second
+        if rate <= 0:
+            return self.batch_size
+        return max(1, min(self.batch_size, int(rate * self.lease_seconds / 2)))
+
+    async def claim(self, channel: str) -> list[dict]:
+        return await self.db.fetch(
+            self.claim_statement,
+            channel,
+            self.claim_limit(channel),
+            float(self.lease_seconds),
+        )
+
+    async def deliver(self, channel: str, actions: list[dict]):
+        # Actions without a recipient fail outright: retrying cannot help until a
+        # contact is recorded for the parent
+        failed = [
+            (action["id"], action["attempts"], f"no {channel} recipient on file")
+            for action in actions
+            if not action.get("recipient")
+        ]
+        sendable = [action for action in actions if action.get("recipient")]
+        results = await self.senders[channel].submit(sendable) if sendable else []
+
+        completed: list[tuple[int, int, str, Optional[str]]] = []
+        retried: list[tuple[int, int, str, float]] = []
+        for action, result in zip(sendable, results):
+            if not isinstance(result, Exception):
+                status = "delivered" if result.get("status") == "delivered" else "sent"
+                completed.append((action["id"], action["attempts"], status, result.get("providerRef")))
+            elif action["attempts"] >= self.max_attempts:
+                failed.append((action["id"], action["attempts"], str(result)))
+            else:
+                retried.append(
+                    (action["id"], action["attempts"], str(result), self.backoff_seconds(action["attempts"]))
+                )
+
+        # One set-based UPDATE per outcome for the whole claimed batch, committed together.
+        # Each claim bumps attempts, so status 'sending' plus the claimed attempts count is
+        # the lease: once it expires and another worker re-claims the row, this outcome no
+        # longer matches and is dropped instead of overwriting the newer claim's.
+        if not (completed or retried or failed):
+            return
+        async with self.db.transaction() as session:
+            written_statuses: list[str] = []
+            if completed:
+                written_statuses += [
+                    row["status"]
+                    for row in await session.fetch(
+                        """
+                        UPDATE alert_actions AS a
+                        SET status = r.status,
+                            provider_ref = r.provider_ref,
+                            last_error = NULL,
+                            sent_at = NOW(),
+                            delivered_at = CASE WHEN r.status = 'delivered' THEN NOW() END
+                        FROM unnest($1::int[], $2::int[], $3::varchar[], $4::varchar[])
+                            AS r(id, attempts, status, provider_ref)
+                        WHERE a.id = r.id AND a.status = 'sending' AND a.attempts = r.attempts
+                        RETURNING a.status
+                        """,
+                        *map(list, zip(*completed)),
+                    )
+                ]
+            if retried:
+                written_statuses += [
+                    "retried"
+                    for _ in await session.fetch(
+                        """
+                        UPDATE alert_actions AS a
+                        SET status = 'queued',
+                            last_error = r.error,
+                            next_attempt_at = NOW() + make_interval(secs => r.delay)
+                        FROM unnest($1::int[], $2::int[], $3::text[], $4::float8[])
+                            AS r(id, attempts, error, delay)
+                        WHERE a.id = r.id AND a.status = 'sending' AND a.attempts = r.attempts
+                        RETURNING a.id
+                        """,
+                        *map(list, zip(*retried)),
+                    )
+                ]
+            if failed:
+                written_statuses += [
+                    "failed"
+                    for _ in await session.fetch(
+                        """
+                        UPDATE alert_actions AS a
+                        SET status = 'failed', last_error = r.error
+                        FROM unnest($1::int[], $2::int[], $3::text[]) AS r(id, attempts, error)
+                        WHERE a.id = r.id AND a.status = 'sending' AND a.attempts = r.attempts
+                        RETURNING a.id
+                        """,
+                        *map(list, zip(*failed)),
+                    )
+                ]
+
+        for status in written_statuses:
+            self.stats[channel][status] += 1
+        self.stats[channel]["leaseLost"] += len(completed) + len(retried) + len(failed) - len(
+            written_statuses
+        )
+
+    async def run_worker(self, channel: str):
+        wake_event = self.wake_events[channel]
+        while True:
+            try:
+                actions = await self.claim(channel)
+                if actions:
+                    await self.deliver(channel, actions)
+                    if self.on_change is not None:
+                        self.on_change()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Dispatch worker ({channel}) error: {e}")
+                actions = []
+
+            if len(actions) < self.claim_limit(channel):
+                try:
+                    await asyncio.wait_for(wake_event.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                wake_event.clear()
+
+    async def record_receipt(self, provider_ref: str, delivered: bool, error: Optional[str] = None) -> bool:
+        """Apply a provider delivery receipt to a sent action; False if the reference is unknown."""
+        updated = await self.db.fetchval(
+            """
+            UPDATE alert_actions
+            SET status = CASE WHEN $2 THEN 'delivered' ELSE 'failed' END,
+                delivered_at = CASE WHEN $2 THEN NOW() END,
+                last_error = $3
+            WHERE provider_ref = $1 AND status IN ('sent', 'delivered')
+            RETURNING id
+            """,
+            provider_ref,
+            delivered,
+            error,
+        )
+        if updated is not None and self.on_change is not None:
+            self.on_change()
+        return updated is not None
+
+    async def describe(self) -> dict:
+        rows = await self.db.fetch(
+            """
+            SELECT channel, status, COUNT(*) AS total
+            FROM alert_actions
+            GROUP BY channel, status
+            """
+        )
+        queue: dict[str, dict[str, int]] = {}
+        for row in rows:
+            queue.setdefault(row["channel"], {})[row["status"]] = row["total"]
+        return {
+            "gateway": self.gateway.name if self.gateway is not None else None,
+            "running": self.running,
+            "workers": self.workers_per_channel,
+            "queue": queue,
+            "processed": self.stats,
+            "senders": {channel: sender.describe() for channel, sender in self.senders.items()},
+        }
+
+
+def build_gateway():
+    if DISPATCH_GATEWAY == "fake":
+        return FakeProvider(DISPATCH_RATE_LIMITS)
+    if DISPATCH_GATEWAY == "stub":
+        return StubGateway(failure_rate=DISPATCH_STUB_FAILURE_RATE)
+    if DISPATCH_GATEWAY:
+        print(f"Unknown DISPATCH_GATEWAY {DISPATCH_GATEWAY!r}; alert actions will not be sent")
+    return None
+
+
+def build_senders(gateway) -> dict[str, ChannelSender]:
+    if gateway is None:
+        return {}
+    return {
+        channel: ChannelSender(
+            channel, gateway, DISPATCH_RATE_LIMITS[channel], DISPATCH_SEND_CONCURRENCY
+        )
+        for channel in DISPATCH_CHANNELS
+    }
+
+
+def build_dispatch_queue(db, on_change: Optional[Callable[[], None]] = None) -> DispatchQueue:
+    return DispatchQueue(
+        db,
+        build_senders(build_gateway()),
+        {channel: max(0, count) for channel, count in DISPATCH_WORKERS.items()},
+        batch_size=DISPATCH_BATCH_SIZE,
+        poll_seconds=DISPATCH_POLL_SECONDS,
+        lease_seconds=DISPATCH_LEASE_SECONDS,
+        max_attempts=DISPATCH_MAX_ATTEMPTS,
+        backoff_base_seconds=DISPATCH_BACKOFF_BASE_SECONDS,
+        on_change=on_change,
+    )
@@ -0,0 +1,33 @@
+import asyncio
+
+from backend.database import Database
+from backend.dispatch import build_dispatch_queue
+
+# Deliver queued alert actions from a separate process; run as many as needed.
+# Run from the project root: python -m backend.dispatch_worker
+
+
+async def main():
+    db = Database()
+    # Built first so its statements are prepared as the pool opens connections
+    queue = build_dispatch_queue(db)
+    if queue.gateway is None:
+        raise SystemExit("No gateway to deliver through: set DISPATCH_GATEWAY")
+    status = await db.initialize()
+    if not status.get("connected"):
+        raise SystemExit(f"Database unavailable: {status.get('error')}")
+
+    queue.start()
+    print(f"Dispatch workers started: {queue.workers_per_channel}")
+    try:
+        await asyncio.gather(*queue.tasks)
+    finally:
+        await queue.stop()
+        await db.close()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
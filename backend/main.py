@@ -1,20 +1,45 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
 from pydantic import BaseModel
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, BinaryIO, Iterable, Iterator, Optional
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import codecs
 import hashlib
 import io
 import csv
+import itertools
 import json
+import multiprocessing
 import os
 import re
 import secrets
+import shutil
+import tempfile
 import urllib.request
 import urllib.parse
+import uuid
+import zlib
+from collections import OrderedDict
 from hmac import compare_digest
 from dotenv import load_dotenv
-from backend.database import Database
+from backend.analysis_cache import MemoryAnalysisCache, PostgresAnalysisCache
+from backend.chunked_uploads import ChunkedUploadError, build_chunked_upload_store
+from backend.database import (
+    Database,
+    DB_STATEMENT_CACHE_SIZE,
+    READ_CACHE_CHANNEL,
+    error_http_status,
+    is_connection_error,
+)
+from backend.db_health import build_database_health_monitor
+from backend.dispatch import build_dispatch_queue
+from backend.response_cache import CachedResponse, ResponseCache
+from backend.upload_jobs import build_upload_job_queue
 from pathlib import Path
 
 try:
@@ -27,10 +52,122 @@ try:
 except Exception:
     PdfReader = None
 
+try:
+    import httpx
+except Exception:
+    httpx = None
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
 # Load environment variables from project root .env
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 load_dotenv(PROJECT_ROOT / ".env")
 
+# Uploads are consumed as a stream of fixed-size record batches
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "1000"))
+ENCODING_SNIFF_BYTES = 64 * 1024
+# PDF and TXT uploads are read in chunks of this size and only summarized, never held whole
+TEXT_READ_CHUNK_BYTES = 1024 * 1024
+TEXT_PREVIEW_CHARS = 2500
+FALLBACK_TEXT_ENCODING = "latin-1"
+AI_SAMPLE_ROWS = 40
+AI_REQUEST_TIMEOUT_SECONDS = 30
+# How long an upload waits for AI enrichment before answering with the rule-based result
+AI_LATENCY_BUDGET_SECONDS = float(os.getenv("AI_LATENCY_BUDGET_SECONDS", "8"))
+AI_FOLLOWUP_LIMIT = 200
+RULE_BASED_MODEL_NAME = "Rule-Enhanced Analyzer"
+# A high-risk student is not alerted again while their arrears match their last alert this recent
+ALERT_DEDUPE_WINDOW_HOURS = float(os.getenv("ALERT_DEDUPE_WINDOW_HOURS", "168"))
+
+ANALYTICS_DEFAULT_TREND_DAYS = 30
+# Summary responses flag a full rollup rebuild as overdue once the last one is older than this.
+# Triggers keep the rollups current between rebuilds, so this is a maintenance hint, not drift.
+ROLLUP_REBUILD_OVERDUE_SECONDS = int(os.getenv("ROLLUP_REBUILD_OVERDUE_SECONDS", str(7 * 24 * 3600)))
+
+NOTIFICATION_PAGE_DEFAULT_LIMIT = 100
+NOTIFICATION_PAGE_MAX_LIMIT = 1000
+
+# /api/students keyset pages and the columns a caller may project
+STUDENT_PAGE_DEFAULT_LIMIT = 100
+STUDENT_PAGE_MAX_LIMIT = 1000
+STUDENT_LIST_FIELDS = (
+    "id",
+    "roll_no",
+    "name",
+    "department",
+    "semester",
+    "email",
+    "phone",
+    "arrears_count",
+    "parent_phone",
+    "parent_email",
+    "photo_url",
+    "is_active",
+    "created_at",
+    "updated_at",
+)
+STUDENT_LIST_DEFAULT_FIELDS = (
+    "id",
+    "roll_no",
+    "name",
+    "department",
+    "semester",
+    "arrears_count",
+    "parent_phone",
+    "parent_email",
+    "photo_url",
+    "created_at",
+)
+UPLOAD_READ_CHUNK_BYTES = 1024 * 1024
+
+# Exports stream from a server-side cursor, this many rows per fetch and per chunk
+EXPORT_FETCH_ROWS = int(os.getenv("EXPORT_FETCH_ROWS", "1000"))
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+NOTIFICATION_EXPORT_FIELDS = (
+    "id",
+    "student_id",
+    "roll_no",
+    "student_name",
+    "department",
+    "semester",
+    "message",
+    "status",
+    "notification_type",
+    "priority",
+    "severity",
+    "sent_at",
+    "created_at",
+)
+
+# Analysis results cached by file hash + model; "postgres" falls back to memory without a DB
+ANALYSIS_CACHE_BACKEND = os.getenv("ANALYSIS_CACHE_BACKEND", "postgres").strip().lower()
+ANALYSIS_CACHE_TTL_SECONDS = float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", "3600"))
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "256"))
+
+# Hot GET responses are cached briefly and dropped whenever the underlying tables change
+READ_CACHE_TTL_SECONDS = float(os.getenv("READ_CACHE_TTL_SECONDS", "5"))
+READ_CACHE_MAX_ENTRIES = int(os.getenv("READ_CACHE_MAX_ENTRIES", "512"))
+READ_CACHE_LISTEN = os.getenv("READ_CACHE_LISTEN", "1").strip().lower() not in {"0", "false", "no"}
+# "standard" encodes via jsonable_encoder, "orjson" encodes rows directly, and "postgres"
+# also has Postgres render list pages with json_agg and passes the text through
+JSON_RESPONSE_MODE = os.getenv("JSON_RESPONSE_MODE", "standard").strip().lower()
+# Cached scopes that depend on each table
+READ_CACHE_TABLE_SCOPES = {
+    "students": ("students", "notifications", "profile"),
+    "notifications": ("notifications", "profile"),
+    "alert_actions": ("profile",),
+}
+
+# Deliver queued alert actions from this process; workers per channel are set in backend/dispatch.py
+DISPATCH_ENABLED = os.getenv("DISPATCH_ENABLED", "1").strip().lower() not in {"0", "false", "no"}
+
+# Uploads admitted at once; PDF text extraction runs on a small process pool
+UPLOAD_CONCURRENCY = max(1, int(os.getenv("UPLOAD_CONCURRENCY", "2")))
+PARSE_POOL_WORKERS = max(1, int(os.getenv("PARSE_POOL_WORKERS", "2")))
+
 app = FastAPI(title="APNS Backend", version="1.0.0")
 
 # CORS configuration
@@ -40,12 +177,35 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Cache"],
 )
 
 # Database initialization
 db = Database()
 db_status = {"connected": False, "error": None}
 
+upload_semaphore = asyncio.Semaphore(UPLOAD_CONCURRENCY)
+parse_pool: Optional[ProcessPoolExecutor] = None
+ai_http_client = None
+ai_followups: "OrderedDict[str, dict]" = OrderedDict()
+
+memory_analysis_cache = MemoryAnalysisCache(
+    ANALYSIS_CACHE_TTL_SECONDS, ANALYSIS_CACHE_MAX_ENTRIES
+)
+postgres_analysis_cache = PostgresAnalysisCache(
+    db, ANALYSIS_CACHE_TTL_SECONDS, ANALYSIS_CACHE_MAX_ENTRIES
+)
+response_cache = ResponseCache(READ_CACHE_TTL_SECONDS, READ_CACHE_MAX_ENTRIES)
+dispatch_queue = build_dispatch_queue(
+    db, on_change=lambda: invalidate_read_cache("alert_actions")
+)
+chunked_uploads = build_chunked_upload_store()
+upload_jobs = build_upload_job_queue(
+    db,
+    runner=lambda job, progress: run_upload_job(job, progress),
+    is_connected=lambda: db_status.get("connected", False),
+)
+
 # In-memory fallback data
 memory_state = {
     "next_student_id": 4,
@@ -80,26 +240,67 @@ memory_state = {
 }
 
 
+def report_db_error(error: Exception):
+    """Have the health monitor check a lost connection; a failed statement is left alone"""
+    if is_connection_error(error):
+        db_monitor.report_failure(error)
+
+
+def db_http_error(error: Exception, detail: str) -> HTTPException:
+    """Turn a failed statement into an HTTP error; the caller's own mistakes say what was wrong"""
+    status_code = error_http_status(error)
+    if status_code in (400, 409):
+        # The primary message only: the DETAIL line can echo the whole rejected row
+        detail = f"{detail}: {getattr(error, 'message', None) or error}"
+    return HTTPException(status_code=status_code, detail=detail)
+
+
+async def start_database_work():
+    """Start everything that needs PostgreSQL; run at startup and again after an outage"""
+    if READ_CACHE_LISTEN and response_cache.enabled and not db.listening:
+        try:
+            await db.listen(READ_CACHE_CHANNEL, invalidate_read_cache)
+        except Exception as e:
+            print(f"Read cache LISTEN unavailable, relying on local invalidation: {e}")
+    # Responses cached during an outage were built from memory_state
+    invalidate_read_cache(*READ_CACHE_TABLE_SCOPES)
+    if DISPATCH_ENABLED and not dispatch_queue.running:
+        dispatch_queue.start()
+    if not upload_jobs.running:
+        upload_jobs.start()
+
+
+db_monitor = build_database_health_monitor(db, db_status, start_database_work)
+
+
 # Initialize database on startup
 @app.on_event("startup")
 async def startup_event():
-    global db_status
     try:
-        db_status = await db.initialize()
+        db_status.update(await db.initialize())
 
         if db_status.get("connected"):
             await db.fetchval("SELECT 1")
+            await start_database_work()
 
         hash_password("startup_warmup_password")
         print(f"Database status: {db_status}")
     except Exception as e:
-        db_status = {"connected": False, "error": str(e)}
+        db_status.update({"connected": False, "error": str(e)})
         print(f"Database initialization error: {e}")
+    db_monitor.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    await db_monitor.stop()
+    await dispatch_queue.stop()
+    await upload_jobs.stop()
     await db.close()
+    if ai_http_client is not None:
+        await ai_http_client.aclose()
+    if parse_pool is not None:
+        parse_pool.shutdown(wait=False, cancel_futures=True)
 
 
 # Pydantic models
@@ -121,6 +322,10 @@ class HealthResponse(BaseModel):
     dbConnected: bool
     mode: str
     dbError: Optional[str] = None
+    consecutiveFailures: int = 0
+    fallbackSince: Optional[str] = None
+    fallbackSeconds: Optional[float] = None
+    breakerTrips: int = 0
 
 
 class RegisterRequest(BaseModel):
@@ -145,6 +350,10 @@ class DocumentAnalysisResponse(BaseModel):
     summary: str
     topFindings: list[str]
     usedAI: bool
+    columnMapping: dict[str, Optional[str]] = {}
+    recordChanges: dict[str, int] = {}
+    aiJobId: Optional[str] = None
+    cacheHit: bool = False
 
 
 class AlertAction(BaseModel):
@@ -156,13 +365,34 @@ class AlertAction(BaseModel):
     status: Optional[str] = "queued"
 
 
+class DispatchReceipt(BaseModel):
+    providerRef: str
+    delivered: bool = True
+    error: Optional[str] = None
+
+
+class ChunkedUploadRequest(BaseModel):
+    fileName: str
+    size: int
+    sha256: str
+
+
 class StudentContactActionRequest(BaseModel):
     channel: str
     recipient: Optional[str] = None
     message: Optional[str] = None
 
 
-# Helper function for severity calculation
+# Helper function for severity calculation; SEVERITY_SQL is the same rule for queries
+SEVERITY_SQL = """
+    CASE
+        WHEN s.semester >= 6 THEN 'Critical'
+        WHEN s.semester >= 4 THEN 'Medium'
+        ELSE 'Low'
+    END
+"""
+
+
 def severity_from_semester(semester: Optional[int]) -> str:
     if semester is None:
         return "Low"
@@ -210,82 +440,288 @@ def normalize_column_name(name: str) -> str:
     return re.sub(r"[^a-z0-9]", "", (name or "").strip().lower())
 
 
-def parse_csv_records(content: bytes) -> list[dict]:
-    for encoding in ["utf-8-sig", "utf-8", "latin-1"]:
+def sniff_text_encoding(stream: BinaryIO) -> str:
+    """Guess the text encoding from the head of the upload, then rewind."""
+    sample = stream.read(ENCODING_SNIFF_BYTES)
+    stream.seek(0)
+    try:
+        # Incremental decode so a multi-byte character cut at the sample edge is not an error.
+        codecs.getincrementaldecoder("utf-8-sig")().decode(sample, final=False)
+        return "utf-8-sig"
+    except UnicodeDecodeError:
+        return FALLBACK_TEXT_ENCODING
+
+
+def iter_csv_records(stream: BinaryIO) -> Iterator[dict]:
+    encoding = sniff_text_encoding(stream)
+    fieldnames = None
+    rows_read = 0
+    while True:
+        if encoding == FALLBACK_TEXT_ENCODING:
+            # Start past any UTF-8 BOM, which latin-1 would make part of the first header
+            stream.seek(0)
+            stream.seek(len(codecs.BOM_UTF8) if stream.read(len(codecs.BOM_UTF8)) == codecs.BOM_UTF8 else 0)
+        text_stream = io.TextIOWrapper(stream, encoding=encoding, errors="strict", newline="")
         try:
-            text = content.decode(encoding)
-            break
+            # A re-read keeps the first pass's header, so its rows match the compiled schema
+            reader = csv.DictReader(text_stream, fieldnames=fieldnames)
+            if fieldnames is None:
+                fieldnames = reader.fieldnames
+            else:
+                next(reader, None)
+            for index, row in enumerate(reader):
+                # After a fallback re-read, skip the rows already handed out
+                if index < rows_read:
+                    continue
+                rows_read += 1
+                if any((value or "").strip() for value in row.values() if isinstance(value, str)):
+                    yield dict(row)
+            return
         except UnicodeDecodeError:
-            text = ""
-            continue
-    if not text:
-        return []
-
-    reader = csv.DictReader(io.StringIO(text))
-    return [dict(row) for row in reader if any((value or "").strip() for value in row.values())]
-
-
-def parse_xlsx_records(content: bytes) -> list[dict]:
+            # The sniffed head was UTF-8 but a later byte is not: re-read the rest as latin-1,
+            # which decodes any byte. Delimiters are ASCII, so row boundaries line up.
+            if encoding == FALLBACK_TEXT_ENCODING:
+                raise
+            encoding = FALLBACK_TEXT_ENCODING
+        finally:
+            # Hand the spooled file back to UploadFile instead of closing it with the wrapper;
+            # a cancelled background job may already have closed it.
+            if not stream.closed:
+                text_stream.detach()
+
+
+def iter_xlsx_records(stream: BinaryIO) -> Iterator[dict]:
     if load_workbook is None:
         raise HTTPException(
             status_code=500,
             detail="XLSX support unavailable. Install openpyxl in backend environment.",
         )
 
-    workbook = load_workbook(io.BytesIO(content), data_only=True)
-    sheet = workbook.active
-    rows = list(sheet.iter_rows(values_only=True))
-    if not rows:
-        return []
-
-    header = [str(item).strip() if item is not None else "" for item in rows[0]]
-    records: list[dict] = []
-    for row in rows[1:]:
-        record = {
-            header[index] if header[index] else f"column_{index + 1}": (
-                "" if value is None else str(value)
-            )
-            for index, value in enumerate(row)
-        }
-        if any(str(value).strip() for value in record.values()):
-            records.append(record)
-    return records
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        first_row = next(rows, None)
+        if first_row is None:
+            return
+
+        header = [str(item).strip() if item is not None else "" for item in first_row]
+        for row in rows:
+            record = {
+                (
+                    header[index]
+                    if index < len(header) and header[index]
+                    else f"column_{index + 1}"
+                ): ("" if value is None else str(value))
+                for index, value in enumerate(row)
+            }
+            if any(str(value).strip() for value in record.values()):
+                yield record
+    finally:
+        workbook.close()
+
+
+def iter_record_batches(
+    records: Iterable[dict], batch_size: int = INGEST_BATCH_SIZE
+) -> Iterator[list[dict]]:
+    batch: list[dict] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    global parse_pool
+    if parse_pool is None:
+        # spawn: forking a process that runs an event loop and worker threads is unsafe
+        parse_pool = ProcessPoolExecutor(
+            max_workers=PARSE_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return parse_pool
+
+
+async def run_in_parse_pool(func, *args):
+    """Run CPU-bound parsing on the bounded process pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_parse_pool(), func, *args)
+
+
+async def iter_in_thread(iterator: Iterator) -> AsyncIterator:
+    """Advance a blocking iterator on a worker thread so the event loop stays free."""
+    exhausted = object()
+    while True:
+        item = await asyncio.to_thread(next, iterator, exhausted)
+        if item is exhausted:
+            return
+        yield item
 
 
-def parse_pdf_text(content: bytes) -> str:
+async def signal_when_exhausted(items: AsyncIterator, done: asyncio.Event) -> AsyncIterator:
+    async for item in items:
+        yield item
+    done.set()
+
+
+def hash_upload_content(stream: BinaryIO) -> str:
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: stream.read(UPLOAD_READ_CHUNK_BYTES), b""):
+        digest.update(chunk)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+def upload_size(file: UploadFile) -> int:
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    return size
+
+
+def require_pdf_support() -> None:
     if PdfReader is None:
         raise HTTPException(
             status_code=500,
             detail="PDF support unavailable. Install pypdf in backend environment.",
         )
 
-    reader = PdfReader(io.BytesIO(content))
-    text_chunks = []
-    for page in reader.pages:
-        text_chunks.append(page.extract_text() or "")
-    return "\n".join(text_chunks).strip()
-
-
-def extract_arrear_count(record: dict) -> int:
-    aliases = {
-        "arrears",
-        "arrearcount",
-        "arrearscount",
-        "subjectarrears",
-        "currentarrears",
-        "backlogs",
-        "failedsubjects",
-        "duepapers",
-    }
 
-    normalized_map = {
-        normalize_column_name(key): value for key, value in record.items()
+def new_text_summary() -> dict:
+    return {"chars": 0, "words": 0, "numbers": 0, "preview": ""}
+
+
+def summarize_text(chunks: Iterable[str]) -> dict:
+    """Count words and numbers and keep a preview, one chunk of text at a time."""
+    summary = new_text_summary()
+    carry = ""
+    for chunk in chunks:
+        summary["chars"] += len(chunk)
+        if len(summary["preview"]) < TEXT_PREVIEW_CHARS:
+            preview = summary["preview"] + (chunk if summary["preview"] else chunk.lstrip())
+            summary["preview"] = preview[:TEXT_PREVIEW_CHARS]
+        text = carry + chunk
+        # A word cut at the chunk edge is counted with the next chunk
+        carry = "" if not text or text[-1].isspace() else text.split()[-1]
+        complete = text[: len(text) - len(carry)]
+        summary["words"] += len(complete.split())
+        summary["numbers"] += len(re.findall(r"\d+", complete))
+    summary["words"] += len(carry.split())
+    summary["numbers"] += len(re.findall(r"\d+", carry))
+    return summary
+
+
+def iter_text_chunks(stream: BinaryIO) -> Iterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+    while chunk := stream.read(TEXT_READ_CHUNK_BYTES):
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+
+def summarize_pdf_text(path: str) -> dict:
+    """Extract and summarize PDF text; runs inside the parse process pool."""
+    # An open file, not the path: given a path, pypdf reads the whole file into memory
+    with open(path, "rb") as source:
+        reader = PdfReader(source)
+        summary = summarize_text(
+            f"{chunk}\n" if index < len(reader.pages) - 1 else chunk
+            for index, chunk in enumerate(page.extract_text() or "" for page in reader.pages)
+        )
+    # Pages with nothing but whitespace count as no text, as before
+    if not summary["words"]:
+        summary["chars"] = 0
+    return summary
+
+
+def spool_to_temp_file(stream: BinaryIO, suffix: str) -> str:
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as target:
+        shutil.copyfileobj(stream, target, TEXT_READ_CHUNK_BYTES)
+    return target.name
+
+
+async def summarize_pdf_upload(stream: BinaryIO) -> dict:
+    """Hand the parse pool a file path, so the PDF bytes never cross into it or sit in memory"""
+    path = getattr(stream, "name", None)
+    if isinstance(path, str) and os.path.isfile(path):
+        return await run_in_parse_pool(summarize_pdf_text, path)
+
+    # An upload still in UploadFile's spooled buffer goes to disk first
+    path = await asyncio.to_thread(spool_to_temp_file, stream, ".pdf")
+    try:
+        return await run_in_parse_pool(summarize_pdf_text, path)
+    finally:
+        os.remove(path)
+
+
+# Normalized header aliases per student field, in lookup priority order
+STUDENT_FIELD_ALIASES = {
+    "roll_no": ("rollno", "registerno", "regno", "studentid", "studentroll", "id"),
+    "name": ("name", "studentname", "fullname"),
+    "department": ("department", "dept", "branch"),
+    "semester": ("semester", "sem", "currentsemester"),
+    "email": ("email", "studentemail"),
+    "phone": ("phone", "studentphone", "mobileno"),
+    "parent_email": ("parentemail", "fatheremail", "motheremail", "guardianemail"),
+    "parent_phone": ("parentphone", "fatherphone", "motherphone", "guardianphone"),
+    "photo_url": ("photo", "photourl", "image", "imageurl", "avatar", "profilephoto"),
+}
+
+ARREAR_COLUMN_ALIASES = (
+    "arrears",
+    "arrearcount",
+    "arrearscount",
+    "subjectarrears",
+    "currentarrears",
+    "backlogs",
+    "failedsubjects",
+    "duepapers",
+)
+
+
+def compile_record_schema(columns: Iterable[Optional[str]]) -> dict[str, tuple[str, ...]]:
+    """Resolve the alias sets against a file header once, instead of on every row.
+
+    Each field maps to the header keys that can supply it, in alias priority order.
+    The arrears field keeps only its first match; an empty tuple means the per-row
+    numeric fallback applies.
+    """
+    keys_by_alias: dict[str, str] = {}
+    for column in columns:
+        if column is not None:
+            # Later duplicate headers win, as they did when rows were normalized one by one
+            keys_by_alias[normalize_column_name(column)] = column
+
+    schema = {
+        field: tuple(keys_by_alias[alias] for alias in aliases if alias in keys_by_alias)
+        for field, aliases in STUDENT_FIELD_ALIASES.items()
     }
-    for alias in aliases:
-        if alias in normalized_map:
-            raw_value = str(normalized_map[alias] or "").strip()
-            match = re.search(r"\d+", raw_value)
-            return int(match.group()) if match else 0
+    schema["arrears_count"] = next(
+        ((keys_by_alias[alias],) for alias in ARREAR_COLUMN_ALIASES if alias in keys_by_alias),
+        (),
+    )
+    return schema
+
+
+def describe_column_mapping(schema: dict[str, tuple[str, ...]]) -> dict[str, Optional[str]]:
+    return {field: (keys[0] if keys else None) for field, keys in schema.items()}
+
+
+def peek_record_schema(
+    record_batches: Iterator[list[dict]],
+) -> tuple[dict[str, tuple[str, ...]], Iterator[list[dict]]]:
+    """Compile the schema from the first batch and hand back an equivalent batch stream."""
+    first_batch = next(record_batches, [])
+    schema = compile_record_schema(first_batch[0].keys() if first_batch else ())
+    return schema, itertools.chain([first_batch], record_batches)
+
+
+def extract_arrear_count(record: dict, schema: dict[str, tuple[str, ...]]) -> int:
+    for key in schema["arrears_count"]:
+        raw_value = str(record.get(key) or "").strip()
+        match = re.search(r"\d+", raw_value)
+        return int(match.group()) if match else 0
 
     for value in record.values():
         raw_value = str(value or "").strip()
@@ -296,15 +732,11 @@ def extract_arrear_count(record: dict) -> int:
     return 0
 
 
-def get_record_value(record: dict, aliases: set[str]) -> Optional[str]:
-    normalized_map = {
-        normalize_column_name(key): value for key, value in record.items()
-    }
-    for alias in aliases:
-        if alias in normalized_map:
-            value = str(normalized_map[alias] or "").strip()
-            if value:
-                return value
+def get_record_value(record: dict, keys: tuple[str, ...]) -> Optional[str]:
+    for key in keys:
+        value = str(record.get(key) or "").strip()
+        if value:
+            return value
     return None
 
 
@@ -320,40 +752,23 @@ def make_photo_url(name: str) -> str:
     return f"https://ui-avatars.com/api/?name={encoded_name}&background=D4AF37&color=ffffff&size=256"
 
 
-def build_student_payload(record: dict) -> Optional[dict]:
-    roll_no = get_record_value(
-        record,
-        {
-            "rollno",
-            "registerno",
-            "regno",
-            "studentid",
-            "studentroll",
-            "id",
-        },
-    )
-    name = get_record_value(record, {"name", "studentname", "fullname"})
+def build_student_payload(
+    record: dict, schema: dict[str, tuple[str, ...]]
+) -> Optional[dict]:
+    roll_no = get_record_value(record, schema["roll_no"])
+    name = get_record_value(record, schema["name"])
 
     if not roll_no or not name:
         return None
 
-    department = get_record_value(record, {"department", "dept", "branch"})
-    semester = parse_int_value(
-        get_record_value(record, {"semester", "sem", "currentsemester"})
-    )
-    email = get_record_value(record, {"email", "studentemail"})
-    phone = get_record_value(record, {"phone", "studentphone", "mobileno"})
-    parent_email = get_record_value(
-        record, {"parentemail", "fatheremail", "motheremail", "guardianemail"}
-    )
-    parent_phone = get_record_value(
-        record, {"parentphone", "fatherphone", "motherphone", "guardianphone"}
-    )
-    photo_url = get_record_value(
-        record,
-        {"photo", "photourl", "image", "imageurl", "avatar", "profilephoto"},
-    )
-    arrears_count = extract_arrear_count(record)
+    department = get_record_value(record, schema["department"])
+    semester = parse_int_value(get_record_value(record, schema["semester"]))
+    email = get_record_value(record, schema["email"])
+    phone = get_record_value(record, schema["phone"])
+    parent_email = get_record_value(record, schema["parent_email"])
+    parent_phone = get_record_value(record, schema["parent_phone"])
+    photo_url = get_record_value(record, schema["photo_url"])
+    arrears_count = extract_arrear_count(record, schema)
 
     return {
         "roll_no": roll_no,
@@ -369,155 +784,300 @@ def build_student_payload(record: dict) -> Optional[dict]:
     }
 
 
-async def create_alert_action(action: AlertAction):
-    if not db_status.get("connected", False):
-        return None
+STUDENT_UPLOAD_COLUMNS = (
+    "roll_no",
+    "name",
+    "department",
+    "semester",
+    "email",
+    "phone",
+    "parent_email",
+    "parent_phone",
+    "arrears_count",
+    "photo_url",
+)
 
-    await db.fetch(
-        """
-        INSERT INTO alert_actions (student_id, notification_id, channel, recipient, message, status, sent_at)
-        VALUES ($1, $2, $3, $4, $5, $6::varchar, CASE WHEN $6::varchar = 'sent' THEN NOW() ELSE NULL END)
-        RETURNING id
-        """,
-        action.student_id,
-        action.notification_id,
-        action.channel,
-        action.recipient,
-        action.message,
-        action.status or "queued",
-    )
 
+# Limits of the students columns: one staged row outside them would abort the whole
+# COPY and merge, so such rows are rejected up front instead
+STUDENT_TEXT_LIMITS = {
+    "roll_no": 30,
+    "name": 120,
+    "department": 120,
+    "email": 255,
+    "phone": 20,
+    "parent_email": 255,
+    "parent_phone": 20,
+}
+STUDENT_SEMESTER_RANGE = (1, 12)
+POSTGRES_INTEGER_MAX = 2**31 - 1
 
-async def persist_document_records(records: list[dict]) -> dict:
-    if not db_status.get("connected", False):
-        return {"saved": 0, "highRiskActions": 0}
 
-    saved_count = 0
-    high_risk_actions = 0
+def student_payload_fits(payload: dict) -> bool:
+    for column, limit in STUDENT_TEXT_LIMITS.items():
+        if payload[column] is not None and len(payload[column]) > limit:
+            return False
+    semester = payload["semester"]
+    if semester is not None and not STUDENT_SEMESTER_RANGE[0] <= semester <= STUDENT_SEMESTER_RANGE[1]:
+        return False
+    return payload["arrears_count"] <= POSTGRES_INTEGER_MAX
 
+
+def build_student_upload_rows(
+    records: list[dict], schema: dict[str, tuple[str, ...]]
+) -> tuple[list[tuple], int]:
+    """Build COPY-ready student tuples for one batch of parsed rows, plus the rejected count."""
+    upload_rows = []
+    rejected = 0
     for raw_record in records:
-        payload = build_student_payload(raw_record)
+        payload = build_student_payload(raw_record, schema)
         if not payload:
             continue
-
-        student_result = await db.fetch(
-            """
-            INSERT INTO students (
-                roll_no, name, department, semester, email, phone,
-                parent_email, parent_phone, arrears_count, photo_url, is_active
-            )
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, TRUE)
-            ON CONFLICT (roll_no)
-            DO UPDATE SET
-                name = EXCLUDED.name,
-                department = EXCLUDED.department,
-                semester = EXCLUDED.semester,
-                email = EXCLUDED.email,
-                phone = EXCLUDED.phone,
-                parent_email = EXCLUDED.parent_email,
-                parent_phone = EXCLUDED.parent_phone,
-                arrears_count = EXCLUDED.arrears_count,
-                photo_url = EXCLUDED.photo_url,
-                updated_at = CURRENT_TIMESTAMP
-            RETURNING id, roll_no, name, arrears_count, parent_phone, parent_email
-            """,
-            payload["roll_no"],
-            payload["name"],
-            payload["department"],
-            payload["semester"],
-            payload["email"],
-            payload["phone"],
-            payload["parent_email"],
-            payload["parent_phone"],
-            payload["arrears_count"],
-            payload["photo_url"],
-        )
-
-        if not student_result:
+        if not student_payload_fits(payload):
+            rejected += 1
             continue
+        upload_rows.append(tuple(payload[column] for column in STUDENT_UPLOAD_COLUMNS))
+    return upload_rows, rejected
+
+
+# Merges the student_upload staging table (created per upload transaction) into
+# students and fans out the high-risk notifications and alert actions; $1 is the
+# alert dedupe window in seconds
+STUDENT_UPLOAD_MERGE_QUERY = db.statement(
+    "student_upload_merge",
+    """
+    WITH staged AS (
+        SELECT DISTINCT ON (roll_no)
+            roll_no, name, department, semester, email, phone,
+            parent_email, parent_phone, arrears_count, photo_url
+        FROM student_upload
+        -- A roll_no repeated in the sheet keeps its last row
+        ORDER BY roll_no, row_no DESC
+    ),
+    upserted AS (
+        INSERT INTO students (
+            roll_no, name, department, semester, email, phone,
+            parent_email, parent_phone, arrears_count, photo_url, is_active
+        )
+        SELECT
+            roll_no, name, department, semester, email, phone,
+            parent_email, parent_phone, arrears_count, photo_url, TRUE
+        FROM staged
+        ON CONFLICT (roll_no)
+        DO UPDATE SET
+            name = EXCLUDED.name,
+            department = EXCLUDED.department,
+            semester = EXCLUDED.semester,
+            email = EXCLUDED.email,
+            phone = EXCLUDED.phone,
+            parent_email = EXCLUDED.parent_email,
+            parent_phone = EXCLUDED.parent_phone,
+            arrears_count = EXCLUDED.arrears_count,
+            photo_url = EXCLUDED.photo_url,
+            updated_at = CURRENT_TIMESTAMP
+        -- Identical rows are left alone: no new tuple, trigger run or WAL
+        WHERE (
+            students.name, students.department, students.semester, students.email,
+            students.phone, students.parent_email, students.parent_phone,
+            students.arrears_count, students.photo_url
+        ) IS DISTINCT FROM (
+            EXCLUDED.name, EXCLUDED.department, EXCLUDED.semester, EXCLUDED.email,
+            EXCLUDED.phone, EXCLUDED.parent_email, EXCLUDED.parent_phone,
+            EXCLUDED.arrears_count, EXCLUDED.photo_url
+        )
+        RETURNING id, roll_no, name, arrears_count, parent_phone, (xmax = 0) AS inserted
+    ),
+    unchanged AS (
+        SELECT s.id, s.roll_no, s.name, s.arrears_count, s.parent_phone
+        FROM students s
+        INNER JOIN staged u ON u.roll_no = s.roll_no
+        WHERE NOT EXISTS (SELECT 1 FROM upserted p WHERE p.roll_no = s.roll_no)
+    ),
+    merged AS (
+        SELECT id, name, arrears_count, parent_phone FROM upserted
+        UNION ALL
+        SELECT id, name, arrears_count, parent_phone FROM unchanged
+    ),
+    high_risk AS (
+        SELECT
+            id,
+            arrears_count,
+            parent_phone AS recipient,
+            format(
+                'High risk alert: %s has %s arrears. Immediate parent communication required.',
+                name,
+                arrears_count
+            ) AS message
+        FROM merged
+        WHERE arrears_count > 3
+    ),
+    -- Skip students whose latest arrear alert inside the window had the same count
+    fresh_alerts AS (
+        SELECT h.*
+        FROM high_risk h
+        WHERE h.arrears_count IS DISTINCT FROM (
+            SELECT n.arrears_count
+            FROM notifications n
+            WHERE n.student_id = h.id
+              AND n.notification_type = 'arrear'
+              AND n.created_at > NOW() - make_interval(secs => $1)
+            ORDER BY n.created_at DESC
+            LIMIT 1
+        )
+    ),
+    created_notifications AS (
+        INSERT INTO notifications (
+            student_id, message, status, notification_type, priority, sent_at, arrears_count
+        )
+        SELECT id, message, 'sent', 'arrear', 'critical', NOW(), arrears_count
+        FROM fresh_alerts
+        RETURNING id, student_id, message
+    ),
+    created_actions AS (
+        INSERT INTO alert_actions (student_id, notification_id, channel, recipient, message, status)
+        SELECT n.student_id, n.id, c.channel, h.recipient, n.message, 'queued'
+        FROM created_notifications n
+        INNER JOIN fresh_alerts h ON h.id = n.student_id
+        CROSS JOIN (VALUES ('sms'), ('call')) AS c(channel)
+        RETURNING id
+    )
+    SELECT
+        (SELECT COUNT(*) FROM upserted WHERE inserted) AS inserted,
+        (SELECT COUNT(*) FROM upserted WHERE NOT inserted) AS updated,
+        (SELECT COUNT(*) FROM unchanged) AS unchanged,
+        (SELECT COUNT(*) FROM created_actions) AS high_risk_actions,
+        (SELECT COUNT(*) FROM high_risk) - (SELECT COUNT(*) FROM fresh_alerts) AS suppressed_alerts
+    """,
+)
 
-        saved_count += 1
-        student = student_result[0]
-        arrears_count = int(student.get("arrears_count") or 0)
-
-        if arrears_count > 3:
-            alert_message = (
-                f"High risk alert: {student.get('name')} has {arrears_count} arrears. "
-                "Immediate parent communication required."
-            )
-
-            notification_result = await db.fetch(
-                """
-                INSERT INTO notifications (student_id, message, status, notification_type, priority, sent_at)
-                VALUES ($1, $2, 'sent', 'arrear', 'critical', NOW())
-                RETURNING id
-                """,
-                student.get("id"),
-                alert_message,
-            )
 
-            notification_id = (
-                notification_result[0].get("id") if notification_result else None
-            )
-            recipient_number = student.get("parent_phone") or "parent-contact"
-
-            await create_alert_action(
-                AlertAction(
-                    student_id=student.get("id"),
-                    notification_id=notification_id,
-                    channel="sms",
-                    recipient=recipient_number,
-                    message=alert_message,
-                    status="sent",
-                )
-            )
+async def persist_document_records(
+    record_batches: AsyncIterator[list[dict]],
+    schema: dict[str, tuple[str, ...]],
+    progress: Optional[dict] = None,
+) -> dict:
+    progress = {} if progress is None else progress
+    if not db_status.get("connected", False):
+        return {
+            "saved": 0,
+            "inserted": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "rejected": 0,
+            "highRiskActions": 0,
+            "suppressedAlerts": 0,
+        }
 
-            await create_alert_action(
-                AlertAction(
-                    student_id=student.get("id"),
-                    notification_id=notification_id,
-                    channel="call",
-                    recipient=recipient_number,
-                    message=alert_message,
-                    status="sent",
-                )
+    rejected = 0
+    # One transaction: COPY each batch into a staging table, then a single
+    # set-based merge that only rewrites students whose values changed and fans
+    # out the high-risk notifications and their sms/call alert actions.
+    async with db.transaction(bulk=True) as session:
+        await session.execute(
+            """
+            CREATE TEMP TABLE student_upload (
+                row_no BIGSERIAL,
+                roll_no VARCHAR(30),
+                name VARCHAR(120),
+                department VARCHAR(120),
+                semester INTEGER,
+                email VARCHAR(255),
+                phone VARCHAR(20),
+                parent_email VARCHAR(255),
+                parent_phone VARCHAR(20),
+                arrears_count INTEGER,
+                photo_url TEXT
+            ) ON COMMIT DROP
+            """
+        )
+        async for batch in record_batches:
+            upload_rows, batch_rejected = await asyncio.to_thread(
+                build_student_upload_rows, batch, schema
             )
+            rejected += batch_rejected
+            if upload_rows:
+                await session.copy_records("student_upload", upload_rows, STUDENT_UPLOAD_COLUMNS)
+                progress["rowsSaved"] = progress.get("rowsSaved", 0) + len(upload_rows)
+
+        progress["stage"] = "merging"
+        result = await session.fetchrow(
+            STUDENT_UPLOAD_MERGE_QUERY, max(ALERT_DEDUPE_WINDOW_HOURS, 0.0) * 3600
+        )
 
-            high_risk_actions += 2
+    invalidate_read_cache("students", "notifications", "alert_actions")
+    dispatch_queue.wake()
+    saved = int(result["inserted"] + result["updated"] + result["unchanged"])
+    progress["rowsSaved"] = saved
+    progress["alertsGenerated"] = int(result["high_risk_actions"])
+    return {
+        "saved": saved,
+        "inserted": int(result["inserted"]),
+        "updated": int(result["updated"]),
+        "unchanged": int(result["unchanged"]),
+        "rejected": rejected,
+        "highRiskActions": int(result["high_risk_actions"]),
+        "suppressedAlerts": int(result["suppressed_alerts"]),
+    }
 
-    return {"saved": saved_count, "highRiskActions": high_risk_actions}
 
+def new_severity_totals() -> dict:
+    return {"rows": 0, "recognized": 0, "critical": 0, "medium": 0, "low": 0}
 
-def local_document_analysis(records: list[dict], raw_text: str) -> dict:
-    critical = 0
-    medium = 0
-    low = 0
-    recognized_records = 0
-    top_findings: list[str] = []
 
+def tally_arrear_severity(
+    records: list[dict], totals: dict, schema: dict[str, tuple[str, ...]]
+) -> dict:
+    """Fold one batch of rows into running severity totals."""
     for record in records:
-        arrear_count = extract_arrear_count(record)
+        arrear_count = extract_arrear_count(record, schema)
+        totals["rows"] += 1
         if arrear_count > 0:
-            recognized_records += 1
+            totals["recognized"] += 1
 
         if arrear_count > 3:
-            critical += 1
+            totals["critical"] += 1
         elif arrear_count >= 2:
-            medium += 1
+            totals["medium"] += 1
         elif arrear_count == 1:
-            low += 1
+            totals["low"] += 1
+    return totals
+
+
+def observe_record_batches(
+    record_batches: Iterable[list[dict]],
+    schema: dict[str, tuple[str, ...]],
+    totals: dict,
+    sample_rows: list[dict],
+    progress: Optional[dict] = None,
+) -> Iterator[list[dict]]:
+    """Pass batches through while tallying severity and keeping the AI sample rows."""
+    for batch in record_batches:
+        tally_arrear_severity(batch, totals, schema)
+        if progress is not None:
+            progress["rowsParsed"] = totals["rows"]
+        if len(sample_rows) < AI_SAMPLE_ROWS:
+            sample_rows.extend(batch[: AI_SAMPLE_ROWS - len(sample_rows)])
+        yield batch
+
+
+def local_document_analysis(totals: dict, text_summary: dict) -> dict:
+    critical = totals["critical"]
+    medium = totals["medium"]
+    low = totals["low"]
+    row_count = totals["rows"]
+    top_findings: list[str] = []
 
-    if records:
+    if row_count:
         top_findings.append(
-            f"Processed {len(records)} student rows; arrear data found in {recognized_records} rows."
+            f"Processed {row_count} student rows; arrear data found in {totals['recognized']} rows."
         )
         top_findings.append(
             f"Severity split: Critical {critical}, Medium {medium}, Low {low}."
         )
-    elif raw_text:
-        digits = re.findall(r"\d+", raw_text)
+    elif text_summary["chars"]:
         top_findings.append(
-            f"Extracted {len(raw_text.split())} words and {len(digits)} numeric values from document text."
+            f"Extracted {text_summary['words']} words and {text_summary['numbers']} numeric values "
+            "from document text."
         )
         top_findings.append("No tabular student rows were detected in this file.")
     else:
@@ -527,7 +1087,7 @@ def local_document_analysis(records: list[dict], raw_text: str) -> dict:
     confidence = 98.4 if total_alerts > 0 else 86.0
     summary = (
         "AI-ready analysis generated from uploaded semester data."
-        if records or raw_text
+        if row_count or text_summary["chars"]
         else "Document parsed but contains no analyzable data."
     )
 
@@ -555,21 +1115,51 @@ def parse_ai_json_response(content: str) -> Optional[dict]:
         return None
 
 
-def cerebras_ai_analysis(file_name: str, records: list[dict], raw_text: str) -> Optional[dict]:
-    api_key = os.getenv("CEREBRUS_API_KEY") or os.getenv("CEREBRAS_API_KEY")
+def cerebras_api_key() -> Optional[str]:
+    return os.getenv("CEREBRUS_API_KEY") or os.getenv("CEREBRAS_API_KEY")
+
+
+def analysis_model_name() -> str:
+    if not cerebras_api_key():
+        return RULE_BASED_MODEL_NAME
+    return os.getenv("CEREBRUS_MODEL", "llama-3.3-70b")
+
+
+def get_ai_http_client() -> "httpx.AsyncClient":
+    global ai_http_client
+    if ai_http_client is None:
+        ai_http_client = httpx.AsyncClient(timeout=AI_REQUEST_TIMEOUT_SECONDS)
+    return ai_http_client
+
+
+def post_json_blocking(endpoint: str, body: dict, headers: dict) -> dict:
+    """urllib fallback for environments without httpx; call it off the event loop."""
+    request = urllib.request.Request(
+        endpoint,
+        data=json.dumps(body).encode("utf-8"),
+        headers=headers,
+        method="POST",
+    )
+    with urllib.request.urlopen(request, timeout=AI_REQUEST_TIMEOUT_SECONDS) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+async def cerebras_ai_analysis(
+    file_name: str, sample_rows: list[dict], row_count: int, text_preview: str
+) -> Optional[dict]:
+    api_key = cerebras_api_key()
     if not api_key:
         return None
 
-    model = os.getenv("CEREBRUS_MODEL", "llama-3.3-70b")
+    model = analysis_model_name()
     api_base = os.getenv("CEREBRUS_API_BASE_URL", "https://api.cerebras.ai/v1").rstrip("/")
     endpoint = f"{api_base}/chat/completions"
 
-    sample_rows = records[:40]
     prompt_payload = {
         "fileName": file_name,
-        "rowCount": len(records),
+        "rowCount": row_count,
         "sampleRows": sample_rows,
-        "documentTextPreview": raw_text[:2500],
+        "documentTextPreview": text_preview,
     }
 
     system_prompt = (
@@ -589,19 +1179,20 @@ def cerebras_ai_analysis(file_name: str, records: list[dict], raw_text: str) ->
         "response_format": {"type": "json_object"},
     }
 
-    request = urllib.request.Request(
-        endpoint,
-        data=json.dumps(body).encode("utf-8"),
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-        },
-        method="POST",
-    )
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {api_key}",
+    }
 
     try:
-        with urllib.request.urlopen(request, timeout=30) as response:
-            response_payload = json.loads(response.read().decode("utf-8"))
+        if httpx is not None:
+            response = await get_ai_http_client().post(endpoint, json=body, headers=headers)
+            response.raise_for_status()
+            response_payload = response.json()
+        else:
+            response_payload = await asyncio.to_thread(
+                post_json_blocking, endpoint, body, headers
+            )
     except Exception as error:
         print(f"Cerebras API request failed: {error}")
         return None
@@ -624,14 +1215,537 @@ def cerebras_ai_analysis(file_name: str, records: list[dict], raw_text: str) ->
     }
 
 
+def format_ai_findings(ai_result: dict) -> dict:
+    return {
+        "summary": ai_result.get("summary"),
+        "topFindings": ai_result.get("top_findings"),
+        "confidence": ai_result.get("confidence"),
+        "alerts": ai_result.get("alerts"),
+        "model": ai_result.get("model"),
+    }
+
+
+def register_ai_followup(ai_task: asyncio.Task) -> str:
+    """Keep a late AI call running and expose its findings under a job id."""
+    job_id = uuid.uuid4().hex
+    ai_followups[job_id] = {"status": "pending", "findings": None}
+    while len(ai_followups) > AI_FOLLOWUP_LIMIT:
+        ai_followups.popitem(last=False)
+
+    def record_outcome(task: asyncio.Task) -> None:
+        entry = ai_followups.get(job_id)
+        if entry is None:
+            return
+        if task.cancelled() or task.exception() is not None:
+            entry["status"] = "failed"
+        elif task.result() is None:
+            entry["status"] = "unavailable"
+        else:
+            entry["status"] = "completed"
+            entry["findings"] = format_ai_findings(task.result())
+
+    ai_task.add_done_callback(record_outcome)
+    return job_id
+
+
+async def await_ai_within_budget(
+    ai_task: asyncio.Task, deadline: Optional[float]
+) -> tuple[Optional[dict], Optional[str]]:
+    """Return the AI result if it lands before the deadline, else a follow-up job id."""
+    if deadline is None:
+        return await ai_task, None
+    remaining = deadline - asyncio.get_running_loop().time()
+    try:
+        return await asyncio.wait_for(asyncio.shield(ai_task), timeout=max(0.0, remaining)), None
+    except asyncio.TimeoutError:
+        return None, register_ai_followup(ai_task)
+
+
+def get_analysis_cache():
+    if ANALYSIS_CACHE_BACKEND == "postgres" and db_status.get("connected", False):
+        return postgres_analysis_cache
+    return memory_analysis_cache
+
+
+async def read_cached_analysis(cache, cache_key: str) -> Optional[dict]:
+    try:
+        return await cache.get(cache_key)
+    except Exception as error:
+        print(f"Analysis cache read failed ({cache.name}): {error}")
+        return None
+
+
+async def write_cached_analysis(cache, cache_key: str, result: dict):
+    try:
+        await cache.set(cache_key, result)
+    except Exception as error:
+        print(f"Analysis cache write failed ({cache.name}): {error}")
+
+
+def invalidate_read_cache(*tables: str):
+    """Drop cached GET responses built from the given tables (also the NOTIFY callback)."""
+    scopes = {
+        scope
+        for table in tables
+        for scope in READ_CACHE_TABLE_SCOPES.get(table, ())
+    }
+    if scopes:
+        response_cache.invalidate(scopes)
+
+
+def encode_json_body(payload) -> bytes:
+    if JSON_RESPONSE_MODE != "standard" and orjson is not None:
+        # orjson handles datetimes natively; anything else goes through FastAPI's encoder
+        return orjson.dumps(payload, default=jsonable_encoder)
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+async def fetch_json_page(
+    response: Response, page_sql: str, args: list, limit: int
+) -> bytes:
+    """Run a keyset page query (with its look-ahead row) and let Postgres render the JSON body."""
+    args = [*args, limit]
+    rows = await db.fetch(
+        f"""
+        WITH page AS ({page_sql}),
+        kept AS (SELECT * FROM page ORDER BY id DESC LIMIT ${len(args)})
+        SELECT
+            COALESCE((SELECT json_agg(kept ORDER BY kept.id DESC) FROM kept), '[]'::json)::text AS body,
+            CASE
+                WHEN (SELECT COUNT(*) FROM page) > ${len(args)} THEN (SELECT MIN(id) FROM kept)
+            END AS next_cursor
+        """,
+        *args,
+    )
+    if rows[0]["next_cursor"] is not None:
+        response.headers["X-Next-Cursor"] = str(rows[0]["next_cursor"])
+    return rows[0]["body"].encode("utf-8")
+
+
+def request_matches_etag(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = {item.strip().removeprefix("W/") for item in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+async def serve_cached_json(request: Request, scope: str, load) -> Response:
+    """Answer a GET from the read cache, or load(response) it and cache the serialized body.
+
+    Either way the body carries an ETag, and a matching If-None-Match gets a bare 304.
+    """
+    cache_key = f"{request.url.path}?{request.url.query}"
+    cached = response_cache.get(scope, cache_key)
+    cache_status = "HIT"
+    if cached is None:
+        cache_status = "MISS"
+        generation = response_cache.generation(scope)
+        collected = Response()
+        payload = await load(collected)
+        # Loaders that let Postgres render the JSON hand back the finished body
+        body = payload if isinstance(payload, bytes) else encode_json_body(payload)
+        replay_headers = {
+            name: value
+            for name, value in collected.headers.items()
+            if name == "x-next-cursor"
+        }
+        cached = CachedResponse(body, replay_headers)
+        # Memory-fallback answers are cheap and should not outlive a reconnect
+        if db_status.get("connected", False):
+            response_cache.set(scope, cache_key, cached, generation)
+
+    headers = {
+        **cached.headers,
+        "ETag": cached.etag,
+        "Cache-Control": "no-cache",
+        "X-Cache": cache_status,
+    }
+    if request_matches_etag(request, cached.etag):
+        response_cache.stats["notModified"] += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+def resolve_student_fields(fields: Optional[str]) -> list[str]:
+    """Validate a comma-separated projection; id is always kept for the cursor."""
+    if not fields:
+        return list(STUDENT_LIST_DEFAULT_FIELDS)
+
+    requested = [item.strip() for item in fields.split(",") if item.strip()]
+    unknown = [item for item in requested if item not in STUDENT_LIST_FIELDS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown student fields: {', '.join(unknown)}",
+        )
+    return ["id", *(item for item in dict.fromkeys(requested) if item != "id")]
+
+
+def build_student_filters(filters: dict) -> tuple[list[str], list]:
+    """Translate list filters into SQL clauses over the indexed student columns."""
+    clauses: list[str] = []
+    args: list = []
+    conditions = (
+        ("department", "department = ${}"),
+        ("semester", "semester = ${}"),
+        ("min_arrears", "arrears_count >= ${}"),
+        ("max_arrears", "arrears_count <= ${}"),
+        ("is_active", "is_active = ${}"),
+    )
+    for key, template in conditions:
+        if filters.get(key) is not None:
+            args.append(filters[key])
+            clauses.append(template.format(len(args)))
+    if filters.get("q"):
+        args.append(f"%{escape_like_pattern(filters['q'])}%")
+        clauses.append(
+            "(roll_no ILIKE ${0} OR name ILIKE ${0} OR department ILIKE ${0})".format(len(args))
+        )
+    return clauses, args
+
+
+def escape_like_pattern(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def memory_student_matches(student: dict, filters: dict) -> bool:
+    arrears_count = int(student.get("arrears_count") or 0)
+    if filters.get("department") is not None and student.get("department") != filters["department"]:
+        return False
+    if filters.get("semester") is not None and student.get("semester") != filters["semester"]:
+        return False
+    if filters.get("min_arrears") is not None and arrears_count < filters["min_arrears"]:
+        return False
+    if filters.get("max_arrears") is not None and arrears_count > filters["max_arrears"]:
+        return False
+    if filters.get("is_active") is not None and student.get("is_active", True) != filters["is_active"]:
+        return False
+    if filters.get("q"):
+        query = filters["q"].lower()
+        searchable = (student.get("roll_no"), student.get("name"), student.get("department"))
+        if not any(query in str(value or "").lower() for value in searchable):
+            return False
+    return True
+
+
+def set_next_cursor(response: Response, rows: list[dict], limit: int) -> list[dict]:
+    """Trim the look-ahead row and advertise the next keyset cursor, if any."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = str(rows[-1]["id"])
+    return rows
+
+
+def paginate_memory_students(
+    response: Response,
+    cursor: Optional[int],
+    limit: int,
+    filters: dict,
+    columns: list[str],
+) -> list[dict]:
+    page = []
+    for student in sorted(memory_state["students"], key=lambda item: item["id"], reverse=True):
+        if cursor is not None and student["id"] >= cursor:
+            continue
+        if not memory_student_matches(student, filters):
+            continue
+        page.append({column: student.get(column) for column in columns})
+        if len(page) > limit:
+            break
+    return set_next_cursor(response, page, limit)
+
+
+def build_notification_filters(filters: dict) -> tuple[list[str], list]:
+    clauses: list[str] = []
+    args: list = []
+    conditions = (
+        ("status", "n.status = ${}"),
+        ("priority", "n.priority = ${}"),
+        ("notification_type", "n.notification_type = ${}"),
+        ("created_from", "n.created_at >= ${}"),
+        ("created_to", "n.created_at < ${}"),
+    )
+    for key, template in conditions:
+        if filters.get(key) is not None:
+            args.append(filters[key])
+            clauses.append(template.format(len(args)))
+    return clauses, args
+
+
+def as_aware_datetime(value: datetime) -> datetime:
+    return value if value.tzinfo else value.astimezone()
+
+
+def memory_notification_matches(notification: dict, filters: dict) -> bool:
+    for key in ("status", "priority", "notification_type"):
+        if filters.get(key) is not None and notification.get(key) != filters[key]:
+            return False
+
+    if filters.get("created_from") is not None or filters.get("created_to") is not None:
+        created_at = as_aware_datetime(datetime.fromisoformat(notification["created_at"]))
+        if filters.get("created_from") is not None and created_at < as_aware_datetime(filters["created_from"]):
+            return False
+        if filters.get("created_to") is not None and created_at >= as_aware_datetime(filters["created_to"]):
+            return False
+    return True
+
+
+def paginate_memory_notifications(
+    response: Response, cursor: Optional[int], limit: int, filters: dict
+) -> list[dict]:
+    students_by_id = {student["id"]: student for student in memory_state["students"]}
+    page = []
+    for item in sorted(memory_state["notifications"], key=lambda entry: entry["id"], reverse=True):
+        if cursor is not None and item["id"] >= cursor:
+            continue
+        if not memory_notification_matches(item, filters):
+            continue
+
+        student = students_by_id.get(item["student_id"])
+        page.append(
+            {
+                **item,
+                "student_name": student["name"] if student else "Unknown",
+                "severity": severity_from_semester(
+                    student["semester"] if student else None
+                ),
+            }
+        )
+        if len(page) > limit:
+            break
+    return set_next_cursor(response, page, limit)
+
+
+def memory_notification_export_row(item: dict, students_by_id: dict) -> dict:
+    student = students_by_id.get(item["student_id"], {})
+    return {
+        **item,
+        "roll_no": student.get("roll_no"),
+        "student_name": student.get("name", "Unknown"),
+        "department": student.get("department"),
+        "semester": student.get("semester"),
+        "severity": severity_from_semester(student.get("semester")),
+    }
+
+
+def format_csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def encode_export_rows(
+    rows: list[dict], columns: list[str], export_format: str, include_header: bool
+) -> bytes:
+    if export_format == "ndjson":
+        return b"".join(encode_json_body(row) + b"\n" for row in rows)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if include_header:
+        writer.writerow(columns)
+    writer.writerows([format_csv_cell(row.get(column)) for column in columns] for row in rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+async def iter_postgres_export(query: str, args: list) -> AsyncIterator[list[dict]]:
+    """Yield query rows in EXPORT_FETCH_ROWS batches from a server-side cursor."""
+    # A read-only snapshot keeps a long export consistent while writes continue
+    async with db.transaction(bulk=True, isolation="repeatable_read", readonly=True) as session:
+        async for rows in session.fetch_many(query, *args, batch_size=EXPORT_FETCH_ROWS):
+            yield rows
+
+
+async def iter_memory_export(rows: Iterable[dict]) -> AsyncIterator[list[dict]]:
+    rows = iter(rows)
+    while batch := list(itertools.islice(rows, EXPORT_FETCH_ROWS)):
+        yield batch
+
+
+async def stream_export(
+    batches: AsyncIterator[list[dict]],
+    columns: list[str],
+    export_format: str,
+    compress: bool,
+) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if compress else None
+    include_header = True
+    async for rows in batches:
+        chunk = encode_export_rows(rows, columns, export_format, include_header)
+        include_header = False
+        if compressor is not None:
+            # Sync-flush each batch so the client sees data as soon as it is read
+            chunk = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield chunk
+
+    if include_header and export_format == "csv":
+        chunk = encode_export_rows([], columns, export_format, True)
+        yield compressor.compress(chunk) if compressor is not None else chunk
+    if compressor is not None:
+        yield compressor.flush()
+
+
+def export_response(
+    request: Request,
+    name: str,
+    batches: AsyncIterator[list[dict]],
+    columns: list[str],
+    export_format: str,
+) -> StreamingResponse:
+    compress = "gzip" in request.headers.get("accept-encoding", "").lower()
+    headers = {
+        "Content-Disposition": f'attachment; filename="{name}.{export_format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if compress:
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(
+        stream_export(batches, columns, export_format, compress),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers=headers,
+    )
+
+
+def build_analytics_summary(
+    department_rows: list[dict], status_counts: dict, trend_rows: list[dict]
+) -> dict:
+    departments = [
+        {
+            "department": row["department"],
+            "students": row["students"],
+            "totalArrears": row["total_arrears"],
+            "withArrears": row["with_arrears"],
+            "critical": row["critical"],
+            "medium": row["medium"],
+            "low": row["low"],
+        }
+        for row in department_rows
+    ]
+    total_students = sum(item["students"] for item in departments)
+    total_arrears = sum(item["totalArrears"] for item in departments)
+
+    return {
+        "students": {
+            "total": total_students,
+            "withArrears": sum(item["withArrears"] for item in departments),
+            "totalArrears": total_arrears,
+            "averageArrears": round(total_arrears / total_students, 2) if total_students else 0.0,
+        },
+        "severity": {
+            level: sum(item[level] for item in departments)
+            for level in ("critical", "medium", "low")
+        },
+        "departments": departments,
+        "notifications": {
+            "total": sum(status_counts.values()),
+            "byStatus": status_counts,
+        },
+        "trend": [
+            {
+                "bucket": row["bucket"].isoformat() if hasattr(row["bucket"], "isoformat") else row["bucket"],
+                "alerts": row["alerts"],
+                "sent": row["sent"],
+            }
+            for row in trend_rows
+        ],
+    }
+
+
+def describe_rollup_freshness(state: dict) -> dict:
+    """Rollups move with every write; rebuildOverdue only says the last full rebuild is old."""
+    rebuilt_at = state.get("rebuilt_at")
+    rebuild_age = (
+        (datetime.now(rebuilt_at.tzinfo) - rebuilt_at).total_seconds() if rebuilt_at else None
+    )
+    return {
+        "source": "rollup",
+        "updatedAt": state["updated_at"].isoformat() if state.get("updated_at") else None,
+        "rebuiltAt": rebuilt_at.isoformat() if rebuilt_at else None,
+        "rebuildAgeSeconds": round(rebuild_age) if rebuild_age is not None else None,
+        "rebuildOverdue": rebuild_age is None or rebuild_age > ROLLUP_REBUILD_OVERDUE_SECONDS,
+    }
+
+
+def truncate_to_bucket(value: datetime, bucket: str) -> datetime:
+    value = value.replace(hour=0, minute=0, second=0, microsecond=0)
+    return value.replace(day=1) if bucket == "month" else value
+
+
+def next_bucket(value: datetime, bucket: str) -> datetime:
+    if bucket == "day":
+        return value + timedelta(days=1)
+    return value.replace(year=value.year + value.month // 12, month=value.month % 12 + 1)
+
+
+def memory_analytics_summary(
+    department: Optional[str],
+    created_from: Optional[datetime],
+    created_to: Optional[datetime],
+    trend_from: datetime,
+    trend_to: datetime,
+    bucket: str,
+) -> dict:
+    departments: dict[str, dict] = {}
+    for student in memory_state["students"]:
+        if department is not None and student.get("department") != department:
+            continue
+        arrears_count = int(student.get("arrears_count") or 0)
+        row = departments.setdefault(
+            student.get("department") or "Unknown",
+            {"students": 0, "total_arrears": 0, "with_arrears": 0, "critical": 0, "medium": 0, "low": 0},
+        )
+        row["students"] += 1
+        row["total_arrears"] += arrears_count
+        row["with_arrears"] += int(arrears_count > 0)
+        row["critical"] += int(arrears_count > 3)
+        row["medium"] += int(2 <= arrears_count <= 3)
+        row["low"] += int(arrears_count == 1)
+
+    students_by_id = {student["id"]: student for student in memory_state["students"]}
+    status_counts: dict[str, int] = {}
+    trend: dict[datetime, dict] = {}
+    cursor = truncate_to_bucket(trend_from, bucket)
+    while cursor < trend_to:
+        trend[cursor] = {"bucket": cursor, "alerts": 0, "sent": 0}
+        cursor = next_bucket(cursor, bucket)
+
+    for item in memory_state["notifications"]:
+        student = students_by_id.get(item["student_id"])
+        if student is None or (department is not None and student.get("department") != department):
+            continue
+        if memory_notification_matches(item, {"created_from": created_from, "created_to": created_to}):
+            status_counts[item["status"]] = status_counts.get(item["status"], 0) + 1
+
+        created_at = as_aware_datetime(datetime.fromisoformat(item["created_at"]))
+        row = trend.get(truncate_to_bucket(created_at, bucket))
+        if row is not None and trend_from <= created_at < trend_to:
+            row["alerts"] += 1
+            row["sent"] += int(item["status"] in ("sent", "delivered"))
+
+    summary = build_analytics_summary(
+        [{"department": name, **row} for name, row in sorted(departments.items())],
+        status_counts,
+        list(trend.values()),
+    )
+    return {**summary, "rollup": {"source": "memory", "rebuildOverdue": False}}
+
+
 # Endpoints
 @app.get("/api/health", response_model=HealthResponse)
 async def health():
     return {
         "ok": True,
         "dbConnected": db_status.get("connected", False),
-        "mode": "postgres" if db_status.get("connected") else "memory-fallback",
-        "dbError": db_status.get("error"),
+        "dbError": db_status.get("error") or db_monitor.last_error,
+        **db_monitor.describe(),
     }
 
 
@@ -695,6 +1809,17 @@ async def register_user(payload: RegisterRequest):
         raise HTTPException(status_code=500, detail="Unable to create account")
 
 
+LOGIN_USER_QUERY = db.statement(
+    "login_user",
+    """
+    SELECT id, full_name, email, role, password_hash, created_at
+    FROM users
+    WHERE LOWER(email) = LOWER($1)
+    LIMIT 1
+    """,
+)
+
+
 @app.post("/api/auth/login")
 async def login_user(payload: LoginRequest):
     if not db_status.get("connected", False):
@@ -708,15 +1833,7 @@ async def login_user(payload: LoginRequest):
         raise HTTPException(status_code=400, detail="email and password are required")
 
     try:
-        users = await db.fetch(
-            """
-            SELECT id, full_name, email, role, password_hash, created_at
-            FROM users
-            WHERE LOWER(email) = LOWER($1)
-            LIMIT 1
-            """,
-            email,
-        )
+        users = await db.fetch(LOGIN_USER_QUERY, email)
         if not users:
             raise HTTPException(status_code=401, detail="Invalid email or password")
 
@@ -754,101 +1871,147 @@ async def login_user(payload: LoginRequest):
         raise HTTPException(status_code=500, detail="Unable to login")
 
 
-@app.post("/api/evaluation/analyze-document", response_model=DocumentAnalysisResponse)
-async def analyze_document(file: UploadFile = File(...)):
-    if not file.filename:
+def upload_extension(file_name: Optional[str]) -> str:
+    if not file_name:
         raise HTTPException(status_code=400, detail="File name is required")
 
     allowed_extensions = {".csv", ".xlsx", ".pdf", ".txt"}
-    extension = os.path.splitext(file.filename.lower())[1]
+    extension = os.path.splitext(file_name.lower())[1]
     if extension not in allowed_extensions:
         raise HTTPException(
             status_code=400,
             detail="Unsupported file format. Use CSV, XLSX, PDF, or TXT.",
         )
+    return extension
+
 
-    content = await file.read()
-    if not content:
+def validate_upload(file: UploadFile) -> str:
+    """Check the upload's name and size and return its normalized extension."""
+    extension = upload_extension(file.filename)
+    if upload_size(file) == 0:
         raise HTTPException(status_code=400, detail="Uploaded file is empty")
+    return extension
 
+
+@app.post("/api/evaluation/analyze-document", response_model=DocumentAnalysisResponse)
+async def analyze_document(file: UploadFile = File(...)):
+    extension = validate_upload(file)
+    content_hash = await asyncio.to_thread(hash_upload_content, file.file)
+    return await analyze_upload(file.filename, file.file, extension, content_hash)
+
+
+async def analyze_upload(
+    file_name: str,
+    stream: BinaryIO,
+    extension: str,
+    content_hash: str,
+    progress: Optional[dict] = None,
+    ai_budget_seconds: Optional[float] = AI_LATENCY_BUDGET_SECONDS,
+) -> dict:
+    # Only the analysis is cached, never the merge outcome: the sheet is still merged
+    # on every upload, since the students may have changed since it was last sent
+    cache_key = f"analysis:{content_hash}:{extension}:{analysis_model_name()}"
+    cache = get_analysis_cache()
+    cached_analysis = await read_cached_analysis(cache, cache_key)
+
+    async with upload_semaphore:
+        result, analysis = await run_document_analysis(
+            file_name, stream, extension, progress, ai_budget_seconds, cached_analysis
+        )
+
+    # Same bytes and model: the AI call was skipped
+    if cached_analysis is not None:
+        return {**result, "cacheHit": True}
+    # Only cache complete analyses, not ones whose AI findings are still pending
+    if not result.get("aiJobId"):
+        await write_cached_analysis(cache, cache_key, analysis)
+    return result
+
+
+async def run_document_analysis(
+    file_name: str,
+    stream: BinaryIO,
+    extension: str,
+    progress: Optional[dict] = None,
+    ai_budget_seconds: Optional[float] = AI_LATENCY_BUDGET_SECONDS,
+    cached_analysis: Optional[dict] = None,
+) -> tuple[dict, dict]:
+    """Parse and merge the upload; returns the response and its cacheable analysis part."""
+    # Without a budget (background jobs) the AI call is awaited to completion
+    ai_deadline = (
+        None
+        if ai_budget_seconds is None
+        else asyncio.get_running_loop().time() + ai_budget_seconds
+    )
+    progress = {} if progress is None else progress
+    progress["stage"] = "parsing"
     try:
-        records: list[dict] = []
-        raw_text = ""
+        records: Iterable[dict] = ()
+        text_summary = new_text_summary()
 
         if extension == ".csv":
-            records = parse_csv_records(content)
+            records = iter_csv_records(stream)
         elif extension == ".xlsx":
-            records = parse_xlsx_records(content)
+            records = iter_xlsx_records(stream)
         elif extension == ".pdf":
-            raw_text = parse_pdf_text(content)
+            require_pdf_support()
+            text_summary = await summarize_pdf_upload(stream)
         elif extension == ".txt":
-            raw_text = content.decode("utf-8", errors="ignore")
-
-        persistence_result = await persist_document_records(records)
-
-        local_result = local_document_analysis(records, raw_text)
-        ai_result = cerebras_ai_analysis(file.filename, records, raw_text)
-
-        alerts = local_result["alerts"]
-        confidence = local_result["confidence"]
-        summary = local_result["summary"]
-        top_findings = local_result["top_findings"]
-        model = "Rule-Enhanced Analyzer"
-        used_ai = False
-
-        if ai_result:
-            ai_alerts = ai_result.get("alerts")
-            if isinstance(ai_alerts, dict):
-                alerts = {
-                    "critical": max(
-                        int(ai_alerts.get("critical", alerts["critical"])),
-                        int(alerts.get("critical", 0)),
-                    ),
-                    "medium": max(
-                        int(ai_alerts.get("medium", alerts["medium"])),
-                        int(alerts.get("medium", 0)),
-                    ),
-                    "low": max(
-                        int(ai_alerts.get("low", alerts["low"])),
-                        int(alerts.get("low", 0)),
-                    ),
-                }
-
-            ai_confidence = ai_result.get("confidence")
-            if isinstance(ai_confidence, (int, float)):
-                confidence = float(max(0.0, min(100.0, ai_confidence)))
-
-            ai_summary = ai_result.get("summary")
-            if isinstance(ai_summary, str) and ai_summary.strip():
-                summary = ai_summary.strip()
-
-            ai_findings = ai_result.get("top_findings")
-            if isinstance(ai_findings, list):
-                top_findings = [str(item) for item in ai_findings[:5] if str(item).strip()]
-
-            model = str(ai_result.get("model") or model)
-            used_ai = True
-
-        processed_records = len(records) if records else (1 if raw_text else 0)
-        top_findings = [
-            *top_findings,
-            f"Saved {persistence_result.get('saved', 0)} student records to database.",
-        ]
-        if persistence_result.get("highRiskActions", 0) > 0:
-            top_findings.append(
-                f"Triggered {persistence_result.get('highRiskActions', 0)} high-risk parent actions (message/call)."
+            text_summary = await asyncio.to_thread(summarize_text, iter_text_chunks(stream))
+
+        # Parsing and tallying happen as the batch iterator is advanced, on a worker thread
+        schema, record_batches = await asyncio.to_thread(
+            peek_record_schema, iter_record_batches(records)
+        )
+        totals = new_severity_totals()
+        sample_rows: list[dict] = []
+        parsing_done = asyncio.Event()
+        record_batches = signal_when_exhausted(
+            iter_in_thread(
+                observe_record_batches(record_batches, schema, totals, sample_rows, progress)
+            ),
+            parsing_done,
+        )
+
+        async def enrich_with_ai() -> Optional[dict]:
+            # The prompt needs the final row count, so the AI call starts once
+            # parsing is done and overlaps with the database merge.
+            await parsing_done.wait()
+            return await cerebras_ai_analysis(
+                file_name, sample_rows, totals["rows"], text_summary["preview"]
             )
 
-        return {
-            "fileName": file.filename,
-            "processedRecords": processed_records,
-            "alerts": alerts,
-            "confidence": round(confidence, 1),
-            "model": model,
-            "summary": summary,
+        ai_task = asyncio.create_task(enrich_with_ai()) if cached_analysis is None else None
+        try:
+            persistence_result = await persist_document_records(record_batches, schema, progress)
+            # Persistence skips the stream when the database is down; finish the tally anyway.
+            async for _ in record_batches:
+                pass
+        except BaseException:
+            if ai_task is not None:
+                ai_task.cancel()
+            raise
+
+        progress["stage"] = "analyzing"
+        if cached_analysis is not None:
+            analysis = cached_analysis
+            ai_job_id = None
+        else:
+            ai_result, ai_job_id = await await_ai_within_budget(ai_task, ai_deadline)
+            analysis = build_document_analysis(totals, text_summary, schema, ai_result)
+
+        top_findings = [*analysis["topFindings"], *describe_persistence(persistence_result)]
+        result = {
+            "fileName": file_name,
+            **analysis,
             "topFindings": top_findings,
-            "usedAI": used_ai,
+            "recordChanges": {
+                key: persistence_result.get(key, 0)
+                for key in ("inserted", "updated", "unchanged", "rejected")
+            },
+            "aiJobId": ai_job_id,
         }
+        return result, analysis
     except HTTPException:
         raise
     except Exception as error:
@@ -856,24 +2019,443 @@ async def analyze_document(file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail="Unable to analyze document")
 
 
+def build_document_analysis(
+    totals: dict, text_summary: dict, schema: dict[str, tuple[str, ...]], ai_result: Optional[dict]
+) -> dict:
+    """The rule-based result, overlaid with the AI's where it answered in time."""
+    local_result = local_document_analysis(totals, text_summary)
+
+    alerts = local_result["alerts"]
+    confidence = local_result["confidence"]
+    summary = local_result["summary"]
+    top_findings = local_result["top_findings"]
+    model = RULE_BASED_MODEL_NAME
+    used_ai = False
+
+    if ai_result:
+        ai_alerts = ai_result.get("alerts")
+        if isinstance(ai_alerts, dict):
+            alerts = {
+                "critical": max(
+                    int(ai_alerts.get("critical", alerts["critical"])),
+                    int(alerts.get("critical", 0)),
+                ),
+                "medium": max(
+                    int(ai_alerts.get("medium", alerts["medium"])),
+                    int(alerts.get("medium", 0)),
+                ),
+                "low": max(
+                    int(ai_alerts.get("low", alerts["low"])),
+                    int(alerts.get("low", 0)),
+                ),
+            }
+
+        ai_confidence = ai_result.get("confidence")
+        if isinstance(ai_confidence, (int, float)):
+            confidence = float(max(0.0, min(100.0, ai_confidence)))
+
+        ai_summary = ai_result.get("summary")
+        if isinstance(ai_summary, str) and ai_summary.strip():
+            summary = ai_summary.strip()
+
+        ai_findings = ai_result.get("top_findings")
+        if isinstance(ai_findings, list):
+            top_findings = [str(item) for item in ai_findings[:5] if str(item).strip()]
+
+        model = str(ai_result.get("model") or model)
+        used_ai = True
+
+    return {
+        "processedRecords": totals["rows"] or (1 if text_summary["chars"] else 0),
+        "alerts": alerts,
+        "confidence": round(confidence, 1),
+        "model": model,
+        "summary": summary,
+        "topFindings": top_findings,
+        "usedAI": used_ai,
+        "columnMapping": describe_column_mapping(schema) if totals["rows"] else {},
+    }
+
+
+def describe_persistence(persistence_result: dict) -> list[str]:
+    findings = [
+        f"Saved {persistence_result.get('saved', 0)} student records to database "
+        f"({persistence_result.get('inserted', 0)} new, {persistence_result.get('updated', 0)} updated, "
+        f"{persistence_result.get('unchanged', 0)} unchanged)."
+    ]
+    if persistence_result.get("rejected", 0) > 0:
+        findings.append(
+            f"Skipped {persistence_result.get('rejected', 0)} rows with values the student table "
+            f"cannot hold (semester outside {STUDENT_SEMESTER_RANGE[0]}-{STUDENT_SEMESTER_RANGE[1]} "
+            "or an over-long field)."
+        )
+    if persistence_result.get("highRiskActions", 0) > 0:
+        findings.append(
+            f"Queued {persistence_result.get('highRiskActions', 0)} high-risk parent actions (message/call)."
+        )
+    if persistence_result.get("suppressedAlerts", 0) > 0:
+        findings.append(
+            f"Suppressed {persistence_result.get('suppressedAlerts', 0)} repeat high-risk alerts "
+            f"(arrears unchanged since the last alert within {ALERT_DEDUPE_WINDOW_HOURS:g} hours)."
+        )
+    return findings
+
+
+async def run_upload_job(job: dict, progress: dict) -> dict:
+    with open(job["file_path"], "rb") as stream:
+        return await analyze_upload(
+            job["file_name"],
+            stream,
+            job["extension"],
+            job["content_hash"],
+            progress,
+            ai_budget_seconds=None,
+        )
+
+
+@app.post("/api/evaluation/jobs", status_code=202)
+async def create_upload_job(file: UploadFile = File(...)):
+    extension = validate_upload(file)
+    content_hash = await asyncio.to_thread(hash_upload_content, file.file)
+    try:
+        job, created = await upload_jobs.submit(file.filename, extension, content_hash, file.file)
+    except Exception as e:
+        report_db_error(e)
+        print(f"Error queueing upload job: {e}")
+        raise HTTPException(status_code=500, detail="Unable to queue document analysis")
+    return {**job, "duplicate": not created}
+
+
+@app.post("/api/uploads", status_code=201)
+async def create_chunked_upload(payload: ChunkedUploadRequest):
+    extension = upload_extension(payload.fileName)
+    if payload.size <= 0:
+        raise HTTPException(status_code=400, detail="Uploaded file is empty")
+    if payload.size > chunked_uploads.max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Upload exceeds the {chunked_uploads.max_bytes} byte limit",
+        )
+    if not re.fullmatch(r"[0-9a-fA-F]{64}", payload.sha256):
+        raise HTTPException(status_code=400, detail="sha256 must be a hex SHA-256 digest")
+
+    session = await chunked_uploads.create(
+        payload.fileName, extension, payload.size, payload.sha256
+    )
+    return chunked_uploads.describe(session)
+
+
+@app.get("/api/uploads/{upload_id}")
+async def get_chunked_upload(upload_id: str):
+    session = await chunked_uploads.get(upload_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return chunked_uploads.describe(session)
+
+
+@app.put("/api/uploads/{upload_id}")
+async def write_chunked_upload(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0),
+):
+    # The body is streamed to disk as it arrives; an optional X-Chunk-SHA256 header
+    # makes the chunk all-or-nothing
+    try:
+        new_offset = await chunked_uploads.append(
+            upload_id, offset, request.stream(), request.headers.get("x-chunk-sha256")
+        )
+    except ChunkedUploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except ClientDisconnect:
+        return Response(status_code=400)
+    return {"uploadId": upload_id, "offset": new_offset}
+
+
+@app.delete("/api/uploads/{upload_id}", status_code=204)
+async def delete_chunked_upload(upload_id: str):
+    if await chunked_uploads.get(upload_id) is None:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    await chunked_uploads.discard(upload_id)
+    return Response(status_code=204)
+
+
+@app.post("/api/uploads/{upload_id}/complete", status_code=202)
+async def complete_chunked_upload(upload_id: str, response: Response, background: bool = True):
+    try:
+        session = await chunked_uploads.finish(upload_id)
+    except ChunkedUploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    # The upload is only dropped once it has been handed on, so a failed attempt can be retried
+    data_path = chunked_uploads.data_path(upload_id)
+    if background:
+        # The job takes the file over, so nothing is copied
+        try:
+            job, created = await upload_jobs.submit(
+                session["file_name"], session["extension"], session["sha256"], data_path
+            )
+        except Exception as e:
+            report_db_error(e)
+            print(f"Error queueing upload job: {e}")
+            # submit() leaves the file in place on failure, so /complete can be retried
+            raise HTTPException(status_code=500, detail="Unable to queue document analysis")
+        await chunked_uploads.discard(upload_id)
+        return {**job, "duplicate": not created}
+
+    with open(data_path, "rb") as stream:
+        result = await analyze_upload(
+            session["file_name"], stream, session["extension"], session["sha256"]
+        )
+    await chunked_uploads.discard(upload_id)
+    response.status_code = 200
+    return result
+
+
+@app.get("/api/evaluation/jobs/stats")
+async def get_upload_job_stats():
+    return await upload_jobs.describe()
+
+
+@app.get("/api/evaluation/jobs/{job_id}")
+async def get_upload_job(job_id: str):
+    job = await upload_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+    job.pop("result", None)
+    return job
+
+
+@app.get("/api/evaluation/jobs/{job_id}/result", response_model=DocumentAnalysisResponse)
+async def get_upload_job_result(job_id: str):
+    job = await upload_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Upload job not found")
+    if job["status"] == "failed":
+        raise HTTPException(status_code=422, detail=f"Upload job failed: {job['error']}")
+    if job["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Upload job is still {job['status']}")
+    return job["result"]
+
+
+@app.get("/api/dispatch/stats")
+async def get_dispatch_stats():
+    if not db_status.get("connected", False):
+        return {"running": False, "mode": "memory"}
+    return await dispatch_queue.describe()
+
+
+@app.post("/api/dispatch/receipts")
+async def record_dispatch_receipt(receipt: DispatchReceipt):
+    if not db_status.get("connected", False):
+        raise HTTPException(status_code=503, detail="Dispatch queue requires the database")
+
+    if not await dispatch_queue.record_receipt(receipt.providerRef, receipt.delivered, receipt.error):
+        raise HTTPException(status_code=404, detail="Unknown provider reference")
+    return {"ok": True}
+
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    return {
+        "readCache": response_cache.describe(),
+        "readCacheListening": db.listening,
+        "analysisCache": get_analysis_cache().name,
+    }
+
+
+@app.get("/api/db/pools")
+async def get_pool_stats():
+    return {"pools": db.pool_stats()}
+
+
+@app.get("/api/db/statements")
+async def get_statement_stats(limit: int = Query(10, ge=1, le=100)):
+    return {
+        "statementCacheSize": DB_STATEMENT_CACHE_SIZE,
+        "statements": db.statement_stats(limit),
+    }
+
+
+@app.get("/api/evaluation/ai-findings/{job_id}")
+async def get_ai_findings(job_id: str):
+    entry = ai_followups.get(job_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="AI analysis job not found")
+    return {"jobId": job_id, **entry}
+
+
+@app.get("/api/analytics/summary")
+async def get_analytics_summary(
+    department: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    bucket: str = Query("day", pattern="^(day|month)$"),
+):
+    # Every range here is half-open, [from, to); without an end the trend runs through today
+    trend_to = as_aware_datetime(
+        created_to
+        or truncate_to_bucket(datetime.now(timezone.utc), "day") + timedelta(days=1)
+    )
+    trend_from = as_aware_datetime(
+        created_from or trend_to - timedelta(days=ANALYTICS_DEFAULT_TREND_DAYS)
+    )
+
+    if not db_status.get("connected", False):
+        return memory_analytics_summary(department, created_from, created_to, trend_from, trend_to, bucket)
+
+    try:
+        department_rows, status_rows, trend_rows, rollup_state = await asyncio.gather(
+            db.fetch(
+                """
+                SELECT
+                    department,
+                    SUM(students) AS students,
+                    SUM(total_arrears) AS total_arrears,
+                    SUM(with_arrears) AS with_arrears,
+                    SUM(critical) AS critical,
+                    SUM(medium) AS medium,
+                    SUM(low) AS low
+                FROM student_arrear_rollups
+                WHERE ($1::varchar IS NULL OR department = $1)
+                GROUP BY department
+                HAVING SUM(students) > 0
+                ORDER BY department
+                """,
+                department,
+            ),
+            db.fetch(
+                """
+                SELECT status, SUM(total) AS total
+                FROM notification_daily_rollups
+                WHERE ($1::varchar IS NULL OR department = $1)
+                  AND ($2::timestamptz IS NULL OR day >= ($2::timestamptz AT TIME ZONE 'UTC')::date)
+                  AND ($3::timestamptz IS NULL OR day < ($3::timestamptz AT TIME ZONE 'UTC')::date)
+                GROUP BY status
+                HAVING SUM(total) > 0
+                """,
+                department,
+                created_from,
+                created_to,
+            ),
+            db.fetch(
+                """
+                WITH buckets AS (
+                    SELECT generate_series(
+                        date_trunc($4, ($2::timestamptz AT TIME ZONE 'UTC')::date),
+                        ($3::timestamptz AT TIME ZONE 'UTC')::date - 1,
+                        ('1 ' || $4)::interval
+                    )::date AS bucket
+                ),
+                counts AS (
+                    SELECT
+                        date_trunc($4, day)::date AS bucket,
+                        SUM(total) AS alerts,
+                        SUM(total) FILTER (WHERE status IN ('sent', 'delivered')) AS sent
+                    FROM notification_daily_rollups
+                    WHERE ($1::varchar IS NULL OR department = $1)
+                      AND day >= ($2::timestamptz AT TIME ZONE 'UTC')::date
+                      AND day < ($3::timestamptz AT TIME ZONE 'UTC')::date
+                    GROUP BY 1
+                )
+                SELECT b.bucket, COALESCE(c.alerts, 0) AS alerts, COALESCE(c.sent, 0) AS sent
+                FROM buckets b
+                LEFT JOIN counts c ON c.bucket = b.bucket
+                ORDER BY b.bucket
+                """,
+                department,
+                trend_from,
+                trend_to,
+                bucket,
+            ),
+            db.fetch(
+                """
+                SELECT
+                    (SELECT rebuilt_at FROM rollup_state WHERE name = 'arrear_rollups') AS rebuilt_at,
+                    GREATEST(
+                        (SELECT MAX(updated_at) FROM student_arrear_rollups),
+                        (SELECT MAX(updated_at) FROM notification_daily_rollups)
+                    ) AS updated_at
+                """
+            ),
+        )
+    except Exception as e:
+        report_db_error(e)
+        print(f"Error building analytics summary: {e}")
+        raise db_http_error(e, "Unable to build analytics summary")
+
+    summary = build_analytics_summary(
+        department_rows,
+        {row["status"]: row["total"] for row in status_rows},
+        trend_rows,
+    )
+    return {**summary, "rollup": describe_rollup_freshness(rollup_state[0])}
+
+
 @app.get("/api/students")
-async def get_students():
+async def get_students(
+    request: Request,
+    cursor: Optional[int] = Query(None, ge=1),
+    limit: int = Query(STUDENT_PAGE_DEFAULT_LIMIT, ge=1, le=STUDENT_PAGE_MAX_LIMIT),
+    department: Optional[str] = None,
+    semester: Optional[int] = None,
+    min_arrears: Optional[int] = Query(None, ge=0),
+    max_arrears: Optional[int] = Query(None, ge=0),
+    is_active: Optional[bool] = None,
+    q: Optional[str] = Query(None, max_length=120),
+    fields: Optional[str] = None,
+):
+    filters = {
+        "department": department,
+        "semester": semester,
+        "min_arrears": min_arrears,
+        "max_arrears": max_arrears,
+        "is_active": is_active,
+        "q": q.strip() if q else None,
+    }
+    columns = resolve_student_fields(fields)
+    return await serve_cached_json(
+        request,
+        "students",
+        lambda response: fetch_students_page(response, cursor, limit, filters, columns),
+    )
+
+
+async def fetch_students_page(
+    response: Response,
+    cursor: Optional[int],
+    limit: int,
+    filters: dict,
+    columns: list[str],
+) -> list[dict]:
     if not db_status.get("connected", False):
-        return memory_state["students"]
+        return paginate_memory_students(response, cursor, limit, filters, columns)
 
     try:
-        students = await db.fetch(
-            """
-            SELECT id, roll_no, name, department, semester, arrears_count, parent_phone, parent_email, photo_url, created_at
+        clauses, args = build_student_filters(filters)
+        if cursor is not None:
+            args.append(cursor)
+            clauses.append(f"id < ${len(args)}")
+        where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        args.append(limit + 1)
+
+        # Keyset page on the primary key: one extra row tells us whether another page exists
+        page_sql = f"""
+            SELECT {', '.join(columns)}
             FROM students
+            {where_sql}
             ORDER BY id DESC
+            LIMIT ${len(args)}
             """
-        )
-        return students
+        if JSON_RESPONSE_MODE == "postgres":
+            return await fetch_json_page(response, page_sql, args, limit)
+
+        students = await db.fetch(page_sql, *args)
+        return set_next_cursor(response, students, limit)
     except Exception as e:
-        db_status["connected"] = False
+        report_db_error(e)
         print(f"Error fetching students: {e}")
-        return memory_state["students"]
+        raise db_http_error(e, "Unable to fetch students")
 
 
 @app.post("/api/students", status_code=201)
@@ -894,6 +2476,7 @@ async def create_student(student: Student):
         }
         memory_state["next_student_id"] += 1
         memory_state["students"].insert(0, new_student)
+        invalidate_read_cache("students")
         return new_student
 
     try:
@@ -908,10 +2491,14 @@ async def create_student(student: Student):
             student.department,
             student.semester,
         )
+        invalidate_read_cache("students")
         return result[0] if result else None
     except Exception as e:
-        db_status["connected"] = False
+        report_db_error(e)
         print(f"Error creating student: {e}")
+        # Only a lost connection falls back to memory; a rejected row is the caller's to fix
+        if not is_connection_error(e):
+            raise db_http_error(e, "Unable to create student")
         new_student = {
             "id": memory_state["next_student_id"],
             "roll_no": student.roll_no,
@@ -922,14 +2509,58 @@ async def create_student(student: Student):
         }
         memory_state["next_student_id"] += 1
         memory_state["students"].insert(0, new_student)
+        invalidate_read_cache("students")
         return new_student
 
 
 @app.get("/api/students/{roll_no}")
-async def get_student_profile(roll_no: str):
+async def get_student_profile(request: Request, roll_no: str):
     if not roll_no:
         raise HTTPException(status_code=400, detail="roll_no is required")
 
+    return await serve_cached_json(
+        request, "profile", lambda response: fetch_student_profile(roll_no)
+    )
+
+
+# One round trip: the student plus their latest notifications and alert actions,
+# each aggregated to JSON by a LATERAL subquery over its (student_id, created_at) index
+STUDENT_PROFILE_QUERY = db.statement(
+    "student_profile",
+    """
+    SELECT
+        s.id, s.roll_no, s.name, s.department, s.semester, s.email, s.phone,
+        s.parent_email, s.parent_phone, s.arrears_count, s.photo_url, s.created_at,
+        COALESCE(recent_notifications.items, '[]'::json) AS notifications,
+        COALESCE(recent_alert_actions.items, '[]'::json) AS alert_actions
+    FROM students s
+    LEFT JOIN LATERAL (
+        SELECT json_agg(n ORDER BY n.created_at DESC) AS items
+        FROM (
+            SELECT id, message, status, notification_type, priority, sent_at, created_at
+            FROM notifications
+            WHERE student_id = s.id
+            ORDER BY created_at DESC
+            LIMIT 10
+        ) n
+    ) recent_notifications ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT json_agg(a ORDER BY a.created_at DESC) AS items
+        FROM (
+            SELECT id, channel, recipient, message, status, sent_at, created_at
+            FROM alert_actions
+            WHERE student_id = s.id
+            ORDER BY created_at DESC
+            LIMIT 10
+        ) a
+    ) recent_alert_actions ON TRUE
+    WHERE s.roll_no = $1
+    LIMIT 1
+    """,
+)
+
+
+async def fetch_student_profile(roll_no: str) -> dict:
     if not db_status.get("connected", False):
         student = next(
             (item for item in memory_state["students"] if item.get("roll_no") == roll_no),
@@ -946,45 +2577,17 @@ async def get_student_profile(roll_no: str):
             "alertActions": [],
         }
 
-    student_rows = await db.fetch(
-        """
-        SELECT id, roll_no, name, department, semester, email, phone, parent_email, parent_phone, arrears_count, photo_url, created_at
-        FROM students
-        WHERE roll_no = $1
-        LIMIT 1
-        """,
-        roll_no,
-    )
+    student_rows = await db.fetch(STUDENT_PROFILE_QUERY, roll_no)
 
     if not student_rows:
         raise HTTPException(status_code=404, detail="Student not found")
 
     student = student_rows[0]
+    notifications = json.loads(student.pop("notifications"))
+    alert_actions = json.loads(student.pop("alert_actions"))
     if not student.get("photo_url"):
         student["photo_url"] = make_photo_url(student.get("name", "Student"))
 
-    notifications = await db.fetch(
-        """
-        SELECT id, message, status, notification_type, priority, sent_at, created_at
-        FROM notifications
-        WHERE student_id = $1
-        ORDER BY created_at DESC
-        LIMIT 10
-        """,
-        student.get("id"),
-    )
-
-    alert_actions = await db.fetch(
-        """
-        SELECT id, channel, recipient, message, status, sent_at, created_at
-        FROM alert_actions
-        WHERE student_id = $1
-        ORDER BY created_at DESC
-        LIMIT 10
-        """,
-        student.get("id"),
-    )
-
     return {
         "student": student,
         "notifications": notifications,
@@ -1012,7 +2615,7 @@ async def create_student_contact_action(roll_no: str, payload: StudentContactAct
             "mode": "memory",
             "roll_no": roll_no,
             "channel": normalized_channel,
-            "status": "sent",
+            "status": "queued",
             "recipient": payload.recipient,
         }
 
@@ -1032,7 +2635,7 @@ async def create_student_contact_action(roll_no: str, payload: StudentContactAct
     student = student_rows[0]
     resolved_recipient = (payload.recipient or "").strip()
     if not resolved_recipient:
-        if normalized_channel == "call":
+        if normalized_channel in ("call", "sms"):
             resolved_recipient = student.get("parent_phone") or ""
         elif normalized_channel == "email":
             resolved_recipient = (
@@ -1047,8 +2650,8 @@ async def create_student_contact_action(roll_no: str, payload: StudentContactAct
 
     result = await db.fetch(
         """
-        INSERT INTO alert_actions (student_id, notification_id, channel, recipient, message, status, sent_at)
-        VALUES ($1, NULL, $2, $3, $4, 'sent', NOW())
+        INSERT INTO alert_actions (student_id, notification_id, channel, recipient, message, status)
+        VALUES ($1, NULL, $2, $3, $4, 'queued')
         RETURNING id, student_id, channel, recipient, message, status, sent_at, created_at
         """,
         student.get("id"),
@@ -1057,69 +2660,77 @@ async def create_student_contact_action(roll_no: str, payload: StudentContactAct
         message,
     )
 
+    invalidate_read_cache("alert_actions")
+    dispatch_queue.wake()
     return result[0] if result else {
         "ok": True,
         "roll_no": roll_no,
         "channel": normalized_channel,
-        "status": "sent",
+        "status": "queued",
     }
 
 
 @app.get("/api/notifications")
-async def get_notifications():
+async def get_notifications(
+    request: Request,
+    cursor: Optional[int] = Query(None, ge=1),
+    limit: int = Query(
+        NOTIFICATION_PAGE_DEFAULT_LIMIT, ge=1, le=NOTIFICATION_PAGE_MAX_LIMIT
+    ),
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    notification_type: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    filters = {
+        "status": status,
+        "priority": priority,
+        "notification_type": notification_type,
+        "created_from": created_from,
+        "created_to": created_to,
+    }
+    return await serve_cached_json(
+        request,
+        "notifications",
+        lambda response: fetch_notifications_page(response, cursor, limit, filters),
+    )
+
+
+async def fetch_notifications_page(
+    response: Response, cursor: Optional[int], limit: int, filters: dict
+) -> list[dict]:
     if not db_status.get("connected", False):
-        merged = []
-        for item in memory_state["notifications"]:
-            student = next(
-                (s for s in memory_state["students"] if s["id"] == item["student_id"]),
-                None,
-            )
-            merged.append(
-                {
-                    **item,
-                    "student_name": student["name"] if student else "Unknown",
-                    "severity": severity_from_semester(
-                        student["semester"] if student else None
-                    ),
-                }
-            )
-        return merged
+        return paginate_memory_notifications(response, cursor, limit, filters)
 
     try:
-        notifications = await db.fetch(
-            """
-            SELECT n.id, n.student_id, s.name AS student_name, s.semester, n.message, n.status, n.sent_at, n.created_at
+        clauses, args = build_notification_filters(filters)
+        if cursor is not None:
+            args.append(cursor)
+            clauses.append(f"n.id < ${len(args)}")
+        where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        args.append(limit + 1)
+
+        page_sql = f"""
+            SELECT
+                n.id, n.student_id, s.name AS student_name, s.semester, n.message, n.status,
+                n.notification_type, n.priority, n.sent_at, n.created_at,
+                {SEVERITY_SQL} AS severity
             FROM notifications n
             INNER JOIN students s ON s.id = n.student_id
+            {where_sql}
             ORDER BY n.id DESC
+            LIMIT ${len(args)}
             """
-        )
-        return [
-            {
-                **notification,
-                "severity": severity_from_semester(notification.get("semester")),
-            }
-            for notification in notifications
-        ]
+        if JSON_RESPONSE_MODE == "postgres":
+            return await fetch_json_page(response, page_sql, args, limit)
+
+        notifications = await db.fetch(page_sql, *args)
+        return set_next_cursor(response, notifications, limit)
     except Exception as e:
-        db_status["connected"] = False
+        report_db_error(e)
         print(f"Error fetching notifications: {e}")
-        merged = []
-        for item in memory_state["notifications"]:
-            student = next(
-                (s for s in memory_state["students"] if s["id"] == item["student_id"]),
-                None,
-            )
-            merged.append(
-                {
-                    **item,
-                    "student_name": student["name"] if student else "Unknown",
-                    "severity": severity_from_semester(
-                        student["semester"] if student else None
-                    ),
-                }
-            )
-        return merged
+        raise db_http_error(e, "Unable to fetch notifications")
 
 
 @app.post("/api/notifications", status_code=201)
@@ -1144,23 +2755,28 @@ async def create_notification(notification: Notification):
         }
         memory_state["next_notification_id"] += 1
         memory_state["notifications"].insert(0, new_notification)
+        invalidate_read_cache("notifications")
         return new_notification
 
     try:
         result = await db.fetch(
             """
             INSERT INTO notifications (student_id, message, status, sent_at)
-            VALUES ($1, $2, $3, CASE WHEN $3 = 'sent' THEN NOW() ELSE NULL END)
+            VALUES ($1, $2, $3::varchar, CASE WHEN $3::varchar = 'sent' THEN NOW() ELSE NULL END)
             RETURNING id, student_id, message, status, sent_at, created_at
             """,
             notification.student_id,
             notification.message,
             notification.status or "pending",
         )
+        invalidate_read_cache("notifications")
         return result[0] if result else None
     except Exception as e:
-        db_status["connected"] = False
+        report_db_error(e)
         print(f"Error creating notification: {e}")
+        # Only a lost connection falls back to memory; a rejected row is the caller's to fix
+        if not is_connection_error(e):
+            raise db_http_error(e, "Unable to create notification")
         new_notification = {
             "id": memory_state["next_notification_id"],
             "student_id": notification.student_id,
@@ -1175,9 +2791,101 @@ async def create_notification(notification: Notification):
         }
         memory_state["next_notification_id"] += 1
         memory_state["notifications"].insert(0, new_notification)
+        invalidate_read_cache("notifications")
         return new_notification
 
 
+@app.get("/api/exports/students")
+async def export_students(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    department: Optional[str] = None,
+    semester: Optional[int] = None,
+    min_arrears: Optional[int] = Query(None, ge=0),
+    max_arrears: Optional[int] = Query(None, ge=0),
+    is_active: Optional[bool] = None,
+    q: Optional[str] = Query(None, max_length=120),
+    fields: Optional[str] = None,
+):
+    filters = {
+        "department": department,
+        "semester": semester,
+        "min_arrears": min_arrears,
+        "max_arrears": max_arrears,
+        "is_active": is_active,
+        "q": q.strip() if q else None,
+    }
+    columns = resolve_student_fields(fields) if fields else list(STUDENT_LIST_FIELDS)
+
+    if not db_status.get("connected", False):
+        matches = (
+            {column: student.get(column) for column in columns}
+            for student in memory_state["students"]
+            if memory_student_matches(student, filters)
+        )
+        return export_response(request, "students", iter_memory_export(matches), columns, format)
+
+    clauses, args = build_student_filters(filters)
+    where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    batches = iter_postgres_export(
+        f"""
+        SELECT {', '.join(columns)}
+        FROM students
+        {where_sql}
+        ORDER BY id
+        """,
+        args,
+    )
+    return export_response(request, "students", batches, columns, format)
+
+
+@app.get("/api/exports/notifications")
+async def export_notifications(
+    request: Request,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    notification_type: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    filters = {
+        "status": status,
+        "priority": priority,
+        "notification_type": notification_type,
+        "created_from": created_from,
+        "created_to": created_to,
+    }
+    columns = list(NOTIFICATION_EXPORT_FIELDS)
+
+    if not db_status.get("connected", False):
+        students_by_id = {student["id"]: student for student in memory_state["students"]}
+        matches = (
+            memory_notification_export_row(item, students_by_id)
+            for item in sorted(memory_state["notifications"], key=lambda entry: entry["id"])
+            if memory_notification_matches(item, filters)
+        )
+        return export_response(request, "notifications", iter_memory_export(matches), columns, format)
+
+    clauses, args = build_notification_filters(filters)
+    where_sql = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    batches = iter_postgres_export(
+        f"""
+        SELECT
+            n.id, n.student_id, s.roll_no, s.name AS student_name, s.department, s.semester,
+            n.message, n.status, n.notification_type, n.priority,
+            {SEVERITY_SQL} AS severity,
+            n.sent_at, n.created_at
+        FROM notifications n
+        INNER JOIN students s ON s.id = n.student_id
+        {where_sql}
+        ORDER BY n.id
+        """,
+        args,
+    )
+    return export_response(request, "notifications", batches, columns, format)
+
+
 @app.get("/")
 async def root():
     return {"message": "APNS Backend API - Use /docs for API documentation"}
@@ -0,0 +1,658 @@
+# Versioned schema changes, applied in order by Database._init_schema and recorded
+# in schema_migrations. Add a change as a new entry with the next version number;
+# never edit one that has already been applied somewhere.
+#
+# Version 1 is the schema as it stood before versioning. Every statement in it is
+# idempotent, so it is safe on databases that were created by earlier releases.
+BASELINE_SQL = """
+    -- Users table for authentication
+    CREATE TABLE IF NOT EXISTS users (
+        id SERIAL PRIMARY KEY,
+        full_name VARCHAR(120) NOT NULL,
+        email VARCHAR(255) UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        role VARCHAR(30) NOT NULL DEFAULT 'admin',
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+    CREATE INDEX IF NOT EXISTS idx_users_role ON users(role);
+
+    -- Students table
+    CREATE TABLE IF NOT EXISTS students (
+        id SERIAL PRIMARY KEY,
+        roll_no VARCHAR(30) UNIQUE NOT NULL,
+        name VARCHAR(120) NOT NULL,
+        department VARCHAR(120),
+        semester INTEGER CHECK (semester >= 1 AND semester <= 12),
+        email VARCHAR(255),
+        phone VARCHAR(20),
+        parent_email VARCHAR(255),
+        parent_phone VARCHAR(20),
+        photo_url TEXT,
+        arrears_count INTEGER DEFAULT 0,
+        is_active BOOLEAN DEFAULT true,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Add missing columns if they don't exist
+    ALTER TABLE students ADD COLUMN IF NOT EXISTS email VARCHAR(255);
+    ALTER TABLE students ADD COLUMN IF NOT EXISTS phone VARCHAR(20);
+    ALTER TABLE students ADD COLUMN IF NOT EXISTS parent_email VARCHAR(255);
+    ALTER TABLE students ADD COLUMN IF NOT EXISTS parent_phone VARCHAR(20);
+    ALTER TABLE students ADD COLUMN IF NOT EXISTS photo_url TEXT;
+    ALTER TABLE students ADD COLUMN IF NOT EXISTS arrears_count INTEGER DEFAULT 0;
+    ALTER TABLE students ADD COLUMN IF NOT EXISTS is_active BOOLEAN DEFAULT true;
+    ALTER TABLE students ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP;
+
+    -- Add missing notification columns
+    ALTER TABLE IF EXISTS notifications ADD COLUMN IF NOT EXISTS notification_type VARCHAR(50) DEFAULT 'arrear';
+    ALTER TABLE IF EXISTS notifications ADD COLUMN IF NOT EXISTS priority VARCHAR(20) DEFAULT 'medium';
+    ALTER TABLE IF EXISTS notifications ADD COLUMN IF NOT EXISTS arrears_count INTEGER;
+    ALTER TABLE IF EXISTS notifications ADD COLUMN IF NOT EXISTS delivered_at TIMESTAMP WITH TIME ZONE;
+
+    CREATE INDEX IF NOT EXISTS idx_students_roll_no ON students(roll_no);
+    CREATE INDEX IF NOT EXISTS idx_students_department ON students(department);
+    CREATE INDEX IF NOT EXISTS idx_students_semester ON students(semester);
+    CREATE INDEX IF NOT EXISTS idx_students_is_active ON students(is_active);
+
+    -- Notifications table
+    CREATE TABLE IF NOT EXISTS notifications (
+        id SERIAL PRIMARY KEY,
+        student_id INTEGER NOT NULL,
+        message TEXT NOT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sent', 'failed', 'delivered')),
+        notification_type VARCHAR(50) DEFAULT 'arrear',
+        priority VARCHAR(20) DEFAULT 'medium' CHECK (priority IN ('low', 'medium', 'high', 'critical')),
+        arrears_count INTEGER,
+        sent_at TIMESTAMP WITH TIME ZONE,
+        delivered_at TIMESTAMP WITH TIME ZONE,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        CONSTRAINT fk_student FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE ON UPDATE CASCADE
+    );
+
+    -- (student_id, created_at DESC) serves both the FK lookups and the profile's latest-10 scan
+    DROP INDEX IF EXISTS idx_notifications_student_id;
+    CREATE INDEX IF NOT EXISTS idx_notifications_student_created_at ON notifications(student_id, created_at DESC);
+    CREATE INDEX IF NOT EXISTS idx_notifications_status ON notifications(status);
+    CREATE INDEX IF NOT EXISTS idx_notifications_created_at ON notifications(created_at);
+    -- Upload alert dedupe looks up each student's latest arrear alert
+    CREATE INDEX IF NOT EXISTS idx_notifications_arrear_dedupe ON notifications(student_id, created_at DESC)
+        INCLUDE (arrears_count) WHERE notification_type = 'arrear';
+
+    -- Alert actions table (SMS / Call tracking)
+    CREATE TABLE IF NOT EXISTS alert_actions (
+        id SERIAL PRIMARY KEY,
+        student_id INTEGER NOT NULL,
+        notification_id INTEGER,
+        channel VARCHAR(20) NOT NULL CHECK (channel IN ('sms', 'call', 'email')),
+        recipient VARCHAR(255),
+        message TEXT NOT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'sending', 'sent', 'delivered', 'failed')),
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        last_error TEXT,
+        provider_ref VARCHAR(120),
+        sent_at TIMESTAMP WITH TIME ZONE,
+        delivered_at TIMESTAMP WITH TIME ZONE,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        CONSTRAINT fk_alert_student FOREIGN KEY (student_id) REFERENCES students(id) ON DELETE CASCADE ON UPDATE CASCADE,
+        CONSTRAINT fk_alert_notification FOREIGN KEY (notification_id) REFERENCES notifications(id) ON DELETE SET NULL ON UPDATE CASCADE
+    );
+
+    -- Dispatch queue columns and the widened channel/status checks for existing tables
+    ALTER TABLE alert_actions ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0;
+    ALTER TABLE alert_actions ADD COLUMN IF NOT EXISTS next_attempt_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP;
+    ALTER TABLE alert_actions ADD COLUMN IF NOT EXISTS last_error TEXT;
+    ALTER TABLE alert_actions ADD COLUMN IF NOT EXISTS provider_ref VARCHAR(120);
+    ALTER TABLE alert_actions ADD COLUMN IF NOT EXISTS delivered_at TIMESTAMP WITH TIME ZONE;
+
+    DO $$
+    BEGIN
+        IF NOT EXISTS (
+            SELECT 1 FROM pg_constraint
+            WHERE conrelid = 'alert_actions'::regclass
+              AND conname = 'alert_actions_status_check'
+              AND pg_get_constraintdef(oid) LIKE '%delivered%'
+        ) THEN
+            ALTER TABLE alert_actions DROP CONSTRAINT IF EXISTS alert_actions_channel_check;
+            ALTER TABLE alert_actions DROP CONSTRAINT IF EXISTS alert_actions_status_check;
+            ALTER TABLE alert_actions ADD CONSTRAINT alert_actions_channel_check
+                CHECK (channel IN ('sms', 'call', 'email'));
+            ALTER TABLE alert_actions ADD CONSTRAINT alert_actions_status_check
+                CHECK (status IN ('queued', 'sending', 'sent', 'delivered', 'failed'));
+        END IF;
+    END $$;
+
+    DROP INDEX IF EXISTS idx_alert_actions_student_id;
+    CREATE INDEX IF NOT EXISTS idx_alert_actions_student_created_at ON alert_actions(student_id, created_at DESC);
+    CREATE INDEX IF NOT EXISTS idx_alert_actions_channel ON alert_actions(channel);
+    CREATE INDEX IF NOT EXISTS idx_alert_actions_status ON alert_actions(status);
+    CREATE INDEX IF NOT EXISTS idx_alert_actions_dispatch ON alert_actions(channel, next_attempt_at)
+        WHERE status IN ('queued', 'sending');
+    CREATE INDEX IF NOT EXISTS idx_alert_actions_provider_ref ON alert_actions(provider_ref)
+        WHERE provider_ref IS NOT NULL;
+
+    -- Cached document analysis results, keyed by file hash and model
+    CREATE TABLE IF NOT EXISTS analysis_cache (
+        cache_key VARCHAR(128) PRIMARY KEY,
+        result JSONB NOT NULL,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        last_hit_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_analysis_cache_expires_at ON analysis_cache(expires_at);
+    CREATE INDEX IF NOT EXISTS idx_analysis_cache_last_hit_at ON analysis_cache(last_hit_at);
+
+    -- Background document uploads; at most one queued or running job per file hash
+    CREATE TABLE IF NOT EXISTS upload_jobs (
+        id VARCHAR(32) PRIMARY KEY,
+        file_name VARCHAR(255) NOT NULL,
+        extension VARCHAR(10) NOT NULL,
+        content_hash VARCHAR(64) NOT NULL,
+        file_path TEXT NOT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'completed', 'failed')),
+        progress JSONB NOT NULL DEFAULT '{}'::jsonb,
+        result JSONB,
+        error TEXT,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        lease_expires_at TIMESTAMP WITH TIME ZONE,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        started_at TIMESTAMP WITH TIME ZONE,
+        finished_at TIMESTAMP WITH TIME ZONE,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+    );
+
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_upload_jobs_active_hash ON upload_jobs(content_hash)
+        WHERE status IN ('queued', 'running');
+    CREATE INDEX IF NOT EXISTS idx_upload_jobs_claim ON upload_jobs(created_at)
+        WHERE status IN ('queued', 'running');
+
+    -- Auto-update trigger for timestamps
+    CREATE OR REPLACE FUNCTION update_timestamp()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        NEW.updated_at = CURRENT_TIMESTAMP;
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS update_students_timestamp ON students;
+    CREATE TRIGGER update_students_timestamp
+    BEFORE UPDATE ON students
+    FOR EACH ROW
+    EXECUTE FUNCTION update_timestamp();
+
+    DROP TRIGGER IF EXISTS update_notifications_timestamp ON notifications;
+    CREATE TRIGGER update_notifications_timestamp
+    BEFORE UPDATE ON notifications
+    FOR EACH ROW
+    EXECUTE FUNCTION update_timestamp();
+
+    DROP TRIGGER IF EXISTS update_alert_actions_timestamp ON alert_actions;
+    CREATE TRIGGER update_alert_actions_timestamp
+    BEFORE UPDATE ON alert_actions
+    FOR EACH ROW
+    EXECUTE FUNCTION update_timestamp();
+
+    -- Arrear rollups for the dashboards, kept current by statement-level triggers
+    CREATE TABLE IF NOT EXISTS student_arrear_rollups (
+        department VARCHAR(120) NOT NULL,
+        semester INTEGER NOT NULL,
+        students INTEGER NOT NULL DEFAULT 0,
+        total_arrears INTEGER NOT NULL DEFAULT 0,
+        with_arrears INTEGER NOT NULL DEFAULT 0,
+        critical INTEGER NOT NULL DEFAULT 0,
+        medium INTEGER NOT NULL DEFAULT 0,
+        low INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (department, semester)
+    );
+
+    CREATE TABLE IF NOT EXISTS notification_daily_rollups (
+        day DATE NOT NULL,
+        department VARCHAR(120) NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        total INTEGER NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (day, department, status)
+    );
+
+    CREATE TABLE IF NOT EXISTS rollup_state (
+        name VARCHAR(50) PRIMARY KEY,
+        rebuilt_at TIMESTAMP WITH TIME ZONE NOT NULL
+    );
+
+    CREATE OR REPLACE FUNCTION apply_student_rollup_delta()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            INSERT INTO student_arrear_rollups AS r (
+                department, semester, students, total_arrears, with_arrears, critical, medium, low
+            )
+            SELECT
+                COALESCE(department, 'Unknown'),
+                COALESCE(semester, 0),
+                -COUNT(*),
+                -COALESCE(SUM(arrears_count), 0),
+                -COUNT(*) FILTER (WHERE arrears_count > 0),
+                -COUNT(*) FILTER (WHERE arrears_count > 3),
+                -COUNT(*) FILTER (WHERE arrears_count BETWEEN 2 AND 3),
+                -COUNT(*) FILTER (WHERE arrears_count = 1)
+            FROM old_rows
+            GROUP BY 1, 2
+            ON CONFLICT (department, semester) DO UPDATE SET
+                students = r.students + EXCLUDED.students,
+                total_arrears = r.total_arrears + EXCLUDED.total_arrears,
+                with_arrears = r.with_arrears + EXCLUDED.with_arrears,
+                critical = r.critical + EXCLUDED.critical,
+                medium = r.medium + EXCLUDED.medium,
+                low = r.low + EXCLUDED.low,
+                updated_at = CURRENT_TIMESTAMP;
+        END IF;
+
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO student_arrear_rollups AS r (
+                department, semester, students, total_arrears, with_arrears, critical, medium, low
+            )
+            SELECT
+                COALESCE(department, 'Unknown'),
+                COALESCE(semester, 0),
+                COUNT(*),
+                COALESCE(SUM(arrears_count), 0),
+                COUNT(*) FILTER (WHERE arrears_count > 0),
+                COUNT(*) FILTER (WHERE arrears_count > 3),
+                COUNT(*) FILTER (WHERE arrears_count BETWEEN 2 AND 3),
+                COUNT(*) FILTER (WHERE arrears_count = 1)
+            FROM new_rows
+            GROUP BY 1, 2
+            ON CONFLICT (department, semester) DO UPDATE SET
+                students = r.students + EXCLUDED.students,
+                total_arrears = r.total_arrears + EXCLUDED.total_arrears,
+                with_arrears = r.with_arrears + EXCLUDED.with_arrears,
+                critical = r.critical + EXCLUDED.critical,
+                medium = r.medium + EXCLUDED.medium,
+                low = r.low + EXCLUDED.low,
+                updated_at = CURRENT_TIMESTAMP;
+        END IF;
+
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    CREATE OR REPLACE FUNCTION apply_notification_rollup_delta()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            INSERT INTO notification_daily_rollups AS r (day, department, status, total)
+            SELECT
+                (o.created_at AT TIME ZONE 'UTC')::date,
+                COALESCE(s.department, 'Unknown'),
+                o.status,
+                -COUNT(*)
+            FROM old_rows o
+            LEFT JOIN students s ON s.id = o.student_id
+            GROUP BY 1, 2, 3
+            ON CONFLICT (day, department, status) DO UPDATE SET
+                total = r.total + EXCLUDED.total,
+                updated_at = CURRENT_TIMESTAMP;
+        END IF;
+
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO notification_daily_rollups AS r (day, department, status, total)
+            SELECT
+                (n.created_at AT TIME ZONE 'UTC')::date,
+                COALESCE(s.department, 'Unknown'),
+                n.status,
+                COUNT(*)
+            FROM new_rows n
+            LEFT JOIN students s ON s.id = n.student_id
+            GROUP BY 1, 2, 3
+            ON CONFLICT (day, department, status) DO UPDATE SET
+                total = r.total + EXCLUDED.total,
+                updated_at = CURRENT_TIMESTAMP;
+        END IF;
+
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    -- Full recompute; SHARE locks wait out in-flight writers and hold new ones off meanwhile
+    CREATE OR REPLACE FUNCTION rebuild_arrear_rollups()
+    RETURNS void AS $$
+    BEGIN
+        LOCK TABLE students, notifications IN SHARE MODE;
+
+        DELETE FROM student_arrear_rollups;
+        INSERT INTO student_arrear_rollups (
+            department, semester, students, total_arrears, with_arrears, critical, medium, low
+        )
+        SELECT
+            COALESCE(department, 'Unknown'),
+            COALESCE(semester, 0),
+            COUNT(*),
+            COALESCE(SUM(arrears_count), 0),
+            COUNT(*) FILTER (WHERE arrears_count > 0),
+            COUNT(*) FILTER (WHERE arrears_count > 3),
+            COUNT(*) FILTER (WHERE arrears_count BETWEEN 2 AND 3),
+            COUNT(*) FILTER (WHERE arrears_count = 1)
+        FROM students
+        GROUP BY 1, 2;
+
+        DELETE FROM notification_daily_rollups;
+        INSERT INTO notification_daily_rollups (day, department, status, total)
+        SELECT
+            (n.created_at AT TIME ZONE 'UTC')::date,
+            COALESCE(s.department, 'Unknown'),
+            n.status,
+            COUNT(*)
+        FROM notifications n
+        LEFT JOIN students s ON s.id = n.student_id
+        GROUP BY 1, 2, 3;
+
+        INSERT INTO rollup_state (name, rebuilt_at)
+        VALUES ('arrear_rollups', CURRENT_TIMESTAMP)
+        ON CONFLICT (name) DO UPDATE SET rebuilt_at = EXCLUDED.rebuilt_at;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS students_rollup_insert ON students;
+    CREATE TRIGGER students_rollup_insert
+    AFTER INSERT ON students
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION apply_student_rollup_delta();
+
+    DROP TRIGGER IF EXISTS students_rollup_update ON students;
+    CREATE TRIGGER students_rollup_update
+    AFTER UPDATE ON students
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION apply_student_rollup_delta();
+
+    DROP TRIGGER IF EXISTS students_rollup_delete ON students;
+    CREATE TRIGGER students_rollup_delete
+    AFTER DELETE ON students
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION apply_student_rollup_delta();
+
+    DROP TRIGGER IF EXISTS notifications_rollup_insert ON notifications;
+    CREATE TRIGGER notifications_rollup_insert
+    AFTER INSERT ON notifications
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION apply_notification_rollup_delta();
+
+    DROP TRIGGER IF EXISTS notifications_rollup_update ON notifications;
+    CREATE TRIGGER notifications_rollup_update
+    AFTER UPDATE ON notifications
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION apply_notification_rollup_delta();
+
+    DROP TRIGGER IF EXISTS notifications_rollup_delete ON notifications;
+    CREATE TRIGGER notifications_rollup_delete
+    AFTER DELETE ON notifications
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION apply_notification_rollup_delta();
+
+    -- Tell every API worker which table changed so it can drop its cached reads
+    CREATE OR REPLACE FUNCTION notify_read_cache()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        PERFORM pg_notify('apns_read_cache', TG_TABLE_NAME);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+
+    DROP TRIGGER IF EXISTS students_read_cache ON students;
+    CREATE TRIGGER students_read_cache
+    AFTER INSERT OR UPDATE OR DELETE ON students
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_read_cache();
+
+    DROP TRIGGER IF EXISTS notifications_read_cache ON notifications;
+    CREATE TRIGGER notifications_read_cache
+    AFTER INSERT OR UPDATE OR DELETE ON notifications
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_read_cache();
+
+    DROP TRIGGER IF EXISTS alert_actions_read_cache ON alert_actions;
+    CREATE TRIGGER alert_actions_read_cache
+    AFTER INSERT OR UPDATE OR DELETE ON alert_actions
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION notify_read_cache();
+
+    -- Insert sample data if not exists
+    INSERT INTO students (roll_no, name, department, semester) VALUES
+    ('SIST2023001', 'Arjun Kumar', 'CSE', 6),
+    ('SIST2023002', 'Priya Singh', 'ECE', 4),
+    ('SIST2023003', 'Rahul Verma', 'MECH', 2),
+    ('SIST2023004', 'Neha Gupta', 'IT', 8),
+    ('SIST2023005', 'Aditya Patel', 'CSE', 5),
+    ('SIST2023006', 'Divya Sharma', 'ECE', 3)
+    ON CONFLICT (roll_no) DO NOTHING;
+
+    -- Insert sample notifications only if students already exist
+    INSERT INTO notifications (student_id, message, status, notification_type, priority) 
+    SELECT 
+        s.id, 
+        'You have pending arrears'::text, 
+        'pending'::varchar, 
+        'arrear'::varchar, 
+        'critical'::varchar
+    FROM students s 
+    WHERE s.roll_no = 'SIST2023001' 
+    AND NOT EXISTS (SELECT 1 FROM notifications WHERE student_id = s.id);
+
+    INSERT INTO notifications (student_id, message, status, notification_type, priority) 
+    SELECT 
+        s.id,
+        'Notification for semester review'::text,
+        'sent'::varchar,
+        'review'::varchar,
+        'medium'::varchar
+    FROM students s
+    WHERE s.roll_no = 'SIST2023002'
+    AND NOT EXISTS (SELECT 1 FROM notifications WHERE student_id = s.id);
+
+    INSERT INTO notifications (student_id, message, status, notification_type, priority) 
+    SELECT 
+        s.id,
+        'Deadline approaching for assignments'::text,
+        'pending'::varchar,
+        'reminder'::varchar,
+        'high'::varchar
+    FROM students s
+    WHERE s.roll_no = 'SIST2023004'
+    AND NOT EXISTS (SELECT 1 FROM notifications WHERE student_id = s.id);
+
+    -- Seed the rollups from existing rows the first time they are created
+    SELECT rebuild_arrear_rollups()
+    WHERE NOT EXISTS (SELECT 1 FROM rollup_state WHERE name = 'arrear_rollups');
+"""
+
+# The notification rollups are keyed by the student's current department, which the
+# notification trigger looked up with a join: a student's cascaded notification
+# deletes found the student already gone and landed on 'Unknown', and a department
+# change never moved them. The students triggers now move them instead. Every
+# function also pins search_path to the app schema (FROM CURRENT: the migrating
+# session's), so writes from psql or admin scripts with another search_path work.
+ROLLUP_DEPARTMENT_FIX_SQL = """
+    CREATE OR REPLACE FUNCTION apply_student_rollup_delta()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            INSERT INTO student_arrear_rollups AS r (
+                department, semester, students, total_arrears, with_arrears, critical, medium, low
+            )
+            SELECT
+                COALESCE(department, 'Unknown'),
+                COALESCE(semester, 0),
+                -COUNT(*),
+                -COALESCE(SUM(arrears_count), 0),
+                -COUNT(*) FILTER (WHERE arrears_count > 0),
+                -COUNT(*) FILTER (WHERE arrears_count > 3),
+                -COUNT(*) FILTER (WHERE arrears_count BETWEEN 2 AND 3),
+                -COUNT(*) FILTER (WHERE arrears_count = 1)
+            FROM old_rows
+            GROUP BY 1, 2
+            ON CONFLICT (department, semester) DO UPDATE SET
+                students = r.students + EXCLUDED.students,
+                total_arrears = r.total_arrears + EXCLUDED.total_arrears,
+                with_arrears = r.with_arrears + EXCLUDED.with_arrears,
+                critical = r.critical + EXCLUDED.critical,
+                medium = r.medium + EXCLUDED.medium,
+                low = r.low + EXCLUDED.low,
+                updated_at = CURRENT_TIMESTAMP;
+        END IF;
+
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO student_arrear_rollups AS r (
+                department, semester, students, total_arrears, with_arrears, critical, medium, low
+            )
+            SELECT
+                COALESCE(department, 'Unknown'),
+                COALESCE(semester, 0),
+                COUNT(*),
+                COALESCE(SUM(arrears_count), 0),
+                COUNT(*) FILTER (WHERE arrears_count > 0),
+                COUNT(*) FILTER (WHERE arrears_count > 3),
+                COUNT(*) FILTER (WHERE arrears_count BETWEEN 2 AND 3),
+                COUNT(*) FILTER (WHERE arrears_count = 1)
+            FROM new_rows
+            GROUP BY 1, 2
+            ON CONFLICT (department, semester) DO UPDATE SET
+                students = r.students + EXCLUDED.students,
+                total_arrears = r.total_arrears + EXCLUDED.total_arrears,
+                with_arrears = r.with_arrears + EXCLUDED.with_arrears,
+                critical = r.critical + EXCLUDED.critical,
+                medium = r.medium + EXCLUDED.medium,
+                low = r.low + EXCLUDED.low,
+                updated_at = CURRENT_TIMESTAMP;
+        END IF;
+
+        IF TG_OP = 'UPDATE' THEN
+            -- Students that changed department take their notification counts along
+            INSERT INTO notification_daily_rollups AS r (day, department, status, total)
+            SELECT day, department, status, SUM(total)
+            FROM (
+                SELECT
+                    (n.created_at AT TIME ZONE 'UTC')::date AS day,
+                    COALESCE(o.department, 'Unknown') AS department,
+                    n.status,
+                    -COUNT(*) AS total
+                FROM old_rows o
+                JOIN new_rows w ON w.id = o.id
+                JOIN notifications n ON n.student_id = o.id
+                WHERE COALESCE(o.department, 'Unknown') <> COALESCE(w.department, 'Unknown')
+                GROUP BY 1, 2, 3
+                UNION ALL
+                SELECT
+                    (n.created_at AT TIME ZONE 'UTC')::date,
+                    COALESCE(w.department, 'Unknown'),
+                    n.status,
+                    COUNT(*)
+                FROM old_rows o
+                JOIN new_rows w ON w.id = o.id
+                JOIN notifications n ON n.student_id = o.id
+                WHERE COALESCE(o.department, 'Unknown') <> COALESCE(w.department, 'Unknown')
+                GROUP BY 1, 2, 3
+            ) moved
+            GROUP BY 1, 2, 3
+            ON CONFLICT (day, department, status) DO UPDATE SET
+                total = r.total + EXCLUDED.total,
+                updated_at = CURRENT_TIMESTAMP;
+        END IF;
+
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    SET search_path FROM CURRENT;
+
+    -- Row-level and BEFORE: the student's notifications are still there to count,
+    -- whereas by the time the cascaded delete reaches them the student row is gone
+    CREATE OR REPLACE FUNCTION remove_student_notification_rollups()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        INSERT INTO notification_daily_rollups AS r (day, department, status, total)
+        SELECT
+            (n.created_at AT TIME ZONE 'UTC')::date,
+            COALESCE(OLD.department, 'Unknown'),
+            n.status,
+            -COUNT(*)
+        FROM notifications n
+        WHERE n.student_id = OLD.id
+        GROUP BY 1, 2, 3
+        ON CONFLICT (day, department, status) DO UPDATE SET
+            total = r.total + EXCLUDED.total,
+            updated_at = CURRENT_TIMESTAMP;
+        RETURN OLD;
+    END;
+    $$ LANGUAGE plpgsql
+    SET search_path FROM CURRENT;
+
+    CREATE OR REPLACE FUNCTION apply_notification_rollup_delta()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            -- Inner join: rows of a deleted student were taken out by its delete trigger
+            INSERT INTO notification_daily_rollups AS r (day, department, status, total)
+            SELECT
+                (o.created_at AT TIME ZONE 'UTC')::date,
+                COALESCE(s.department, 'Unknown'),
+                o.status,
+                -COUNT(*)
+            FROM old_rows o
+            JOIN students s ON s.id = o.student_id
+            GROUP BY 1, 2, 3
+            ON CONFLICT (day, department, status) DO UPDATE SET
+                total = r.total + EXCLUDED.total,
+                updated_at = CURRENT_TIMESTAMP;
+        END IF;
+
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO notification_daily_rollups AS r (day, department, status, total)
+            SELECT
+                (n.created_at AT TIME ZONE 'UTC')::date,
+                COALESCE(s.department, 'Unknown'),
+                n.status,
+                COUNT(*)
+            FROM new_rows n
+            JOIN students s ON s.id = n.student_id
+            GROUP BY 1, 2, 3
+            ON CONFLICT (day, department, status) DO UPDATE SET
+                total = r.total + EXCLUDED.total,
+                updated_at = CURRENT_TIMESTAMP;
+        END IF;
+
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    SET search_path FROM CURRENT;
+
+    ALTER FUNCTION rebuild_arrear_rollups() SET search_path FROM CURRENT;
+
+    DROP TRIGGER IF EXISTS students_notification_rollup_delete ON students;
+    CREATE TRIGGER students_notification_rollup_delete
+    BEFORE DELETE ON students
+    FOR EACH ROW
+    EXECUTE FUNCTION remove_student_notification_rollups();
+
+    -- Put right whatever the old triggers already got wrong
+    SELECT rebuild_arrear_rollups();
+"""
+
+MIGRATIONS: list[tuple[int, str, str]] = [
+    (1, "baseline", BASELINE_SQL),
+    (2, "rollup department fix", ROLLUP_DEPARTMENT_FIX_SQL),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
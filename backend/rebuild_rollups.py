@@ -0,0 +1,23 @@
+import asyncio
+
+from backend.database import Database
+
+# Recompute the dashboard arrear rollups from the students and notifications tables.
+# Run from the project root: python -m backend.rebuild_rollups
+
+
+async def main():
+    db = Database()
+    status = await db.initialize()
+    if not status.get("connected"):
+        raise SystemExit(f"Database unavailable: {status.get('error')}")
+
+    try:
+        rebuilt_at = await db.rebuild_rollups()
+        print(f"Arrear rollups rebuilt at {rebuilt_at.isoformat()}")
+    finally:
+        await db.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
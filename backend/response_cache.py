@@ -0,0 +1,85 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+
+class CachedResponse:
+    """Serialized GET response body plus the headers replayed on a cache hit."""
+
+    __slots__ = ("body", "etag", "headers")
+
+    def __init__(self, body: bytes, headers: dict):
+        self.body = body
+        self.etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        self.headers = headers
+
+
+class ResponseCache:
+    """Short-TTL cache of serialized GET responses, grouped into invalidation scopes."""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[tuple[str, str], tuple[float, CachedResponse]]" = OrderedDict()
+        # Bumped on every invalidation so a fill that raced one can tell its data is stale
+        self.generations: dict[str, int] = {}
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "notModified": 0,
+            "invalidations": 0,
+            "staleFillsSkipped": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    def get(self, scope: str, key: str) -> Optional[CachedResponse]:
+        entry = self.entries.get((scope, key))
+        if entry is not None and entry[0] <= time.monotonic():
+            del self.entries[(scope, key)]
+            entry = None
+
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.entries.move_to_end((scope, key))
+        self.stats["hits"] += 1
+        return entry[1]
+
+    def generation(self, scope: str) -> int:
+        return self.generations.get(scope, 0)
+
+    def set(
+        self, scope: str, key: str, response: CachedResponse, generation: Optional[int] = None
+    ):
+        """Store a response; pass the generation() read before loading it to drop stale fills."""
+        if not self.enabled:
+            return
+        if generation is not None and generation != self.generation(scope):
+            self.stats["staleFillsSkipped"] += 1
+            return
+
+        self.entries[(scope, key)] = (time.monotonic() + self.ttl_seconds, response)
+        self.entries.move_to_end((scope, key))
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, scopes: Iterable[str]):
+        scopes = set(scopes)
+        for scope in scopes:
+            self.generations[scope] = self.generation(scope) + 1
+        for cache_key in [cache_key for cache_key in self.entries if cache_key[0] in scopes]:
+            del self.entries[cache_key]
+        self.stats["invalidations"] += 1
+
+    def describe(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "ttlSeconds": self.ttl_seconds,
+            "entries": len(self.entries),
+            **self.stats,
+        }
@@ -13,6 +13,12 @@ DROP TABLE IF EXISTS notifications CASCADE;
 DROP TABLE IF EXISTS students CASCADE;
 DROP TABLE IF EXISTS users CASCADE;
 DROP TABLE IF EXISTS alert_actions CASCADE;
+DROP TABLE IF EXISTS analysis_cache CASCADE;
+DROP TABLE IF EXISTS upload_jobs CASCADE;
+DROP TABLE IF EXISTS student_arrear_rollups CASCADE;
+DROP TABLE IF EXISTS notification_daily_rollups CASCADE;
+DROP TABLE IF EXISTS rollup_state CASCADE;
+DROP TABLE IF EXISTS schema_migrations CASCADE;
 
 -- =====================================================
 -- USERS TABLE (AUTHENTICATION)
@@ -66,6 +72,8 @@ CREATE TABLE notifications (
   status VARCHAR(20) NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'sent', 'failed', 'delivered')),
   notification_type VARCHAR(50) DEFAULT 'arrear',
   priority VARCHAR(20) DEFAULT 'medium' CHECK (priority IN ('low', 'medium', 'high', 'critical')),
+  -- Arrears at alert time; upload alerts are not repeated while this is unchanged
+  arrears_count INTEGER,
   sent_at TIMESTAMP WITH TIME ZONE,
   delivered_at TIMESTAMP WITH TIME ZONE,
   created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
@@ -80,22 +88,29 @@ CREATE TABLE notifications (
 );
 
 -- Create indexes for faster queries
-CREATE INDEX idx_notifications_student_id ON notifications(student_id);
+CREATE INDEX idx_notifications_student_created_at ON notifications(student_id, created_at DESC);
 CREATE INDEX idx_notifications_status ON notifications(status);
 CREATE INDEX idx_notifications_created_at ON notifications(created_at DESC);
+CREATE INDEX idx_notifications_arrear_dedupe ON notifications(student_id, created_at DESC)
+  INCLUDE (arrears_count) WHERE notification_type = 'arrear';
 
 -- =====================================================
--- ALERT ACTIONS TABLE (SMS/CALL TRACKING)
+-- ALERT ACTIONS TABLE (SMS/CALL/EMAIL DISPATCH QUEUE)
 -- =====================================================
 CREATE TABLE alert_actions (
   id SERIAL PRIMARY KEY,
   student_id INTEGER NOT NULL,
   notification_id INTEGER,
-  channel VARCHAR(20) NOT NULL CHECK (channel IN ('sms', 'call')),
+  channel VARCHAR(20) NOT NULL CHECK (channel IN ('sms', 'call', 'email')),
   recipient VARCHAR(255),
   message TEXT NOT NULL,
-  status VARCHAR(20) NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'sent', 'failed')),
+  status VARCHAR(20) NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'sending', 'sent', 'delivered', 'failed')),
+  attempts INTEGER NOT NULL DEFAULT 0,
+  next_attempt_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+  last_error TEXT,
+  provider_ref VARCHAR(120),
   sent_at TIMESTAMP WITH TIME ZONE,
+  delivered_at TIMESTAMP WITH TIME ZONE,
   created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
   updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
   CONSTRAINT fk_alert_student
@@ -110,9 +125,55 @@ CREATE TABLE alert_actions (
     ON UPDATE CASCADE
 );
 
-CREATE INDEX idx_alert_actions_student_id ON alert_actions(student_id);
+CREATE INDEX idx_alert_actions_student_created_at ON alert_actions(student_id, created_at DESC);
 CREATE INDEX idx_alert_actions_channel ON alert_actions(channel);
 CREATE INDEX idx_alert_actions_status ON alert_actions(status);
+-- Dispatch workers claim due rows per channel; receipts look actions up by provider reference
+CREATE INDEX idx_alert_actions_dispatch ON alert_actions(channel, next_attempt_at)
+  WHERE status IN ('queued', 'sending');
+CREATE INDEX idx_alert_actions_provider_ref ON alert_actions(provider_ref)
+  WHERE provider_ref IS NOT NULL;
+
+-- =====================================================
+-- ANALYSIS CACHE TABLE (DOCUMENT ANALYSIS RESULTS)
+-- =====================================================
+CREATE TABLE analysis_cache (
+  cache_key VARCHAR(128) PRIMARY KEY,
+  result JSONB NOT NULL,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+  last_hit_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+  expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+CREATE INDEX idx_analysis_cache_expires_at ON analysis_cache(expires_at);
+CREATE INDEX idx_analysis_cache_last_hit_at ON analysis_cache(last_hit_at);
+
+-- =====================================================
+-- UPLOAD JOBS TABLE (BACKGROUND DOCUMENT ANALYSIS)
+-- =====================================================
+CREATE TABLE upload_jobs (
+  id VARCHAR(32) PRIMARY KEY,
+  file_name VARCHAR(255) NOT NULL,
+  extension VARCHAR(10) NOT NULL,
+  content_hash VARCHAR(64) NOT NULL,
+  file_path TEXT NOT NULL,
+  status VARCHAR(20) NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'completed', 'failed')),
+  progress JSONB NOT NULL DEFAULT '{}'::jsonb,
+  result JSONB,
+  error TEXT,
+  attempts INTEGER NOT NULL DEFAULT 0,
+  lease_expires_at TIMESTAMP WITH TIME ZONE,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+  started_at TIMESTAMP WITH TIME ZONE,
+  finished_at TIMESTAMP WITH TIME ZONE,
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- One queued or running job per file hash; workers claim the oldest active job
+CREATE UNIQUE INDEX idx_upload_jobs_active_hash ON upload_jobs(content_hash)
+  WHERE status IN ('queued', 'running');
+CREATE INDEX idx_upload_jobs_claim ON upload_jobs(created_at)
+  WHERE status IN ('queued', 'running');
 
 -- =====================================================
 -- TRIGGERS FOR AUTO-UPDATE TIMESTAMPS
@@ -165,6 +226,322 @@ INSERT INTO notifications (student_id, message, status, priority, notification_t
 (5, 'Dear Parent, Your ward Vikram Malhotra has 3 arrears in this semester.', 'pending', 'high', 'arrear', NULL)
 ON CONFLICT DO NOTHING;
 
+-- =====================================================
+-- ARREAR ROLLUPS (DASHBOARD AGGREGATES)
+-- Kept current by statement-level triggers; rebuild with
+-- SELECT rebuild_arrear_rollups(); or python -m backend.rebuild_rollups
+-- =====================================================
+CREATE TABLE student_arrear_rollups (
+    department VARCHAR(120) NOT NULL,
+    semester INTEGER NOT NULL,
+    students INTEGER NOT NULL DEFAULT 0,
+    total_arrears INTEGER NOT NULL DEFAULT 0,
+    with_arrears INTEGER NOT NULL DEFAULT 0,
+    critical INTEGER NOT NULL DEFAULT 0,
+    medium INTEGER NOT NULL DEFAULT 0,
+    low INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (department, semester)
+);
+
+CREATE TABLE notification_daily_rollups (
+    day DATE NOT NULL,
+    department VARCHAR(120) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    total INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (day, department, status)
+);
+
+CREATE TABLE rollup_state (
+    name VARCHAR(50) PRIMARY KEY,
+    rebuilt_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION apply_student_rollup_delta()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        INSERT INTO student_arrear_rollups AS r (
+            department, semester, students, total_arrears, with_arrears, critical, medium, low
+        )
+        SELECT
+            COALESCE(department, 'Unknown'),
+            COALESCE(semester, 0),
+            -COUNT(*),
+            -COALESCE(SUM(arrears_count), 0),
+            -COUNT(*) FILTER (WHERE arrears_count > 0),
+            -COUNT(*) FILTER (WHERE arrears_count > 3),
+            -COUNT(*) FILTER (WHERE arrears_count BETWEEN 2 AND 3),
+            -COUNT(*) FILTER (WHERE arrears_count = 1)
+        FROM old_rows
+        GROUP BY 1, 2
+        ON CONFLICT (department, semester) DO UPDATE SET
+            students = r.students + EXCLUDED.students,
+            total_arrears = r.total_arrears + EXCLUDED.total_arrears,
+            with_arrears = r.with_arrears + EXCLUDED.with_arrears,
+            critical = r.critical + EXCLUDED.critical,
+            medium = r.medium + EXCLUDED.medium,
+            low = r.low + EXCLUDED.low,
+            updated_at = CURRENT_TIMESTAMP;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO student_arrear_rollups AS r (
+            department, semester, students, total_arrears, with_arrears, critical, medium, low
+        )
+        SELECT
+            COALESCE(department, 'Unknown'),
+            COALESCE(semester, 0),
+            COUNT(*),
+            COALESCE(SUM(arrears_count), 0),
+            COUNT(*) FILTER (WHERE arrears_count > 0),
+            COUNT(*) FILTER (WHERE arrears_count > 3),
+            COUNT(*) FILTER (WHERE arrears_count BETWEEN 2 AND 3),
+            COUNT(*) FILTER (WHERE arrears_count = 1)
+        FROM new_rows
+        GROUP BY 1, 2
+        ON CONFLICT (department, semester) DO UPDATE SET
+            students = r.students + EXCLUDED.students,
+            total_arrears = r.total_arrears + EXCLUDED.total_arrears,
+            with_arrears = r.with_arrears + EXCLUDED.with_arrears,
+            critical = r.critical + EXCLUDED.critical,
+            medium = r.medium + EXCLUDED.medium,
+            low = r.low + EXCLUDED.low,
+            updated_at = CURRENT_TIMESTAMP;
+    END IF;
+
+    IF TG_OP = 'UPDATE' THEN
+        -- Students that changed department take their notification counts along
+        INSERT INTO notification_daily_rollups AS r (day, department, status, total)
+        SELECT day, department, status, SUM(total)
+        FROM (
+            SELECT
+                (n.created_at AT TIME ZONE 'UTC')::date AS day,
+                COALESCE(o.department, 'Unknown') AS department,
+                n.status,
+                -COUNT(*) AS total
+            FROM old_rows o
+            JOIN new_rows w ON w.id = o.id
+            JOIN notifications n ON n.student_id = o.id
+            WHERE COALESCE(o.department, 'Unknown') <> COALESCE(w.department, 'Unknown')
+            GROUP BY 1, 2, 3
+            UNION ALL
+            SELECT
+                (n.created_at AT TIME ZONE 'UTC')::date,
+                COALESCE(w.department, 'Unknown'),
+                n.status,
+                COUNT(*)
+            FROM old_rows o
+            JOIN new_rows w ON w.id = o.id
+            JOIN notifications n ON n.student_id = o.id
+            WHERE COALESCE(o.department, 'Unknown') <> COALESCE(w.department, 'Unknown')
+            GROUP BY 1, 2, 3
+        ) moved
+        GROUP BY 1, 2, 3
+        ON CONFLICT (day, department, status) DO UPDATE SET
+            total = r.total + EXCLUDED.total,
+            updated_at = CURRENT_TIMESTAMP;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+SET search_path FROM CURRENT;
+
+-- Row-level and BEFORE: the student's notifications are still there to count,
+-- whereas by the time the cascaded delete reaches them the student row is gone
+CREATE OR REPLACE FUNCTION remove_student_notification_rollups()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO notification_daily_rollups AS r (day, department, status, total)
+    SELECT
+        (n.created_at AT TIME ZONE 'UTC')::date,
+        COALESCE(OLD.department, 'Unknown'),
+        n.status,
+        -COUNT(*)
+    FROM notifications n
+    WHERE n.student_id = OLD.id
+    GROUP BY 1, 2, 3
+    ON CONFLICT (day, department, status) DO UPDATE SET
+        total = r.total + EXCLUDED.total,
+        updated_at = CURRENT_TIMESTAMP;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql
+SET search_path FROM CURRENT;
+
+CREATE OR REPLACE FUNCTION apply_notification_rollup_delta()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        -- Inner join: rows of a deleted student were taken out by its delete trigger
+        INSERT INTO notification_daily_rollups AS r (day, department, status, total)
+        SELECT
+            (o.created_at AT TIME ZONE 'UTC')::date,
+            COALESCE(s.department, 'Unknown'),
+            o.status,
+            -COUNT(*)
+        FROM old_rows o
+        JOIN students s ON s.id = o.student_id
+        GROUP BY 1, 2, 3
+        ON CONFLICT (day, department, status) DO UPDATE SET
+            total = r.total + EXCLUDED.total,
+            updated_at = CURRENT_TIMESTAMP;
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO notification_daily_rollups AS r (day, department, status, total)
+        SELECT
+            (n.created_at AT TIME ZONE 'UTC')::date,
+            COALESCE(s.department, 'Unknown'),
+            n.status,
+            COUNT(*)
+        FROM new_rows n
+        JOIN students s ON s.id = n.student_id
+        GROUP BY 1, 2, 3
+        ON CONFLICT (day, department, status) DO UPDATE SET
+            total = r.total + EXCLUDED.total,
+            updated_at = CURRENT_TIMESTAMP;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+SET search_path FROM CURRENT;
+
+-- Full recompute; SHARE locks wait out in-flight writers and hold new ones off meanwhile
+CREATE OR REPLACE FUNCTION rebuild_arrear_rollups()
+RETURNS void AS $$
+BEGIN
+    LOCK TABLE students, notifications IN SHARE MODE;
+
+    DELETE FROM student_arrear_rollups;
+    INSERT INTO student_arrear_rollups (
+        department, semester, students, total_arrears, with_arrears, critical, medium, low
+    )
+    SELECT
+        COALESCE(department, 'Unknown'),
+        COALESCE(semester, 0),
+        COUNT(*),
+        COALESCE(SUM(arrears_count), 0),
+        COUNT(*) FILTER (WHERE arrears_count > 0),
+        COUNT(*) FILTER (WHERE arrears_count > 3),
+        COUNT(*) FILTER (WHERE arrears_count BETWEEN 2 AND 3),
+        COUNT(*) FILTER (WHERE arrears_count = 1)
+    FROM students
+    GROUP BY 1, 2;
+
+    DELETE FROM notification_daily_rollups;
+    INSERT INTO notification_daily_rollups (day, department, status, total)
+    SELECT
+        (n.created_at AT TIME ZONE 'UTC')::date,
+        COALESCE(s.department, 'Unknown'),
+        n.status,
+        COUNT(*)
+    FROM notifications n
+    LEFT JOIN students s ON s.id = n.student_id
+    GROUP BY 1, 2, 3;
+
+    INSERT INTO rollup_state (name, rebuilt_at)
+    VALUES ('arrear_rollups', CURRENT_TIMESTAMP)
+    ON CONFLICT (name) DO UPDATE SET rebuilt_at = EXCLUDED.rebuilt_at;
+END;
+$$ LANGUAGE plpgsql
+SET search_path FROM CURRENT;
+
+DROP TRIGGER IF EXISTS students_rollup_insert ON students;
+CREATE TRIGGER students_rollup_insert
+AFTER INSERT ON students
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION apply_student_rollup_delta();
+
+DROP TRIGGER IF EXISTS students_rollup_update ON students;
+CREATE TRIGGER students_rollup_update
+AFTER UPDATE ON students
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION apply_student_rollup_delta();
+
+DROP TRIGGER IF EXISTS students_rollup_delete ON students;
+CREATE TRIGGER students_rollup_delete
+AFTER DELETE ON students
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION apply_student_rollup_delta();
+
+DROP TRIGGER IF EXISTS students_notification_rollup_delete ON students;
+CREATE TRIGGER students_notification_rollup_delete
+BEFORE DELETE ON students
+FOR EACH ROW
+EXECUTE FUNCTION remove_student_notification_rollups();
+
+DROP TRIGGER IF EXISTS notifications_rollup_insert ON notifications;
+CREATE TRIGGER notifications_rollup_insert
+AFTER INSERT ON notifications
+REFERENCING NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION apply_notification_rollup_delta();
+
+DROP TRIGGER IF EXISTS notifications_rollup_update ON notifications;
+CREATE TRIGGER notifications_rollup_update
+AFTER UPDATE ON notifications
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION apply_notification_rollup_delta();
+
+DROP TRIGGER IF EXISTS notifications_rollup_delete ON notifications;
+CREATE TRIGGER notifications_rollup_delete
+AFTER DELETE ON notifications
+REFERENCING OLD TABLE AS old_rows
+FOR EACH STATEMENT
+EXECUTE FUNCTION apply_notification_rollup_delta();
+
+SELECT rebuild_arrear_rollups();
+
+-- =====================================================
+-- READ CACHE INVALIDATION
+-- =====================================================
+-- API workers LISTEN on apns_read_cache and drop cached GET responses for the changed table
+CREATE OR REPLACE FUNCTION notify_read_cache()
+RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('apns_read_cache', TG_TABLE_NAME);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS students_read_cache ON students;
+CREATE TRIGGER students_read_cache
+AFTER INSERT OR UPDATE OR DELETE ON students
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_read_cache();
+
+DROP TRIGGER IF EXISTS notifications_read_cache ON notifications;
+CREATE TRIGGER notifications_read_cache
+AFTER INSERT OR UPDATE OR DELETE ON notifications
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_read_cache();
+
+DROP TRIGGER IF EXISTS alert_actions_read_cache ON alert_actions;
+CREATE TRIGGER alert_actions_read_cache
+AFTER INSERT OR UPDATE OR DELETE ON alert_actions
+FOR EACH STATEMENT
+EXECUTE FUNCTION notify_read_cache();
+
+-- =====================================================
+-- SCHEMA MIGRATIONS
+-- =====================================================
+-- Versions from backend/migrations.py the backend has applied. Left empty here:
+-- on first start the backend re-runs the idempotent baseline (version 1) over
+-- this schema and records it, then only applies newer versions.
+CREATE TABLE schema_migrations (
+  version INTEGER PRIMARY KEY,
+  name VARCHAR(120) NOT NULL,
+  applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
 -- =====================================================
 -- GRANT PERMISSIONS (Optional - adjust as needed)
 -- =====================================================
@@ -0,0 +1,425 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Awaitable, BinaryIO, Callable, Optional, Union
+
+# Uploaded files are kept here until their job finishes, so a restarted worker can resume them
+UPLOAD_JOB_DIR = os.getenv(
+    "UPLOAD_JOB_DIR", os.path.join(tempfile.gettempdir(), "apns-upload-jobs")
+)
+# Jobs run at once in each process; 0 leaves them to other processes
+UPLOAD_JOB_WORKERS = int(os.getenv("UPLOAD_JOB_WORKERS", "1"))
+UPLOAD_JOB_POLL_SECONDS = float(os.getenv("UPLOAD_JOB_POLL_SECONDS", "2"))
+UPLOAD_JOB_LEASE_SECONDS = float(os.getenv("UPLOAD_JOB_LEASE_SECONDS", "60"))
+UPLOAD_JOB_PROGRESS_SECONDS = float(os.getenv("UPLOAD_JOB_PROGRESS_SECONDS", "1"))
+UPLOAD_JOB_MAX_ATTEMPTS = int(os.getenv("UPLOAD_JOB_MAX_ATTEMPTS", "3"))
+
+# Jobs remembered when running without a database
+MEMORY_JOB_LIMIT = 200
+SPOOL_CHUNK_BYTES = 1024 * 1024
+ACTIVE_STATUSES = ("queued", "running")
+
+JobRunner = Callable[[dict, dict], Awaitable[dict]]
+
+
+def new_progress() -> dict:
+    return {"stage": "queued", "rowsParsed": 0, "rowsSaved": 0, "alertsGenerated": 0}
+
+
+def load_json(value):
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def describe_error(error: BaseException) -> str:
+    # HTTPException carries its message in detail rather than str()
+    return str(getattr(error, "detail", None) or error) or error.__class__.__name__
+
+
+class UploadJobQueue:
+    """Runs document uploads in the background from a copy spooled to local disk.
+
+    Jobs live in upload_jobs. Workers claim them with FOR UPDATE SKIP LOCKED and
+    hold a lease that every progress write extends, so a job whose worker died is
+    claimed again once the lease expires and re-run from the start; the student
+    merge is idempotent, so a repeated run only fills in what the first missed.
+    A partial unique index keeps one queued or running job per file hash.
+    Without a database, jobs run in-process and do not survive a restart.
+    """
+
+    def __init__(
+        self,
+        db,
+        runner: JobRunner,
+        is_connected: Callable[[], bool],
+        job_dir: str,
+        workers: int = 1,
+        poll_seconds: float = 2.0,
+        lease_seconds: float = 60.0,
+        progress_seconds: float = 1.0,
+        max_attempts: int = 3,
+    ):
+        self.db = db
+        self.runner = runner
+        self.is_connected = is_connected
+        self.job_dir = job_dir
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.progress_seconds = progress_seconds
+        self.max_attempts = max_attempts
+        self.tasks: list[asyncio.Task] = []
+        self.wake_event = asyncio.Event()
+        self.live_progress: dict[str, dict] = {}
+        self.memory_jobs: "OrderedDict[str, dict]" = OrderedDict()
+        self.memory_tasks: set[asyncio.Task] = set()
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self.tasks)
+
+    def start(self):
+        for _ in range(self.workers):
+            self.tasks.append(asyncio.create_task(self.run_worker()))
+
+    async def stop(self):
+        tasks = [*self.tasks, *self.memory_tasks]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self.tasks = []
+
+    def wake(self):
+        self.wake_event.set()
+
+    def spool_path(self, job_id: str, extension: str) -> str:
+        # One file per job, so finishing a job never removes another job's copy of the same bytes
+        return os.path.join(self.job_dir, f"{job_id}{extension}")
+
+    def spool(self, source: Union[BinaryIO, str], path: str):
+        # Copy a stream, or move a file already on disk, under a temporary name first so
+        # a half-written file is never picked up
+        os.makedirs(self.job_dir, exist_ok=True)
+        partial_path = f"{path}.{uuid.uuid4().hex}.part"
+        if isinstance(source, str):
+            shutil.move(source, partial_path)
+        else:
+            with open(partial_path, "wb") as target:
+                shutil.copyfileobj(source, target, SPOOL_CHUNK_BYTES)
+        os.replace(partial_path, path)
+
+    def discard_file(self, path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Unable to remove upload job file {path}: {e}")
+
+    async def submit(
+        self, file_name: str, extension: str, content_hash: str, source: Union[BinaryIO, str]
+    ) -> tuple[dict, bool]:
+        """Queue an upload from a stream or a file path; returns (job, created).
+
+        A file with a job already queued or running reuses that job.
+        """
+        if not self.is_connected():
+            return await self.submit_in_memory(file_name, extension, content_hash, source)
+
+        active = await self.find_active(content_hash)
+        if active is not None:
+            return self.format_job(active), False
+
+        job_id = uuid.uuid4().hex
+        file_path = self.spool_path(job_id, extension)
+        await asyncio.to_thread(self.spool, source, file_path)
+        try:
+            rows = await self.db.fetch(
+                """
+                INSERT INTO upload_jobs (id, file_name, extension, content_hash, file_path, progress)
+                VALUES ($1, $2, $3, $4, $5, $6::jsonb)
+                ON CONFLICT (content_hash) WHERE status IN ('queued', 'running') DO NOTHING
+                RETURNING *
+                """,
+                job_id,
+                file_name,
+                extension,
+                content_hash,
+                file_path,
+                json.dumps(new_progress()),
+            )
+        except BaseException:
+            # No job row points at the spooled copy. A file handed over by path goes back
+            # where it came from so the caller can retry; a stream copy is dropped.
+            if isinstance(source, str):
+                await asyncio.to_thread(shutil.move, file_path, source)
+            else:
+                self.discard_file(file_path)
+            raise
+        if not rows:
+            # Lost a race with an identical upload, which has its own spooled copy
+            self.discard_file(file_path)
+            active = await self.find_active(content_hash)
+            if active is not None:
+                return self.format_job(active), False
+            raise RuntimeError("Upload job could not be queued")
+
+        self.wake()
+        return self.format_job(rows[0]), True
+
+    async def find_active(self, content_hash: str) -> Optional[dict]:
+        rows = await self.db.fetch(
+            """
+            SELECT *
+            FROM upload_jobs
+            WHERE content_hash = $1 AND status IN ('queued', 'running')
+            """,
+            content_hash,
+        )
+        return rows[0] if rows else None
+
+    async def submit_in_memory(
+        self, file_name: str, extension: str, content_hash: str, source: Union[BinaryIO, str]
+    ) -> tuple[dict, bool]:
+        for job in self.memory_jobs.values():
+            if job["content_hash"] == content_hash and job["status"] in ACTIVE_STATUSES:
+                return self.format_job(job), False
+
+        job_id = uuid.uuid4().hex
+        file_path = self.spool_path(job_id, extension)
+        await asyncio.to_thread(self.spool, source, file_path)
+        job = {
+            "id": job_id,
+            "file_name": file_name,
+            "extension": extension,
+            "content_hash": content_hash,
+            "file_path": file_path,
+            "status": "running",
+            "progress": new_progress(),
+            "result": None,
+            "error": None,
+            "attempts": 1,
+            "created_at": datetime.now(timezone.utc),
+            "started_at": datetime.now(timezone.utc),
+            "finished_at": None,
+        }
+        self.memory_jobs[job["id"]] = job
+        while len(self.memory_jobs) > MEMORY_JOB_LIMIT:
+            self.memory_jobs.popitem(last=False)
+
+        task = asyncio.create_task(self.run_memory_job(job))
+        self.memory_tasks.add(task)
+        task.add_done_callback(self.memory_tasks.discard)
+        return self.format_job(job), True
+
+    async def run_memory_job(self, job: dict):
+        status, result, error = await self.execute(job)
+        job.update(
+            status=status,
+            progress=self.live_progress.pop(job["id"], job["progress"]),
+            result=result,
+            error=error,
+            finished_at=datetime.now(timezone.utc),
+        )
+        self.discard_file(job["file_path"])
+
+    async def execute(self, job: dict) -> tuple[str, Optional[dict], Optional[str]]:
+        """Run one job to completion and return (status, result, error)."""
+        progress = self.live_progress.setdefault(job["id"], new_progress())
+        progress["stage"] = "starting"
+        if not os.path.exists(job["file_path"]):
+            return "failed", None, "Uploaded file is no longer available on this server"
+
+        try:
+            result = await self.runner(job, progress)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Upload job {job['id']} failed: {e}")
+            return "failed", None, describe_error(e)
+
+        progress["stage"] = "completed"
+        return "completed", result, None
+
+    async def claim(self) -> Optional[dict]:
+        rows = await self.db.fetch(
+            """
+            UPDATE upload_jobs AS j
+            SET status = 'running',
+                attempts = j.attempts + 1,
+                started_at = COALESCE(j.started_at, NOW()),
+                lease_expires_at = NOW() + make_interval(secs => $1),
+                updated_at = NOW()
+            WHERE j.id = (
+                SELECT id
+                FROM upload_jobs
+                WHERE status = 'queued'
+                   OR (status = 'running' AND lease_expires_at <= NOW())
+                ORDER BY created_at
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING *
+            """,
+            float(self.lease_seconds),
+        )
+        return rows[0] if rows else None
+
+    async def save_progress(self, job_id: str, progress: dict):
+        await self.db.execute(
+            """
+            UPDATE upload_jobs
+            SET progress = $2::jsonb,
+                lease_expires_at = NOW() + make_interval(secs => $3),
+                updated_at = NOW()
+            WHERE id = $1 AND status = 'running'
+            """,
+            job_id,
+            json.dumps(progress),
+            float(self.lease_seconds),
+        )
+
+    async def report_progress(self, job_id: str, progress: dict):
+        # Doubles as the lease heartbeat while the job runs
+        while True:
+            await asyncio.sleep(self.progress_seconds)
+            try:
+                await self.save_progress(job_id, progress)
+            except Exception as e:
+                print(f"Upload job {job_id} progress update failed: {e}")
+
+    async def finish(
+        self, job: dict, status: str, progress: dict, result: Optional[dict], error: Optional[str]
+    ):
+        await self.db.execute(
+            """
+            UPDATE upload_jobs
+            SET status = $2,
+                progress = $3::jsonb,
+                result = $4::jsonb,
+                error = $5,
+                lease_expires_at = NULL,
+                finished_at = NOW(),
+                updated_at = NOW()
+            WHERE id = $1
+            """,
+            job["id"],
+            status,
+            json.dumps(progress),
+            json.dumps(result, default=str) if result is not None else None,
+            error,
+        )
+        self.discard_file(job["file_path"])
+
+    async def release(self, job_id: str):
+        """Hand a job interrupted by shutdown straight back to the queue."""
+        await self.db.execute(
+            """
+            UPDATE upload_jobs
+            SET status = 'queued',
+                attempts = GREATEST(attempts - 1, 0),
+                lease_expires_at = NULL,
+                updated_at = NOW()
+            WHERE id = $1 AND status = 'running'
+            """,
+            job_id,
+        )
+
+    async def run_job(self, job: dict):
+        if job["attempts"] > self.max_attempts:
+            await self.finish(
+                job, "failed", load_json(job["progress"]), None,
+                f"Gave up after {self.max_attempts} interrupted attempts",
+            )
+            return
+
+        progress = self.live_progress.setdefault(job["id"], new_progress())
+        reporter = asyncio.create_task(self.report_progress(job["id"], progress))
+        try:
+            status, result, error = await self.execute(job)
+        except asyncio.CancelledError:
+            await asyncio.shield(self.release(job["id"]))
+            raise
+        finally:
+            reporter.cancel()
+            self.live_progress.pop(job["id"], None)
+        await self.finish(job, status, progress, result, error)
+
+    async def run_worker(self):
+        while True:
+            try:
+                job = await self.claim()
+                if job is not None:
+                    await self.run_job(job)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Upload job worker error: {e}")
+
+            try:
+                await asyncio.wait_for(self.wake_event.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self.wake_event.clear()
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        """Return the job's full record, including its result once finished."""
+        job = self.memory_jobs.get(job_id)
+        if job is None and self.is_connected():
+            rows = await self.db.fetch("SELECT * FROM upload_jobs WHERE id = $1", job_id)
+            job = rows[0] if rows else None
+        if job is None:
+            return None
+        return {**self.format_job(job), "result": load_json(job["result"])}
+
+    def format_job(self, job: dict) -> dict:
+        # A job running in this process reports live counters instead of the last saved ones
+        progress = self.live_progress.get(job["id"]) or load_json(job["progress"])
+        return {
+            "jobId": job["id"],
+            "fileName": job["file_name"],
+            "status": job["status"],
+            "progress": dict(progress),
+            "attempts": job["attempts"],
+            "error": job["error"],
+            "createdAt": job["created_at"],
+            "startedAt": job["started_at"],
+            "finishedAt": job["finished_at"],
+        }
+
+    async def describe(self) -> dict:
+        jobs: dict[str, int] = {}
+        if self.is_connected():
+            rows = await self.db.fetch(
+                "SELECT status, COUNT(*) AS total FROM upload_jobs GROUP BY status"
+            )
+            jobs = {row["status"]: row["total"] for row in rows}
+        for job in self.memory_jobs.values():
+            jobs[job["status"]] = jobs.get(job["status"], 0) + 1
+        return {
+            "running": self.running,
+            "workers": self.workers,
+            "activeHere": len(self.live_progress),
+            "jobs": jobs,
+        }
+
+
+def build_upload_job_queue(
+    db, runner: JobRunner, is_connected: Callable[[], bool]
+) -> UploadJobQueue:
+    return UploadJobQueue(
+        db,
+        runner,
+        is_connected,
+        UPLOAD_JOB_DIR,
+        workers=max(0, UPLOAD_JOB_WORKERS),
+        poll_seconds=UPLOAD_JOB_POLL_SECONDS,
+        lease_seconds=UPLOAD_JOB_LEASE_SECONDS,
+        progress_seconds=UPLOAD_JOB_PROGRESS_SECONDS,
+        max_attempts=UPLOAD_JOB_MAX_ATTEMPTS,
+    )
@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+from backend.dispatch import ChannelSender, FakeProvider
+
+# Pushes a burst of alert actions through the rate-limited senders against the
+# offline fake provider and checks the provider never had to throttle them.
+# Run from the project root: python -m backend.verify_dispatch_throughput
+
+RATE_LIMITS = {"sms": 200.0, "call": 20.0, "email": 100.0}
+ACTIONS_PER_CHANNEL = {"sms": 2000, "call": 100, "email": 500}
+SEND_CONCURRENCY = 4
+MIN_RATE_FRACTION = 0.8
+
+
+async def run_channel(sender: ChannelSender, count: int) -> tuple[list, float]:
+    actions = [
+        {"id": index, "channel": sender.channel, "recipient": f"parent-{index}", "message": "test"}
+        for index in range(count)
+    ]
+    started = time.perf_counter()
+    results = await sender.submit(actions)
+    return results, time.perf_counter() - started
+
+
+async def main():
+    provider = FakeProvider(RATE_LIMITS)
+    senders = {
+        channel: ChannelSender(channel, provider, rate, SEND_CONCURRENCY)
+        for channel, rate in RATE_LIMITS.items()
+    }
+    outcomes = await asyncio.gather(
+        *(run_channel(senders[channel], count) for channel, count in ACTIONS_PER_CHANNEL.items())
+    )
+
+    failed = False
+    for (channel, count), (results, seconds) in zip(ACTIONS_PER_CHANNEL.items(), outcomes):
+        errors = sum(isinstance(result, Exception) for result in results)
+        # The bucket starts full, so the first second's burst is free
+        expected_seconds = max(count - RATE_LIMITS[channel], 0) / RATE_LIMITS[channel]
+        achieved = count / seconds
+        metrics = senders[channel].describe()
+        print(
+            f"{channel:<5} {count:>5} actions in {seconds:6.2f}s "
+            f"({achieved:7.1f}/s, limit {RATE_LIMITS[channel]:.0f}/s), "
+            f"{metrics['providerCalls']} provider calls of up to {metrics['batchSize']}, "
+            f"{errors} errors, {provider.counters[channel]['rejected']} throttled by provider"
+        )
+        if errors or provider.counters[channel]["rejected"]:
+            failed = True
+        if seconds > expected_seconds / MIN_RATE_FRACTION + 1:
+            failed = True
+
+    if failed:
+        raise SystemExit("FAIL: senders were throttled or fell well short of the rate limit")
+    print("OK: every channel stayed within its rate limit without provider throttling")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,105 @@
+import http.client
+import statistics
+import threading
+import time
+import uuid
+from pathlib import Path
+
+# Checks that /api/health stays responsive while a large PDF is being analyzed.
+# Run against a local backend: python backend/verify_health_latency.py
+
+HOST = 'localhost'
+PORT = 3001
+PAGE_COUNT = 400
+LINES_PER_PAGE = 40
+MAX_EXTRA_LATENCY_SECONDS = 0.25
+
+
+def build_text_pdf(page_count, lines_per_page):
+    objects = [b'<< /Type /Catalog /Pages 2 0 R >>', None, b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    page_refs = []
+    for page_index in range(page_count):
+        lines = ' '.join(
+            f'(SIST{page_index:04d}{line:03d} Student {line} arrears {line % 7}) Tj 0 -16 Td'
+            for line in range(lines_per_page)
+        )
+        stream = f'BT /F1 10 Tf 40 780 Td {lines} ET'.encode('latin-1')
+        objects.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        content_ref = len(objects)
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] '
+            b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % content_ref
+        )
+        page_refs.append(len(objects))
+    kids = ' '.join(f'{ref} 0 R' for ref in page_refs).encode('latin-1')
+    objects[1] = b'<< /Type /Pages /Kids [' + kids + b'] /Count %d >>' % page_count
+
+    output = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref_offset = len(output)
+    output += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        output += b'%010d 00000 n \n' % offset
+    output += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref_offset)
+    return bytes(output)
+
+
+def health_latency():
+    started = time.perf_counter()
+    conn = http.client.HTTPConnection(HOST, PORT, timeout=15)
+    conn.request('GET', '/api/health')
+    conn.getresponse().read()
+    conn.close()
+    return time.perf_counter() - started
+
+
+def upload(path, result):
+    file_content = path.read_bytes()
+    boundary = f'----Boundary{uuid.uuid4().hex}'
+    head = (
+        f'--{boundary}\r\n'
+        f'Content-Disposition: form-data; name="file"; filename="{path.name}"\r\n'
+        'Content-Type: application/pdf\r\n\r\n'
+    ).encode('utf-8')
+    body = head + file_content + f'\r\n--{boundary}--\r\n'.encode('utf-8')
+    headers = {
+        'Content-Type': f'multipart/form-data; boundary={boundary}',
+        'Content-Length': str(len(body)),
+    }
+    started = time.perf_counter()
+    conn = http.client.HTTPConnection(HOST, PORT, timeout=300)
+    conn.request('POST', '/api/evaluation/analyze-document', body=body, headers=headers)
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    result['status'] = response.status
+    result['seconds'] = time.perf_counter() - started
+
+
+pdf_path = Path('backend/test_large.pdf')
+pdf_path.write_bytes(build_text_pdf(PAGE_COUNT, LINES_PER_PAGE))
+
+baseline = [health_latency() for _ in range(20)]
+
+upload_result = {}
+uploader = threading.Thread(target=upload, args=(pdf_path, upload_result))
+uploader.start()
+during = []
+while uploader.is_alive():
+    during.append(health_latency())
+    time.sleep(0.05)
+uploader.join()
+pdf_path.unlink()
+
+baseline_p95 = statistics.quantiles(baseline, n=20)[-1]
+during_p95 = statistics.quantiles(during, n=20)[-1] if len(during) >= 2 else max(during, default=0.0)
+
+print(f'upload status {upload_result.get("status")} in {upload_result.get("seconds", 0):.2f}s')
+print(f'health p95 baseline {baseline_p95 * 1000:.1f}ms, during upload {during_p95 * 1000:.1f}ms over {len(during)} probes')
+
+if during_p95 - baseline_p95 > MAX_EXTRA_LATENCY_SECONDS:
+    raise SystemExit('FAIL: /api/health latency degraded while the PDF was analyzed')
+print('OK: /api/health latency stayed flat')
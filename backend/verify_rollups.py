@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+from backend.database import Database
+
+# Check the trigger-maintained rollups against a full rebuild after the writes that
+# used to make them drift: a department change and a student delete (whose
+# notifications go by cascade), both issued from a session whose search_path is not
+# the app schema, as from psql or an admin script. Everything is rolled back.
+# Run from the project root: python -m backend.verify_rollups
+
+STUDENT_ROLLUP_SQL = """
+    SELECT department, semester, students, total_arrears, with_arrears, critical, medium, low
+    FROM student_arrear_rollups
+    WHERE students <> 0 OR total_arrears <> 0
+    ORDER BY department, semester
+"""
+NOTIFICATION_ROLLUP_SQL = """
+    SELECT day::text, department, status, total
+    FROM notification_daily_rollups
+    WHERE total <> 0
+    ORDER BY day, department, status
+"""
+
+
+async def snapshot(session, schema: str) -> dict:
+    await session.execute(f'SET LOCAL search_path TO "{schema}"')
+    return {
+        "students": await session.fetch(STUDENT_ROLLUP_SQL),
+        "notifications": await session.fetch(NOTIFICATION_ROLLUP_SQL),
+    }
+
+
+def differences(incremental: list[dict], rebuilt: list[dict]) -> list[dict]:
+    return [
+        {"incremental": row, "rebuilt": None} for row in incremental if row not in rebuilt
+    ] + [{"incremental": None, "rebuilt": row} for row in rebuilt if row not in incremental]
+
+
+async def main():
+    db = Database()
+    status = await db.initialize()
+    if not status.get("connected"):
+        raise SystemExit(f"Database unavailable: {status.get('error')}")
+
+    schema = db.db_schema
+    try:
+        async with db.connection(bulk=True) as session:
+            transaction = session.conn.transaction()
+            await transaction.start()
+            try:
+                moved_id, deleted_id = [
+                    row["id"]
+                    for row in await session.fetch(
+                        """
+                        INSERT INTO students (roll_no, name, department, semester, arrears_count)
+                        VALUES
+                            ('VERIFY-ROLLUP-1', 'Rollup Check 1', 'VERIFY-A', 3, 2),
+                            ('VERIFY-ROLLUP-2', 'Rollup Check 2', 'VERIFY-A', 3, 5)
+                        RETURNING id
+                        """
+                    )
+                ]
+                await session.execute(
+                    """
+                    INSERT INTO notifications (student_id, message, status)
+                    SELECT student_id, 'Rollup check', status
+                    FROM unnest($1::int[]) AS student_id, unnest(ARRAY['sent', 'pending']) AS status
+                    """,
+                    [moved_id, deleted_id],
+                )
+
+                await session.execute("SET LOCAL search_path TO public")
+                await session.execute(
+                    f"UPDATE \"{schema}\".students SET department = 'VERIFY-B' WHERE id = $1",
+                    moved_id,
+                )
+                await session.execute(f'DELETE FROM "{schema}".students WHERE id = $1', deleted_id)
+
+                incremental = await snapshot(session, schema)
+                await session.execute("SELECT rebuild_arrear_rollups()")
+                rebuilt = await snapshot(session, schema)
+            finally:
+                await transaction.rollback()
+    finally:
+        await db.close()
+
+    result = {
+        table: differences(incremental[table], rebuilt[table]) for table in ("students", "notifications")
+    }
+    print(json.dumps({"schema": schema, "differences": result}, indent=2, default=str))
+    if any(result.values()):
+        raise SystemExit("Rollups drifted from the base tables")
+    print("Rollups match a full rebuild")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
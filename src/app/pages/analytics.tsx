@@ -25,26 +25,25 @@ import {
   Legend,
 } from "recharts";
 
-type Student = {
-  id: number;
-  department: string | null;
-  arrears_count?: number | null;
-  created_at?: string;
+type AnalyticsSummary = {
+  students: {
+    total: number;
+    withArrears: number;
+    totalArrears: number;
+    averageArrears: number;
+  };
+  severity: { critical: number; medium: number; low: number };
+  departments: {
+    department: string;
+    critical: number;
+    medium: number;
+    low: number;
+  }[];
+  notifications: { total: number; byStatus: Record<string, number> };
+  trend: { bucket: string; alerts: number; sent: number }[];
 };
 
-type Notification = {
-  id: number;
-  status: string;
-  created_at: string;
-  severity?: string;
-};
-
-function toSeverityBucket(arrearsCount: number) {
-  if (arrearsCount > 3) return "critical";
-  if (arrearsCount >= 2) return "medium";
-  if (arrearsCount === 1) return "low";
-  return "none";
-}
+const TREND_MONTHS = 6;
 
 function isSuccessfulStatus(status: string) {
   return ["sent", "delivered", "opened", "read", "completed"].includes(
@@ -53,8 +52,7 @@ function isSuccessfulStatus(status: string) {
 }
 
 export function AnalyticsPage() {
-  const [students, setStudents] = useState<Student[]>([]);
-  const [notifications, setNotifications] = useState<Notification[]>([]);
+  const [summary, setSummary] = useState<AnalyticsSummary | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
@@ -66,26 +64,26 @@ export function AnalyticsPage() {
         setLoading(true);
         setError(null);
 
-        const [studentsResponse, notificationsResponse] = await Promise.all([
-          fetch(apiUrl("/api/students")),
-          fetch(apiUrl("/api/notifications")),
-        ]);
+        const trendStart = new Date();
+        trendStart.setDate(1);
+        trendStart.setHours(0, 0, 0, 0);
+        trendStart.setMonth(trendStart.getMonth() - (TREND_MONTHS - 1));
+        const params = new URLSearchParams({
+          bucket: "month",
+          created_from: trendStart.toISOString(),
+        });
 
-        if (!studentsResponse.ok) throw new Error("Failed to load students");
-        if (!notificationsResponse.ok) throw new Error("Failed to load notifications");
-
-        const studentsPayload = (await studentsResponse.json()) as Student[];
-        const notificationsPayload = (await notificationsResponse.json()) as Notification[];
+        const response = await fetch(apiUrl(`/api/analytics/summary?${params.toString()}`));
+        if (!response.ok) throw new Error("Failed to load analytics summary");
 
+        const payload = (await response.json()) as AnalyticsSummary;
         if (mounted) {
-          setStudents(Array.isArray(studentsPayload) ? studentsPayload : []);
-          setNotifications(Array.isArray(notificationsPayload) ? notificationsPayload : []);
+          setSummary(payload);
         }
       } catch (err) {
         if (mounted) {
           setError(err instanceof Error ? err.message : "Unable to load analytics");
-          setStudents([]);
-          setNotifications([]);
+          setSummary(null);
         }
       } finally {
         if (mounted) setLoading(false);
@@ -99,90 +97,53 @@ export function AnalyticsPage() {
     };
   }, []);
 
-  const departmentData = useMemo(() => {
-    const grouped = new Map<string, { name: string; critical: number; medium: number; low: number }>();
-
-    students.forEach((student) => {
-      const department = student.department || "Unknown";
-      if (!grouped.has(department)) {
-        grouped.set(department, { name: department, critical: 0, medium: 0, low: 0 });
-      }
-
-      const bucket = toSeverityBucket(Number(student.arrears_count || 0));
-      const target = grouped.get(department)!;
-      if (bucket === "critical") target.critical += 1;
-      if (bucket === "medium") target.medium += 1;
-      if (bucket === "low") target.low += 1;
-    });
-
-    return Array.from(grouped.values()).sort((a, b) => a.name.localeCompare(b.name));
-  }, [students]);
-
-  const trendData = useMemo(() => {
-    const monthMap = new Map<string, { month: string; alerts: number; response: number }>();
-
-    for (let i = 5; i >= 0; i -= 1) {
-      const date = new Date();
-      date.setMonth(date.getMonth() - i);
-      const key = `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, "0")}`;
-      monthMap.set(key, {
-        month: date.toLocaleDateString(undefined, { month: "short" }),
-        alerts: 0,
-        response: 0,
-      });
-    }
-
-    notifications.forEach((item) => {
-      const date = new Date(item.created_at);
-      const key = `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, "0")}`;
-      const row = monthMap.get(key);
-      if (!row) return;
-      row.alerts += 1;
-      if (isSuccessfulStatus(item.status)) {
-        row.response += 1;
-      }
-    });
+  const departmentData = useMemo(
+    () =>
+      (summary?.departments ?? []).map((item) => ({
+        name: item.department,
+        critical: item.critical,
+        medium: item.medium,
+        low: item.low,
+      })),
+    [summary]
+  );
 
-    return Array.from(monthMap.values());
-  }, [notifications]);
+  const trendData = useMemo(
+    () =>
+      (summary?.trend ?? []).slice(-TREND_MONTHS).map((item) => ({
+        month: new Date(item.bucket).toLocaleDateString(undefined, { month: "short" }),
+        alerts: item.alerts,
+        response: item.sent,
+      })),
+    [summary]
+  );
 
   const severityData = useMemo(() => {
-    let critical = 0;
-    let medium = 0;
-    let low = 0;
-
-    students.forEach((student) => {
-      const bucket = toSeverityBucket(Number(student.arrears_count || 0));
-      if (bucket === "critical") critical += 1;
-      if (bucket === "medium") medium += 1;
-      if (bucket === "low") low += 1;
-    });
-
+    const severity = summary?.severity ?? { critical: 0, medium: 0, low: 0 };
     return [
-      { name: "Critical", value: critical, color: "#ef4444" },
-      { name: "Medium", value: medium, color: "#f59e0b" },
-      { name: "Low", value: low, color: "#3b82f6" },
+      { name: "Critical", value: severity.critical, color: "#ef4444" },
+      { name: "Medium", value: severity.medium, color: "#f59e0b" },
+      { name: "Low", value: severity.low, color: "#3b82f6" },
     ];
-  }, [students]);
+  }, [summary]);
 
   const totalSeverity = severityData.reduce((sum, item) => sum + item.value, 0);
   const criticalShare = totalSeverity ? Math.round((severityData[0].value / totalSeverity) * 100) : 0;
 
-  const avgArrears = students.length
-    ? (
-        students.reduce((sum, student) => sum + Number(student.arrears_count || 0), 0) /
-        students.length
-      ).toFixed(2)
-    : "0.00";
+  const totalStudents = summary?.students.total ?? 0;
+  const avgArrears = (summary?.students.averageArrears ?? 0).toFixed(2);
 
-  const notificationSuccessRate = notifications.length
-    ? Math.round(
-        (notifications.filter((item) => isSuccessfulStatus(item.status)).length / notifications.length) * 100
-      )
+  const statusCounts = Object.entries(summary?.notifications.byStatus ?? {});
+  const totalNotifications = summary?.notifications.total ?? 0;
+  const successfulNotifications = statusCounts
+    .filter(([status]) => isSuccessfulStatus(status))
+    .reduce((sum, [, count]) => sum + count, 0);
+  const notificationSuccessRate = totalNotifications
+    ? Math.round((successfulNotifications / totalNotifications) * 100)
     : 0;
 
-  const highRiskStudents = students.filter((item) => Number(item.arrears_count || 0) > 3).length;
-  const highRiskRatio = students.length ? Math.round((highRiskStudents / students.length) * 100) : 0;
+  const highRiskStudents = summary?.severity.critical ?? 0;
+  const highRiskRatio = totalStudents ? Math.round((highRiskStudents / totalStudents) * 100) : 0;
 
   return (
     <div className="space-y-8">
@@ -24,16 +24,15 @@ import {
 } from "recharts";
 import logoImg from "../../assets/4b35c7bc4c6a88b42d39cda172ff55d3ddce0d64.png";
 
-type Student = {
-  id: number;
-  roll_no: string;
-  name: string;
-  department: string | null;
-  semester: number | null;
-  arrears_count?: number | null;
-  created_at: string;
+type AnalyticsSummary = {
+  students: { total: number; withArrears: number };
+  notifications: { total: number; byStatus: Record<string, number> };
+  trend: { bucket: string; alerts: number; sent: number }[];
 };
 
+const RECENT_ACTIVITY_LIMIT = 6;
+const CHART_DAYS = 7;
+
 type Notification = {
   id: number;
   student_id: number;
@@ -70,7 +69,7 @@ function timeAgo(value?: string | null) {
 }
 
 export function DashboardPage() {
-  const [students, setStudents] = useState<Student[]>([]);
+  const [summary, setSummary] = useState<AnalyticsSummary | null>(null);
   const [notifications, setNotifications] = useState<Notification[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
@@ -84,30 +83,30 @@ export function DashboardPage() {
         setLoading(true);
         setError(null);
 
-        const [studentsResponse, notificationsResponse] = await Promise.all([
-          fetch(apiUrl("/api/students")),
-          fetch(apiUrl("/api/notifications")),
+        const [summaryResponse, notificationsResponse] = await Promise.all([
+          fetch(apiUrl("/api/analytics/summary?bucket=day")),
+          fetch(apiUrl(`/api/notifications?limit=${RECENT_ACTIVITY_LIMIT}`)),
         ]);
 
-        if (!studentsResponse.ok) {
-          throw new Error("Failed to load students");
+        if (!summaryResponse.ok) {
+          throw new Error("Failed to load dashboard summary");
         }
 
         if (!notificationsResponse.ok) {
           throw new Error("Failed to load notifications");
         }
 
-        const studentsPayload = (await studentsResponse.json()) as Student[];
+        const summaryPayload = (await summaryResponse.json()) as AnalyticsSummary;
         const notificationsPayload = (await notificationsResponse.json()) as Notification[];
 
         if (mounted) {
-          setStudents(Array.isArray(studentsPayload) ? studentsPayload : []);
+          setSummary(summaryPayload);
           setNotifications(Array.isArray(notificationsPayload) ? notificationsPayload : []);
         }
       } catch (err) {
         if (mounted) {
           setError(err instanceof Error ? err.message : "Unable to load dashboard data");
-          setStudents([]);
+          setSummary(null);
           setNotifications([]);
         }
       } finally {
@@ -124,12 +123,12 @@ export function DashboardPage() {
     };
   }, [refreshKey]);
 
-  const totalStudents = students.length;
-  const activeArrears = students.filter((student) => Number(student.arrears_count || 0) > 0).length;
-  const notificationsSent = notifications.length;
-  const deliveredCount = notifications.filter(
-    (item) => statusVariant(item.status) === "success"
-  ).length;
+  const totalStudents = summary?.students.total ?? 0;
+  const activeArrears = summary?.students.withArrears ?? 0;
+  const notificationsSent = summary?.notifications.total ?? 0;
+  const deliveredCount = Object.entries(summary?.notifications.byStatus ?? {})
+    .filter(([status]) => statusVariant(status) === "success")
+    .reduce((sum, [, count]) => sum + count, 0);
   const responseRate = notificationsSent ? Math.round((deliveredCount / notificationsSent) * 100) : 0;
 
   const stats = [
@@ -139,35 +138,18 @@ export function DashboardPage() {
     { label: "Delivery Rate", value: `${responseRate}%`, icon: BellRing },
   ];
 
-  const chartData = useMemo(() => {
-    const dayMap = new Map<string, { name: string; alerts: number; sent: number }>();
-
-    for (let index = 6; index >= 0; index -= 1) {
-      const date = new Date();
-      date.setDate(date.getDate() - index);
-      const key = date.toISOString().slice(0, 10);
-      dayMap.set(key, {
-        name: date.toLocaleDateString(undefined, { weekday: "short" }),
-        alerts: 0,
-        sent: 0,
-      });
-    }
-
-    notifications.forEach((item) => {
-      const key = new Date(item.created_at).toISOString().slice(0, 10);
-      const row = dayMap.get(key);
-      if (!row) return;
-      row.alerts += 1;
-      if (statusVariant(item.status) === "success") {
-        row.sent += 1;
-      }
-    });
-
-    return Array.from(dayMap.values());
-  }, [notifications]);
+  const chartData = useMemo(
+    () =>
+      (summary?.trend ?? []).slice(-CHART_DAYS).map((item) => ({
+        name: new Date(item.bucket).toLocaleDateString(undefined, { weekday: "short" }),
+        alerts: item.alerts,
+        sent: item.sent,
+      })),
+    [summary]
+  );
 
   const recentActivity = useMemo(() => {
-    return notifications.slice(0, 6).map((item) => {
+    return notifications.slice(0, RECENT_ACTIVITY_LIMIT).map((item) => {
       const severity = String(item.severity || "low").toLowerCase();
       const normalizedSeverity = severity === "critical" ? "Critical" : severity === "medium" ? "Medium" : "Low";
       return {
@@ -1,10 +1,16 @@
 import { BellRing, UserCircle, CheckCircle2, Clock } from "lucide-react";
 import { motion } from "motion/react";
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useState } from "react";
 import { Link } from "react-router";
 import { GlassCard } from "../components/ui/shared";
 import { apiUrl } from "../lib/api";
 
+type AnalyticsSummary = {
+  notifications: { total: number; byStatus: Record<string, number> };
+};
+
+const RECENT_NOTIFICATIONS_LIMIT = 5;
+
 type Notification = {
   id: number;
   student_id: number;
@@ -25,6 +31,7 @@ function statusVariant(status: string) {
 }
 
 export function FacultyDashboardPage() {
+  const [summary, setSummary] = useState<AnalyticsSummary | null>(null);
   const [notifications, setNotifications] = useState<Notification[]>([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
@@ -37,18 +44,31 @@ export function FacultyDashboardPage() {
         setLoading(true);
         setError(null);
 
-        const response = await fetch(apiUrl("/api/notifications"));
-        if (!response.ok) {
+        // Counts come from the rollup summary; the list endpoint is paged
+        const [summaryResponse, notificationsResponse] = await Promise.all([
+          fetch(apiUrl("/api/analytics/summary")),
+          fetch(
+            apiUrl(`/api/notifications?limit=${RECENT_NOTIFICATIONS_LIMIT}`),
+          ),
+        ]);
+        if (!summaryResponse.ok) {
+          throw new Error("Failed to load notification summary");
+        }
+        if (!notificationsResponse.ok) {
           throw new Error("Failed to load notifications");
         }
 
-        const payload = (await response.json()) as Notification[];
+        const summaryPayload =
+          (await summaryResponse.json()) as AnalyticsSummary;
+        const payload = (await notificationsResponse.json()) as Notification[];
         if (mounted) {
+          setSummary(summaryPayload);
           setNotifications(Array.isArray(payload) ? payload : []);
         }
       } catch (err) {
         if (mounted) {
           setError(err instanceof Error ? err.message : "Unable to load data");
+          setSummary(null);
           setNotifications([]);
         }
       } finally {
@@ -65,15 +85,15 @@ export function FacultyDashboardPage() {
     };
   }, []);
 
-  const sentCount = useMemo(
-    () =>
-      notifications.filter((item) => statusVariant(item.status) === "success")
-        .length,
-    [notifications],
-  );
+  const sentCount = Object.entries(summary?.notifications.byStatus ?? {})
+    .filter(([status]) => statusVariant(status) === "success")
+    .reduce((sum, [, count]) => sum + count, 0);
 
-  const pendingCount = Math.max(notifications.length - sentCount, 0);
-  const recentNotifications = notifications.slice(0, 5);
+  const pendingCount = Math.max(
+    (summary?.notifications.total ?? 0) - sentCount,
+    0,
+  );
+  const recentNotifications = notifications.slice(0, RECENT_NOTIFICATIONS_LIMIT);
 
   return (
     <div className="space-y-8">
@@ -1,5 +1,5 @@
 import { motion } from "motion/react";
-import { useEffect, useMemo, useState } from "react";
+import { useEffect, useState } from "react";
 import {
   Users,
   Search,
@@ -27,12 +27,49 @@ type Student = {
   created_at: string;
 };
 
+const STUDENT_LIST_FIELDS = "roll_no,name,department,semester,created_at";
+const SEARCH_DEBOUNCE_MS = 300;
+
+async function fetchStudentPage(query: string, cursor?: string | null) {
+  const params = new URLSearchParams({ fields: STUDENT_LIST_FIELDS });
+  if (query) {
+    params.set("q", query);
+  }
+  if (cursor) {
+    params.set("cursor", cursor);
+  }
+
+  const response = await fetch(apiUrl(`/api/students?${params.toString()}`));
+  if (!response.ok) {
+    const payload = await response.json().catch(() => null);
+    throw new Error(payload?.error || "Failed to fetch students");
+  }
+
+  const data = (await response.json()) as Student[];
+  return {
+    students: Array.isArray(data) ? data : [],
+    nextCursor: response.headers.get("X-Next-Cursor"),
+  };
+}
+
 export function StudentManagementPage() {
   const navigate = useNavigate();
   const [students, setStudents] = useState<Student[]>([]);
   const [searchTerm, setSearchTerm] = useState("");
+  const [query, setQuery] = useState("");
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // The search runs on the server so it also finds students not loaded yet
+  useEffect(() => {
+    const timer = setTimeout(
+      () => setQuery(searchTerm.trim()),
+      SEARCH_DEBOUNCE_MS,
+    );
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
 
   useEffect(() => {
     let isMounted = true;
@@ -42,15 +79,10 @@ export function StudentManagementPage() {
         setLoading(true);
         setError(null);
 
-        const response = await fetch(apiUrl("/api/students"));
-        if (!response.ok) {
-          const payload = await response.json().catch(() => null);
-          throw new Error(payload?.error || "Failed to fetch students");
-        }
-
-        const data = (await response.json()) as Student[];
+        const page = await fetchStudentPage(query);
         if (isMounted) {
-          setStudents(Array.isArray(data) ? data : []);
+          setStudents(page.students);
+          setNextCursor(page.nextCursor);
         }
       } catch (err) {
         if (isMounted) {
@@ -58,6 +90,7 @@ export function StudentManagementPage() {
             err instanceof Error ? err.message : "Unable to load students",
           );
           setStudents([]);
+          setNextCursor(null);
         }
       } finally {
         if (isMounted) {
@@ -71,19 +104,22 @@ export function StudentManagementPage() {
     return () => {
       isMounted = false;
     };
-  }, []);
+  }, [query]);
 
-  const filteredStudents = useMemo(() => {
-    const query = searchTerm.trim().toLowerCase();
-    if (!query) return students;
+  async function loadMoreStudents() {
+    if (!nextCursor || loadingMore) return;
 
-    return students.filter((student) =>
-      [student.roll_no, student.name, student.department ?? ""]
-        .join(" ")
-        .toLowerCase()
-        .includes(query),
-    );
-  }, [students, searchTerm]);
+    try {
+      setLoadingMore(true);
+      const page = await fetchStudentPage(query, nextCursor);
+      setStudents((current) => [...current, ...page.students]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      setError(err instanceof Error ? err.message : "Unable to load students");
+    } finally {
+      setLoadingMore(false);
+    }
+  }
 
   return (
     <div className="space-y-8">
@@ -159,7 +195,7 @@ export function StudentManagementPage() {
                 </tr>
               )}
 
-              {!loading && !error && filteredStudents.length === 0 && (
+              {!loading && !error && students.length === 0 && (
                 <tr>
                   <td
                     className="px-4 py-6 text-sm text-muted-foreground"
@@ -172,7 +208,7 @@ export function StudentManagementPage() {
 
               {!loading &&
                 !error &&
-                filteredStudents.map((student) => (
+                students.map((student) => (
                   <tr
                     key={student.id}
                     className="group hover:bg-white/5 transition-colors cursor-pointer"
@@ -250,28 +286,15 @@ export function StudentManagementPage() {
 
         <div className="mt-6 flex items-center justify-between px-4 py-2 border-t border-white/10">
           <p className="text-xs text-muted-foreground">
-            Showing {filteredStudents.length} of {students.length} students
+            Showing {students.length} {query ? "matching" : "loaded"} students
           </p>
-          <div className="flex gap-2">
-            <button
-              className="px-3 py-1 text-xs font-bold border border-white/10 rounded-lg hover:bg-white/10 disabled:opacity-50"
-              disabled
-            >
-              Previous
-            </button>
-            <button className="px-3 py-1 text-xs font-bold bg-[#D4AF37] text-white rounded-lg hover:bg-[#D4AF37]/80">
-              1
-            </button>
-            <button className="px-3 py-1 text-xs font-bold border border-white/10 rounded-lg hover:bg-white/10">
-              2
-            </button>
-            <button className="px-3 py-1 text-xs font-bold border border-white/10 rounded-lg hover:bg-white/10">
-              3
-            </button>
-            <button className="px-3 py-1 text-xs font-bold border border-white/10 rounded-lg hover:bg-white/10">
-              Next
-            </button>
-          </div>
+          <button
+            className="px-3 py-1 text-xs font-bold bg-[#D4AF37] text-white rounded-lg hover:bg-[#D4AF37]/80 disabled:opacity-50"
+            disabled={!nextCursor || loadingMore}
+            onClick={loadMoreStudents}
+          >
+            {loadingMore ? "Loading..." : nextCursor ? "Load more" : "All loaded"}
+          </button>
         </div>
       </GlassCard>
     </div>
@@ -24,6 +24,41 @@ type NotificationItem = {
   created_at: string;
 };
 
+type AnalyticsSummary = {
+  notifications: { total: number; byStatus: Record<string, number> };
+};
+
+async function fetchNotificationPage(cursor?: string | null) {
+  const params = new URLSearchParams();
+  if (cursor) {
+    params.set("cursor", cursor);
+  }
+
+  const response = await fetch(apiUrl(`/api/notifications?${params.toString()}`));
+  if (!response.ok) {
+    throw new Error("Failed to load notifications");
+  }
+
+  const data = (await response.json()) as NotificationItem[];
+  return {
+    notifications: Array.isArray(data) ? data : [],
+    nextCursor: response.headers.get("X-Next-Cursor"),
+  };
+}
+
+async function fetchTodaysSummary() {
+  // Rollup days are UTC dates, so "today" starts at UTC midnight
+  const todayStart = new Date();
+  todayStart.setUTCHours(0, 0, 0, 0);
+  const params = new URLSearchParams({ created_from: todayStart.toISOString() });
+
+  const response = await fetch(apiUrl(`/api/analytics/summary?${params.toString()}`));
+  if (!response.ok) {
+    throw new Error("Failed to load today's notification stats");
+  }
+  return (await response.json()) as AnalyticsSummary;
+}
+
 function normalizeStatus(status: string) {
   const value = String(status || "").toLowerCase();
   if (["sent", "delivered", "opened", "read", "completed"].includes(value)) return "Delivered";
@@ -33,6 +68,9 @@ function normalizeStatus(status: string) {
 
 export function NotificationCenterPage() {
   const [notifications, setNotifications] = useState<NotificationItem[]>([]);
+  const [todaysSummary, setTodaysSummary] = useState<AnalyticsSummary | null>(null);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
   const [searchTerm, setSearchTerm] = useState("");
@@ -46,19 +84,18 @@ export function NotificationCenterPage() {
         setLoading(true);
         setError(null);
 
-        const response = await fetch(apiUrl("/api/notifications"));
-        if (!response.ok) {
-          throw new Error("Failed to load notifications");
-        }
-
-        const payload = (await response.json()) as NotificationItem[];
+        const [page, summary] = await Promise.all([fetchNotificationPage(), fetchTodaysSummary()]);
         if (mounted) {
-          setNotifications(Array.isArray(payload) ? payload : []);
+          setNotifications(page.notifications);
+          setNextCursor(page.nextCursor);
+          setTodaysSummary(summary);
         }
       } catch (err) {
         if (mounted) {
           setError(err instanceof Error ? err.message : "Unable to load notifications");
           setNotifications([]);
+          setNextCursor(null);
+          setTodaysSummary(null);
         }
       } finally {
         if (mounted) {
@@ -74,12 +111,29 @@ export function NotificationCenterPage() {
     };
   }, []);
 
-  const todayKey = new Date().toISOString().slice(0, 10);
-  const todaysItems = notifications.filter(
-    (item) => new Date(item.created_at).toISOString().slice(0, 10) === todayKey
-  );
-  const deliveredCount = todaysItems.filter((item) => normalizeStatus(item.status) === "Delivered").length;
-  const failedCount = todaysItems.filter((item) => normalizeStatus(item.status) === "Failed").length;
+  async function loadMoreNotifications() {
+    if (!nextCursor || loadingMore) return;
+
+    try {
+      setLoadingMore(true);
+      const page = await fetchNotificationPage(nextCursor);
+      setNotifications((current) => [...current, ...page.notifications]);
+      setNextCursor(page.nextCursor);
+    } catch (err) {
+      setError(err instanceof Error ? err.message : "Unable to load notifications");
+    } finally {
+      setLoadingMore(false);
+    }
+  }
+
+  const todaysStatusCounts = Object.entries(todaysSummary?.notifications.byStatus ?? {});
+  const todaysTotal = todaysSummary?.notifications.total ?? 0;
+  const deliveredCount = todaysStatusCounts
+    .filter(([status]) => normalizeStatus(status) === "Delivered")
+    .reduce((sum, [, count]) => sum + count, 0);
+  const failedCount = todaysStatusCounts
+    .filter(([status]) => normalizeStatus(status) === "Failed")
+    .reduce((sum, [, count]) => sum + count, 0);
 
   const filteredItems = useMemo(() => {
     const query = searchTerm.trim().toLowerCase();
@@ -103,8 +157,8 @@ export function NotificationCenterPage() {
     });
   }, [notifications, searchTerm, activeFilter]);
 
-  const gatewayHealth = todaysItems.length
-    ? Math.max(0, Math.round(((todaysItems.length - failedCount) / todaysItems.length) * 100))
+  const gatewayHealth = todaysTotal
+    ? Math.max(0, Math.round(((todaysTotal - failedCount) / todaysTotal) * 100))
     : 100;
 
   return (
@@ -135,7 +189,7 @@ export function NotificationCenterPage() {
             <div className="space-y-6">
               <div className="flex items-center justify-between">
                 <span className="text-sm text-muted-foreground">Total Sent</span>
-                <span className="font-bold">{todaysItems.length}</span>
+                <span className="font-bold">{todaysTotal}</span>
               </div>
               <div className="flex items-center justify-between text-green-500">
                 <span className="text-sm">Delivered</span>
@@ -256,6 +310,21 @@ export function NotificationCenterPage() {
               })
             )}
           </div>
+
+          {!loading && (
+            <div className="flex items-center justify-between px-4 py-2 border-t border-white/10">
+              <p className="text-xs text-muted-foreground">
+                Showing {filteredItems.length} of {notifications.length} loaded notifications
+              </p>
+              <button
+                className="px-3 py-1 text-xs font-bold bg-[#D4AF37] text-white rounded-lg hover:bg-[#D4AF37]/80 disabled:opacity-50"
+                disabled={!nextCursor || loadingMore}
+                onClick={loadMoreNotifications}
+              >
+                {loadingMore ? "Loading..." : nextCursor ? "Load more" : "All loaded"}
+              </button>
+            </div>
+          )}
         </div>
       </div>
     </div>